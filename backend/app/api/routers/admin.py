@@ -0,0 +1,40 @@
+"""管理API - キャッシュ統計・性能統計などの運用情報（管理者のみ）"""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from app.core.cache import get_cache_stats
+from app.core.event_loop_monitor import event_loop_monitor
+from app.middleware.performance_monitoring import get_performance_metrics
+from app.utils.auth import get_admin_user
+
+router = APIRouter(dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/cache-stats")
+async def get_cache_statistics():
+    """キャッシュ統計を取得（プレフィックス別のヒット率・追い出し・期限切れ件数）"""
+    return get_cache_stats()
+
+
+@router.get("/performance")
+async def get_performance_statistics():
+    """ルート・ステータス分類別のレイテンシ統計（p50/p95/p99）を取得"""
+    return get_performance_metrics()
+
+
+class EventLoopDebugUpdate(BaseModel):
+    debug: bool
+
+
+@router.get("/event-loop")
+async def get_event_loop_statistics():
+    """イベントループの遅延統計と直近のブロッキング検出結果（スタック・ルート・リクエストID）を取得"""
+    return event_loop_monitor.get_stats()
+
+
+@router.put("/event-loop")
+async def update_event_loop_debug(update: EventLoopDebugUpdate):
+    """ブロッキング検出（スタック取得）の有効・無効を切り替え（再起動で LOOP_BLOCK_DEBUG に戻る）"""
+    event_loop_monitor.debug = update.debug
+    return event_loop_monitor.get_stats()
@@ -1,18 +1,33 @@
 from datetime import date
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.cache import invalidate_user_responses
 from app.core.database import get_db
 from app.models.challenge import Challenge
 from app.models.child import Child
+from app.models.user import User
 from app.services.ai_feedback_service import AIFeedbackService
 
 router = APIRouter(prefix="/ai-feedback", tags=["ai-feedback"])
 
 
+async def _invalidate_history(db: Session, child_id) -> None:
+    """チャレンジの変更後に、子どもの保護者の履歴キャッシュ・ETagを無効化"""
+    owner_uid = (
+        db.query(User.firebase_uid)
+        .join(Child, Child.user_id == User.id)
+        .filter(Child.id == child_id)
+        .scalar()
+    )
+    if owner_uid:
+        await invalidate_user_responses(owner_uid, f"/api/voice/history/{child_id}")
+
+
 @router.post("/generate/{challenge_id}")
-async def generate_feedback_for_challenge(challenge_id: str, db: Session = Depends(get_db)):
+async def generate_feedback_for_challenge(challenge_id: UUID, db: Session = Depends(get_db)):
     """個別チャレンジのAIフィードバック生成"""
 
     # チャレンジデータを取得
@@ -42,11 +57,12 @@ async def generate_feedback_for_challenge(challenge_id: str, db: Session = Depen
         )
 
         # 元のコメントを保存
-        original_comment = challenge.comment
+        original_comment = challenge.ai_feedback
 
-        # commentカラムを更新
-        challenge.comment = new_feedback
+        # ai_feedbackカラムを更新
+        challenge.ai_feedback = new_feedback  # type: ignore[assignment]
         db.commit()
+        await _invalidate_history(db, challenge.child_id)
 
         return {
             "success": True,
@@ -62,7 +78,7 @@ async def generate_feedback_for_challenge(challenge_id: str, db: Session = Depen
 
 
 @router.post("/preview/{challenge_id}")
-async def preview_feedback(challenge_id: str, db: Session = Depends(get_db)):
+async def preview_feedback(challenge_id: UUID, db: Session = Depends(get_db)):
     """AIフィードバックのプレビュー（DBは更新しない）"""
 
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
@@ -93,7 +109,7 @@ async def preview_feedback(challenge_id: str, db: Session = Depends(get_db)):
             "success": True,
             "challenge_id": challenge_id,
             "transcript": challenge.transcript,
-            "current_comment": challenge.comment,
+            "current_comment": challenge.ai_feedback,
             "preview_feedback": preview_feedback,
             "child_age": child_age,
         }
@@ -107,13 +123,13 @@ async def auto_analyze_challenges(db: Session = Depends(get_db)):
     """未分析チャレンジの自動AI分析"""
 
     try:
-        # commentが空のチャレンジを取得
+        # ai_feedbackが空のチャレンジを取得
         unanalyzed_challenges = (
             db.query(Challenge)
             .filter(
                 Challenge.transcript.isnot(None),
                 Challenge.transcript != "",
-                (Challenge.comment.is_(None)) | (Challenge.comment == ""),
+                (Challenge.ai_feedback.is_(None)) | (Challenge.ai_feedback == ""),
             )
             .all()
         )
@@ -149,8 +165,8 @@ async def auto_analyze_challenges(db: Session = Depends(get_db)):
                     transcript=challenge.transcript, child_age=child_age
                 )
 
-                # commentに保存
-                challenge.comment = feedback
+                # ai_feedbackに保存
+                challenge.ai_feedback = feedback  # type: ignore[assignment]
                 success_count += 1
 
             except Exception as e:
@@ -159,6 +175,8 @@ async def auto_analyze_challenges(db: Session = Depends(get_db)):
 
         # 一括保存
         db.commit()
+        for child_id in {challenge.child_id for challenge in unanalyzed_challenges}:
+            await _invalidate_history(db, child_id)
 
         return {
             "success": True,
@@ -188,8 +206,8 @@ async def get_analysis_status(db: Session = Depends(get_db)):
         .filter(
             Challenge.transcript.isnot(None),
             Challenge.transcript != "",
-            Challenge.comment.isnot(None),
-            Challenge.comment != "",
+            Challenge.ai_feedback.isnot(None),
+            Challenge.ai_feedback != "",
         )
         .count()
     )
@@ -207,7 +225,7 @@ async def get_analysis_status(db: Session = Depends(get_db)):
 
 
 @router.delete("/{challenge_id}")
-async def delete_challenge(challenge_id: str, db: Session = Depends(get_db)):
+async def delete_challenge(challenge_id: UUID, db: Session = Depends(get_db)):
     """チャレンジ記録削除"""
 
     challenge = db.query(Challenge).filter(Challenge.id == challenge_id).first()
@@ -215,9 +233,12 @@ async def delete_challenge(challenge_id: str, db: Session = Depends(get_db)):
     if not challenge:
         raise HTTPException(status_code=404, detail="チャレンジ記録が見つかりません")
 
+    child_id = challenge.child_id
+
     try:
         db.delete(challenge)
         db.commit()
+        await _invalidate_history(db, child_id)
 
         return {"message": "チャレンジ記録を削除しました", "deleted_id": challenge_id}
 
@@ -1,9 +1,15 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
+from app.core.cache import (
+    ETAG_CACHE_HEADERS,
+    etag_matches,
+    get_resource_etag,
+    invalidate_user_responses,
+)
 from app.core.database import get_db
 from app.models.child import Child as ChildModel
 from app.models.user import User
@@ -16,10 +22,20 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ChildSchema])
 async def get_children(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """認証されたユーザーの子どもリストを取得"""
+    # 変更がなければ行を取得せずに304を返す
+    etag = await get_resource_etag(current_user["user_id"], "/api/children/")
+    if etag is not None:
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, **ETAG_CACHE_HEADERS})
+        response.headers["ETag"] = etag
+        response.headers.update(ETAG_CACHE_HEADERS)
+
     try:
         # Firebase UIDでユーザーを検索
         result = db.execute(select(User).where(User.firebase_uid == current_user["user_id"]))
@@ -129,6 +145,7 @@ async def create_child(
         db.add(child)
         db.commit()
         db.refresh(child)
+        await invalidate_user_responses(current_user["user_id"], "/api/children/")
 
         # Pydanticモデルに変換して返却
         return ChildSchema.model_validate(child)
@@ -195,6 +212,9 @@ async def update_child(
 
         db.commit()
         db.refresh(child)
+        await invalidate_user_responses(
+            current_user["user_id"], "/api/children/", f"/api/children/{child_id}"
+        )
 
         return ChildSchema.model_validate(child)
 
@@ -235,6 +255,12 @@ async def delete_child(
         # 子どもレコードを削除
         db.delete(child)
         db.commit()
+        await invalidate_user_responses(
+            current_user["user_id"],
+            "/api/children/",
+            f"/api/children/{child_id}",
+            f"/api/voice/history/{child_id}",
+        )
 
         return {"message": "子ども情報を削除しました", "deleted_id": child_id}
 
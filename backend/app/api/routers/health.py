@@ -1,7 +1,6 @@
 import time
 from datetime import datetime, timezone
 
-import psutil
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text  # テキストクエリ用
 from sqlalchemy.ext.asyncio import AsyncSession  # 非同期Session
@@ -10,7 +9,7 @@ from app.core.cache import get_cache_stats
 from app.core.config import settings
 from app.core.database import database, get_db
 from app.core.logging_config import get_logger, log_server_status
-from app.core.resource_monitor import get_resource_summary, resource_monitor
+from app.core.resource_monitor import get_resource_summary
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -73,10 +72,12 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
 
     health_status["checks"]["async_database"] = {"status": async_db_status}
 
-    # システムリソース情報を取得
-    cpu_percent = psutil.cpu_percent()
-    memory_percent = psutil.virtual_memory().percent
-    disk_percent = psutil.disk_usage("/").percent
+    # システムリソース情報を取得（バックグラウンドで取得済みの最新サンプル）
+    resource_summary = get_resource_summary()
+    resources = resource_summary["system_resources"]
+    cpu_percent = resources.get("cpu", {}).get("percent", 0)
+    memory_percent = resources.get("memory", {}).get("used_percent", 0)
+    disk_percent = resources.get("disk", {}).get("used_percent", 0)
 
     health_status["system"] = {
         "cpu_percent": cpu_percent,  # CPU使用率
@@ -88,9 +89,8 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
     log_server_status(cpu_percent, memory_percent, disk_percent)
     logger.info(f"Health check performed - Status: {health_status['status']}")
 
-    # リソース監視とアラート
-    resource_summary = get_resource_summary()
-    alerts = resource_monitor.check_resource_alerts(resource_summary["system_resources"])
+    # リソース監視とアラート（しきい値を超えている状態のリソース）
+    alerts = resource_summary["active_alerts"]
 
     # キャッシュ統計
     cache_stats = get_cache_stats()
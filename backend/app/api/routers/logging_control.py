@@ -1,15 +1,17 @@
-"""ログレベル制御API - 実行時のログレベル変更"""
+"""ログレベル制御API - 実行時のログレベル変更（管理者のみ）"""
 
 import logging
 import os
 from typing import List
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
 
 from app.core.logging_config import get_logger
+from app.middleware.traceability_logging import trace_log_sampler
+from app.utils.auth import get_admin_user
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_admin_user)])
 logger = get_logger(__name__)
 
 
@@ -23,6 +25,16 @@ class LogLevelResponse(BaseModel):
     message: str
 
 
+class TraceSamplingRequest(BaseModel):
+    sample_rate: float = Field(ge=0.0, le=1.0)
+
+
+class TraceSamplingResponse(BaseModel):
+    sample_rate: float
+    excluded_paths: List[str]
+    slow_request_ms: float
+
+
 @router.get("/log-level", response_model=LogLevelResponse)
 async def get_current_log_level():
     """現在のログレベルを取得"""
@@ -66,6 +78,25 @@ async def set_log_level(request: LogLevelRequest):
     )
 
 
+@router.get("/trace-sampling", response_model=TraceSamplingResponse)
+async def get_trace_sampling():
+    """リクエスト追跡ログのサンプリング設定を取得"""
+    return TraceSamplingResponse(**trace_log_sampler.get_config())
+
+
+@router.put("/trace-sampling", response_model=TraceSamplingResponse)
+async def set_trace_sampling(request: TraceSamplingRequest):
+    """正常リクエストの追跡ログを出力する割合を変更（実行時、エラー・遅延は常に出力）"""
+    trace_log_sampler.sample_rate = request.sample_rate
+
+    # 環境変数も更新（現在のプロセスのみ）
+    os.environ["TRACE_LOG_SAMPLE_RATE"] = str(request.sample_rate)
+
+    logger.info(f"Trace log sample rate changed to {request.sample_rate}")
+
+    return TraceSamplingResponse(**trace_log_sampler.get_config())
+
+
 @router.post("/test-logs")
 async def test_log_output():
     """全レベルのログをテスト出力"""
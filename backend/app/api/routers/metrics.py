@@ -0,0 +1,40 @@
+"""メトリクスAPI - OpenMetricsテキスト形式での出力（Prometheus等のスクレイプ用）"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.core.config import settings
+from app.core.openmetrics import OPENMETRICS_CONTENT_TYPE, render_openmetrics
+
+
+def verify_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    スクレイプ用トークンを検証
+
+    ルートテンプレート・キャッシュのプレフィックス・DBプールの状態を含むため公開しない。
+    METRICS_TOKEN が未設定なら出力自体を無効にし（404）、
+    設定されていれば Authorization: Bearer <METRICS_TOKEN> のリクエストだけに返す。
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="メトリクスの取得には認証が必要です",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(verify_metrics_token)])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """リクエスト・DBプール・キャッシュ・OpenAI呼び出しのメトリクスを出力"""
+    return Response(content=render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
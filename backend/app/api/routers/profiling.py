@@ -0,0 +1,90 @@
+"""プロファイリングAPI - 実行中のワーカーのCPUプロファイル・メモリ割り当ての差分（管理者のみ）"""
+
+import asyncio
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.constants.config import PROFILING_CONFIG
+from app.core.profiling import ProfilerBusyError, cpu_profiler, format_collapsed, memory_profiler
+from app.utils.auth import get_admin_user
+
+router = APIRouter(dependencies=[Depends(get_admin_user)])
+
+
+class MemoryProfileRequest(BaseModel):
+    seconds: float = Field(default=PROFILING_CONFIG["MEMORY_MAX_SECONDS"], gt=0)
+    frames: int = Field(default=1, ge=1, le=PROFILING_CONFIG["MEMORY_MAX_FRAMES"])
+
+
+class MemoryProfileStatus(BaseModel):
+    running: bool
+    started_at: Optional[float]
+    max_seconds: float
+    traceback_limit: Optional[int]
+    traced_bytes: int
+    peak_bytes: int
+
+
+class AllocationDiff(BaseModel):
+    location: List[str]
+    size_diff_bytes: int
+    size_bytes: int
+    count_diff: int
+    count: int
+
+
+@router.get("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10, gt=0, le=PROFILING_CONFIG["CPU_MAX_SECONDS"]),
+    interval_ms: float = Query(10, ge=PROFILING_CONFIG["CPU_MIN_INTERVAL_MS"], le=1000),
+):
+    """
+    seconds 秒間のCPUプロファイルをcollapsed形式で取得
+
+    サンプリングは別スレッドで行い、その間もこのワーカーはリクエストを処理し続ける。
+    出力は flamegraph.pl や speedscope にそのまま読み込める。
+    """
+    try:
+        stacks = await asyncio.to_thread(cpu_profiler.profile, seconds, interval_ms)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        format_collapsed(stacks),
+        headers={"Content-Disposition": 'attachment; filename="cpu-profile.collapsed"'},
+    )
+
+
+@router.post("/profile/memory", response_model=MemoryProfileStatus)
+async def start_memory_profile(request: MemoryProfileRequest):
+    """tracemallocによる計測を開始し、基準スナップショットを取る（seconds 秒後に自動停止）"""
+    try:
+        return memory_profiler.start(request.seconds, request.frames)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/profile/memory", response_model=MemoryProfileStatus)
+async def get_memory_profile_status():
+    """メモリプロファイルの計測状態を取得"""
+    return memory_profiler.get_status()
+
+
+@router.get("/profile/memory/diff", response_model=List[AllocationDiff])
+async def get_memory_diff(
+    limit: int = Query(20, ge=1, le=PROFILING_CONFIG["MEMORY_TOP_LIMIT"]),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+):
+    """基準スナップショットから増えた割り当てを、増加量の多い箇所から取得"""
+    try:
+        return await asyncio.to_thread(memory_profiler.diff, limit, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/profile/memory", response_model=MemoryProfileStatus)
+async def stop_memory_profile():
+    """メモリプロファイルの計測を停止"""
+    return memory_profiler.stop()
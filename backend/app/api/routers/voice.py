@@ -1,16 +1,26 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.constants.config import VOICE_CONFIG
+from app.core.cache import (
+    ETAG_CACHE_HEADERS,
+    etag_matches,
+    get_resource_etag,
+    invalidate_user_responses,
+)
 from app.core.database import get_async_db
+from app.core.json_encoding import ORJSONResponse
+from app.core.metrics import timed_phase
 from app.models.challenge import Challenge
 from app.models.child import Child
 from app.models.user import User
 from app.services.ai_feedback_service import AIFeedbackService
+from app.services.voice_service import voice_service
 from app.utils.auth import get_current_user
 
 router = APIRouter(prefix="/api/voice", tags=["voice-transcription"])
@@ -25,6 +35,18 @@ class TranscribeRequest(BaseModel):
     child_id: str  # 子どものUUID
 
 
+# Content-Typeから音声形式への対応表
+AUDIO_CONTENT_TYPES = {
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/webm": "webm",
+    "audio/mp4": "mp4",
+    "audio/m4a": "m4a",
+    "audio/x-m4a": "m4a",
+}
+
+
 @router.get("/test")
 def test_endpoint():
     """テスト用エンドポイント"""
@@ -48,19 +70,21 @@ async def transcribe_text(
 
     try:
         # 現在のユーザーを取得
-        user_result = await db.execute(
-            select(User).where(User.firebase_uid == current_user["user_id"])
-        )
-        user = user_result.scalars().first()
+        with timed_phase("user_lookup"):
+            user_result = await db.execute(
+                select(User).where(User.firebase_uid == current_user["user_id"])
+            )
+            user = user_result.scalars().first()
         if not user:
             raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
 
         # 親子関係を検証してから子どもを取得
         child_uuid = UUID(child_id)
-        result = await db.execute(
-            select(Child).where(Child.id == child_uuid, Child.user_id == user.id)
-        )
-        child = result.scalars().first()
+        with timed_phase("child_lookup"):
+            result = await db.execute(
+                select(Child).where(Child.id == child_uuid, Child.user_id == user.id)
+            )
+            child = result.scalars().first()
         if not child:
             raise HTTPException(
                 status_code=403, detail="この子供への音声データ投稿権限がありません"
@@ -69,8 +93,10 @@ async def transcribe_text(
         # Challenge作成
         challenge = Challenge(child_id=child_uuid, transcript=transcript)
         db.add(challenge)
-        await db.commit()
-        await db.refresh(challenge)
+        with timed_phase("commit"):
+            await db.commit()
+            await db.refresh(challenge)
+        await invalidate_user_responses(current_user["user_id"], f"/api/voice/history/{child_id}")
 
         child_name = child.nickname or child.name or "お子さま"
 
@@ -111,7 +137,9 @@ async def transcribe_text(
         # Challenge更新
         challenge.ai_feedback = feedback
         db.add(challenge)
-        await db.commit()
+        with timed_phase("commit"):
+            await db.commit()
+        await invalidate_user_responses(current_user["user_id"], f"/api/voice/history/{child_id}")
 
         return {"transcript_id": str(challenge.id), "status": "completed", "comment": feedback}
 
@@ -135,6 +163,9 @@ async def transcribe_text(
                 challenge.ai_feedback = f"AIフィードバック生成エラー: {str(e)}"
                 db.add(challenge)
                 await db.commit()
+                await invalidate_user_responses(
+                    current_user["user_id"], f"/api/voice/history/{child_id}"
+                )
             except Exception as commit_error:
                 print(f"❌ Challenge更新エラー: {commit_error}")
 
@@ -147,6 +178,28 @@ async def transcribe_text(
         )
 
 
+@router.post("/upload")
+async def upload_audio_stream(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    """音声をチャンク受信しながら、無音区間ごとに並列で文字起こし"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    audio_format = AUDIO_CONTENT_TYPES.get(content_type)
+    if audio_format is None or audio_format not in VOICE_CONFIG["SUPPORTED_FORMATS"]:
+        raise HTTPException(status_code=415, detail=f"未対応の音声形式です: {content_type}")
+
+    # Content-Lengthが分かる場合は受信前に拒否
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > VOICE_CONFIG["MAX_FILE_SIZE"]:
+            raise HTTPException(status_code=413, detail="音声ファイルが大きすぎます")
+
+    result = await voice_service.transcribe_stream(request.stream(), audio_format)
+
+    return {"status": "completed", **result}
+
+
 @router.get("/transcript/{transcript_id}")
 async def get_transcript(
     transcript_id: str,
@@ -193,10 +246,16 @@ async def get_transcript(
 @router.get("/history/{child_id}")
 async def get_voice_history(
     child_id: str,
+    request: Request,
     db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
 ):
     """子供の音声認識履歴を取得"""
+    # 変更がなければ行を取得せずに304を返す
+    # （ETagは親子関係を確認した200レスポンスでのみ発行されるため、一致は閲覧権限の証明になる）
+    etag = await get_resource_etag(current_user["user_id"], f"/api/voice/history/{child_id}")
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, **ETAG_CACHE_HEADERS})
 
     # 現在のユーザーを取得
     user_result = await db.execute(select(User).where(User.firebase_uid == current_user["user_id"]))
@@ -225,18 +284,22 @@ async def get_voice_history(
     )
     challenges = result.scalars().all()
 
-    return {
-        "child_id": child_id,
-        "transcripts": [
-            {
-                "id": challenge.id,
-                "transcript": challenge.transcript,
-                "ai_feedback": challenge.ai_feedback,
-                "created_at": challenge.created_at,
-            }
-            for challenge in challenges
-        ],
-    }
+    # 件数が多くなるため jsonable_encoder を通さず、UUID・datetimeをorjsonで直接エンコードする
+    return ORJSONResponse(
+        {
+            "child_id": child_id,
+            "transcripts": [
+                {
+                    "id": challenge.id,
+                    "transcript": challenge.transcript,
+                    "ai_feedback": challenge.ai_feedback,
+                    "created_at": challenge.created_at,
+                }
+                for challenge in challenges
+            ],
+        },
+        headers={"ETag": etag, **ETAG_CACHE_HEADERS} if etag is not None else None,
+    )
 
 
 @router.get("/challenge/{challenge_id}")
@@ -1,5 +1,7 @@
 """アプリケーション定数"""
 
+from typing import Any, Dict
+
 # APIレスポンス設定
 API_CONFIG = {
     "VERSION": "1.0.0",
@@ -14,10 +16,19 @@ PAGINATION = {
 }
 
 # 音声処理設定
-VOICE_CONFIG = {
+VOICE_CONFIG: Dict[str, Any] = {
     "MAX_DURATION": 300,  # 5分
     "SUPPORTED_FORMATS": ["webm", "mp4", "wav", "m4a"],
     "MAX_FILE_SIZE": 10 * 1024 * 1024,  # 10MB
+    # ストリーミングアップロード時のセグメント分割
+    "SEGMENT_MIN_SECONDS": 5,  # 無音で区切る最短セグメント長
+    "SEGMENT_MAX_SECONDS": 30,  # 無音がなくても強制的に区切る長さ
+    "SILENCE_THRESHOLD": 500,  # 無音とみなす振幅（16bit PCMのピーク値）
+    "SILENCE_MIN_MS": 400,  # 区切りとみなす無音の継続時間
+    "MAX_PARALLEL_SEGMENTS": 4,  # Whisper APIへの同時リクエスト数
+    # 再送対策の文字起こしキャッシュ（音声ハッシュ→テキストのみ保持）
+    "TRANSCRIPTION_CACHE_SIZE": 256,
+    "TRANSCRIPTION_CACHE_TTL": 600,  # 10分
 }
 
 # AI処理設定
@@ -37,3 +48,53 @@ SECURITY_CONFIG = {
         "AUTH": 5,  # per minute
     },
 }
+
+# キャッシュ設定
+CACHE_CONFIG = {
+    # 読み書きのないキャッシュからも期限切れのエントリを回収する間隔
+    "PURGE_INTERVAL_SECONDS": 30,
+}
+
+# オンデマンドプロファイリング設定（本番でも負荷が一定に収まるよう上限を設ける）
+PROFILING_CONFIG = {
+    "CPU_MAX_SECONDS": 60,
+    "CPU_MIN_INTERVAL_MS": 5,  # サンプリング間隔の下限（200回/秒）
+    "CPU_MAX_STACK_DEPTH": 64,
+    "MEMORY_MAX_SECONDS": 600,  # tracemallocはこの時間で自動停止
+    "MEMORY_MAX_FRAMES": 25,  # 割り当て箇所ごとに記録するスタックの深さの上限
+    "MEMORY_TOP_LIMIT": 100,
+}
+
+# レスポンス圧縮設定
+COMPRESSION_CONFIG: Dict[str, Any] = {
+    "MINIMUM_SIZE": 1024,  # これより小さいレスポンスは圧縮しない（bytes）
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,  # 動的圧縮向けの品質（11は遅すぎる）
+    # 圧縮対象のContent-Type（音声・画像など圧縮済みの形式は対象外）
+    "COMPRESSIBLE_TYPES": (
+        "application/json",
+        "application/openmetrics-text",
+        "application/javascript",
+        "application/xml",
+        "text/",
+    ),
+}
+
+# 性能監視設定
+MONITORING_CONFIG: Dict[str, Any] = {
+    "TARGET_RESPONSE_TIME_MS": 200,  # docs/performance.mdの性能要件
+    "TARGET_THROUGHPUT": 100,  # req/sec
+    "MAX_TRACKED_ROUTES": 200,  # 個別に集計するルート数の上限（超過分はまとめて集計）
+    # リクエスト追跡ログの対象外パス（ヘルスチェック）
+    "TRACE_EXCLUDED_PATHS": ("/health", "/api/health/liveness", "/api/health/readiness"),
+    # サンプリング対象外で常にログ出力する処理時間の閾値
+    "TRACE_SLOW_REQUEST_MS": 1000,
+    # システムリソース（CPU・メモリ・ディスク・I/O）のサンプリング間隔と保持期間
+    "RESOURCE_SAMPLE_INTERVAL_SECONDS": 5,
+    "RESOURCE_HISTORY_SECONDS": 900,  # 15分間の増加率を計算できるだけ保持
+    # DB接続をこれより長く保持したルートを記録する（プールサイズ見直しの材料）
+    "DB_SLOW_HOLD_MS": 1000,
+    # イベントループの遅延計測間隔と、ブロッキングとして記録する閾値
+    "LOOP_LAG_INTERVAL_MS": 500,
+    "LOOP_BLOCK_THRESHOLD_MS": 100,
+}
@@ -1,5 +1,6 @@
 """アラート設定 - ログベース監視とアラート閾値管理"""
 
+import threading
 import time
 from dataclasses import dataclass
 from enum import Enum
@@ -90,42 +91,79 @@ class AlertConfig:
         return None
 
 
+class _SecondBuckets:
+    """1秒単位のバケットを固定長のリングで保持する"""
+
+    __slots__ = ("counts", "seconds")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        # 各スロットが表す時刻（エポック秒）。別の秒で上書きされたスロットは集計しない
+        self.seconds = [-1] * size
+
+
 # メトリクス収集用のカウンタークラス
 class MetricsCounter:
-    """メトリクス収集"""
-
-    def __init__(self):
-        self._counters: Dict[str, list] = {}
+    """
+    メトリクス収集
+
+    メトリクスごとに1秒単位のバケットのリングを持ち、
+    イベント数によらずメモリ使用量は一定（エラー多発時も増えない）。
+    - increment: O(1)
+    - get_count_in_window: O(窓の秒数)
+    リクエスト処理（記録）と監視スレッド（集計）から同時に呼ばれるためロックで保護する。
+    """
+
+    def __init__(self, max_window_seconds: Optional[int] = None):
+        if max_window_seconds is None:
+            max_window_seconds = max(rule.time_window_seconds for rule in AlertConfig.DEFAULT_RULES)
+        # 窓の境界の秒を含めて数えるため1秒分多く持つ
+        self._size = max_window_seconds + 1
+        self._counters: Dict[str, _SecondBuckets] = {}
+        self._lock = threading.Lock()
 
     def increment(self, metric_name: str, timestamp: Optional[float] = None):
         """カウンタ増加"""
         if timestamp is None:
             timestamp = time.time()
-
-        if metric_name not in self._counters:
-            self._counters[metric_name] = []
-
-        self._counters[metric_name].append(timestamp)
+        second = int(timestamp)
+        index = second % self._size
+
+        with self._lock:
+            buckets = self._counters.get(metric_name)
+            if buckets is None:
+                buckets = self._counters[metric_name] = _SecondBuckets(self._size)
+
+            slot_second = buckets.seconds[index]
+            if slot_second == second:
+                buckets.counts[index] += 1
+            elif slot_second < second:
+                # 一周前の古いバケットを再利用
+                buckets.seconds[index] = second
+                buckets.counts[index] = 1
+            # slot_second > second: 保持期間より古いイベントは数えない
 
     def get_count_in_window(self, metric_name: str, time_window_seconds: int) -> int:
-        """指定時間窓内のカウント取得"""
-        if metric_name not in self._counters:
-            return 0
-
-        current_time = time.time()
-        cutoff_time = current_time - time_window_seconds
-
-        # 古いデータを削除
-        self._counters[metric_name] = [
-            timestamp for timestamp in self._counters[metric_name] if timestamp > cutoff_time
-        ]
-
-        return len(self._counters[metric_name])
+        """指定時間窓内のカウント取得（保持期間より長い窓は保持期間で数える）"""
+        current_second = int(time.time())
+        window = min(time_window_seconds, self._size)
+
+        with self._lock:
+            buckets = self._counters.get(metric_name)
+            if buckets is None:
+                return 0
+
+            total = 0
+            for second in range(current_second - window + 1, current_second + 1):
+                index = second % self._size
+                if buckets.seconds[index] == second:
+                    total += buckets.counts[index]
+            return total
 
     def clear_metric(self, metric_name: str):
         """メトリクスクリア"""
-        if metric_name in self._counters:
-            self._counters[metric_name] = []
+        with self._lock:
+            self._counters.pop(metric_name, None)
 
 
 # グローバルメトリクスカウンター
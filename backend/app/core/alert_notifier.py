@@ -1,10 +1,10 @@
 """アラート通知システム - コンソール出力ベース最低限実装"""
 
 import asyncio
-import json
 from datetime import datetime
 
 from app.core.alert_monitor import AlertEvent
+from app.core.json_encoding import json_dumps
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -61,7 +61,7 @@ ID: {alert_info['alert_id']}
             "threshold": alert.threshold,
             "timestamp": alert.timestamp,
         }
-        logger.warning(f"CONSOLE_ALERT | {json.dumps(alert_data, ensure_ascii=False)}")
+        logger.warning(f"CONSOLE_ALERT | {json_dumps(alert_data)}")
 
 
 class FileNotifier:
@@ -92,7 +92,7 @@ class FileNotifier:
             os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
 
             with open(self.log_file_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(alert_data, ensure_ascii=False) + "\n")
+                f.write(json_dumps(alert_data) + "\n")
 
             logger.info(f"アラートファイル記録: {self.log_file_path}")
         except Exception as e:
@@ -132,8 +132,6 @@ class AlertNotificationManager:
                             print(formatted_alert)
                         elif notifier.name == "file":
                             # FileNotifierも同期実行可能に
-                            import json
-
                             alert_data = {
                                 "alert_id": alert.alert_id,
                                 "severity": alert.rule.severity.value,
@@ -148,7 +146,7 @@ class AlertNotificationManager:
 
                             # ディレクトリが存在しない場合は作成不要（logsフォルダは既存）
                             with open(notifier.log_file_path, "a", encoding="utf-8") as f:
-                                f.write(json.dumps(alert_data, ensure_ascii=False) + "\n")
+                                f.write(json_dumps(alert_data) + "\n")
                             logger.info(f"アラートファイル記録: {notifier.log_file_path}")
                 except Exception as e:
                     logger.error(f"通知エラー ({notifier.name}): {e}")
@@ -1,117 +1,844 @@
 """キャッシュ機能 - 適切な場面でのキャッシュ利用とパフォーマンス向上"""
 
+import asyncio
+import base64
 import functools
 import hashlib
-import json
+import heapq
+import math
+import random
+import sys
+import threading
 import time
-from typing import Any, Callable, Dict, Optional
-
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date, datetime
+from datetime import time as dt_time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import orjson
+
+from app.constants.config import CACHE_CONFIG
+from app.core.config import settings
 from app.core.logging_config import get_logger
 
+try:
+    import redis
+except ImportError:  # Redisを使わない環境ではメモリキャッシュのみ
+    # redis>=5 は型情報を同梱するため、インストール済みの環境でだけ None の代入が型エラーになる
+    redis = None  # type: ignore[assignment, unused-ignore]
+
 logger = get_logger(__name__)
 
 
-class SimpleMemoryCache:
-    """シンプルなメモリキャッシュ実装（Redis未使用時）"""
+class CacheBackend(ABC):
+    """キャッシュバックエンドの抽象インターフェース"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """キャッシュから値を取得（存在しない場合はNone）"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        """キャッシュに値を設定"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """キャッシュから値を削除"""
+        pass
+
+    def replace(self, key: str, value: Any, ttl: int = 300) -> None:
+        """値を差し替え、他ワーカーが保持している古い値も無効化する"""
+        self.set(key, value, ttl)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """イベントループ上から取得（ネットワークを使うバックエンドはスレッドで実行する）"""
+        return self.get(key)
+
+    async def set_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        """イベントループ上から設定"""
+        self.set(key, value, ttl)
+
+    async def replace_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        """イベントループ上から差し替え"""
+        self.replace(key, value, ttl)
+
+    def stats(self) -> dict:
+        """統計情報"""
+        return {}
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """オブジェクトのおおよそのメモリ使用量（バイト）を再帰的に見積もる"""
+    size = sys.getsizeof(value)
+    if _depth >= 5 or isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+
+    if isinstance(value, dict):
+        size += sum(
+            approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += approximate_size(vars(value), _depth + 1)
+    return size
+
+
+def _key_prefix(key: str) -> str:
+    """統計集計用のキープレフィックス（"children:xxxx" -> "children"）"""
+    prefix, separator, _ = key.partition(":")
+    return prefix if separator else "default"
+
 
-    def __init__(self, max_size: int = 1000):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+# 期限切れの定期回収の対象（VoiceServiceの文字起こしキャッシュなど、個別に作成したものも含む）
+_memory_caches: "weakref.WeakSet[SimpleMemoryCache]" = weakref.WeakSet()
+
+
+class SimpleMemoryCache(CacheBackend):
+    """
+    シンプルなメモリキャッシュ実装（Redis未使用時・多層キャッシュのL1）
+
+    - LRU: OrderedDictの並び順で管理（取得・追加・追い出しすべてO(1)）
+    - TTL: 有効期限のmin-heapで管理し、読み書きのたびに期限切れを先頭から回収する。
+      読み書きのないキャッシュは CachePurgeTask が定期的に回収する
+    - 容量: 件数（max_size）と推定メモリ量（max_bytes）の両方で制限
+    """
+
+    STAT_FIELDS = ("hits", "misses", "sets", "evictions", "expirations", "entries", "bytes")
+
+    def __init__(self, max_size: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        # key -> (value, expires_at, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        # (expires_at, key) の有効期限ヒープ（上書き済みの古い要素は回収時に読み飛ばす）
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._max_size = max_size
-        self._access_times: Dict[str, float] = {}
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        # プレフィックス別の統計
+        self._prefix_stats: Dict[str, Dict[str, int]] = {}
+        # スレッドプールや無効化通知スレッドからも操作されるためロックで保護
+        self._lock = threading.Lock()
+        _memory_caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
     def get(self, key: str) -> Optional[Any]:
         """キャッシュから値を取得"""
-        if key not in self._cache:
-            return None
+        with self._lock:
+            # TTL（Time To Live）: 期限切れがなければヒープ先頭との比較だけで済む
+            self._purge_expired(time.monotonic())
+            stats = self._stats_for(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                stats["misses"] += 1
+                return None
+
+            # 最近使った順の末尾へ移動（LRU用）
+            self._entries.move_to_end(key)
+            stats["hits"] += 1
+            return entry[0]
 
-        cache_entry = self._cache[key]
+    def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        """キャッシュに値を設定（デフォルト5分）"""
+        size = approximate_size(key) + approximate_size(value)
 
-        # TTL（Time To Live）チェック
-        if cache_entry.get("expires_at", 0) < time.time():
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
             self._remove(key)
-            return None
 
-        # アクセス時間を更新（LRU用）
-        self._access_times[key] = time.time()
-        return cache_entry["value"]
+            # 単体で予算を超える値はキャッシュしない
+            if size > self._max_bytes:
+                logger.debug(f"Cache SKIP (too large): {key} ({size} bytes)")
+                return
 
-    def set(self, key: str, value: Any, ttl: int = 300) -> None:
-        """キャッシュに値を設定（デフォルト5分）"""
-        # キャッシュサイズ制限チェック
-        if len(self._cache) >= self._max_size and key not in self._cache:
-            self._evict_lru()
+            # キャッシュサイズ制限チェック（件数・メモリ量）
+            while self._entries and (
+                len(self._entries) >= self._max_size or self._total_bytes + size > self._max_bytes
+            ):
+                self._evict_lru()
+
+            expires_at = now + ttl
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
 
-        expires_at = time.time() + ttl
-        self._cache[key] = {"value": value, "expires_at": expires_at, "created_at": time.time()}
-        self._access_times[key] = time.time()
+            stats = self._stats_for(key)
+            stats["sets"] += 1
+            stats["entries"] += 1
+            stats["bytes"] += size
 
-        logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
+            # 上書きで古いヒープ要素が溜まりすぎたら作り直す
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._rebuild_heap()
 
-    def _remove(self, key: str) -> None:
+        logger.debug(f"Cache SET: {key} (TTL: {ttl}s, {size} bytes)")
+
+    def delete(self, key: str) -> None:
         """キーを削除"""
-        self._cache.pop(key, None)
-        self._access_times.pop(key, None)
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap = []
+            self._total_bytes = 0
+            for stats in self._prefix_stats.values():
+                stats["entries"] = 0
+                stats["bytes"] = 0
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """期限切れのエントリを回収し、削除件数を返す"""
+        with self._lock:
+            return self._purge_expired(time.monotonic() if now is None else now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            prefixes = {}
+            for prefix, stats in self._prefix_stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                prefixes[prefix] = {
+                    **stats,
+                    "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else None,
+                }
+
+            return {
+                "cache_size": len(self._entries),
+                "max_size": self._max_size,
+                "usage_percent": (len(self._entries) / self._max_size) * 100,
+                "memory_bytes": self._total_bytes,
+                "max_bytes": self._max_bytes,
+                "memory_usage_percent": (self._total_bytes / self._max_bytes) * 100,
+                "prefixes": prefixes,
+            }
+
+    def _stats_for(self, key: str) -> Dict[str, int]:
+        prefix = _key_prefix(key)
+        stats = self._prefix_stats.get(prefix)
+        if stats is None:
+            stats = self._prefix_stats[prefix] = dict.fromkeys(self.STAT_FIELDS, 0)
+        return stats
+
+    def _purge_expired(self, now: float) -> int:
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # 上書き後の古い有効期限は無視する
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self._stats_for(key)["expirations"] += 1
+                removed += 1
+        return removed
+
+    def _remove(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """キーを削除（ヒープ側は回収時に読み飛ばされる）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+            stats = self._stats_for(key)
+            stats["entries"] -= 1
+            stats["bytes"] -= entry[2]
+        return entry
 
     def _evict_lru(self) -> None:
         """LRU（Least Recently Used）でエビクション"""
-        if not self._access_times:
+        if not self._entries:
             return
 
-        lru_key = min(self._access_times, key=self._access_times.get)
+        lru_key = next(iter(self._entries))
         self._remove(lru_key)
+        self._stats_for(lru_key)["evictions"] += 1
         logger.debug(f"Cache LRU eviction: {lru_key}")
 
+    def _rebuild_heap(self) -> None:
+        self._expiry_heap = [(entry[1], key) for key, entry in self._entries.items()]
+        heapq.heapify(self._expiry_heap)
+
+
+# bytesはJSONで表せないため、このキーだけを持つオブジェクトにbase64で保存する
+_BYTES_TAG = "__bytes__"
+# datetime・dataclassは文字列・dictに変換せず _encode_json_default に渡す（L2に保存しない）
+_REDIS_DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def _encode_json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {_BYTES_TAG: base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"JSONで保存できない型です: {type(value).__name__}")
+
+
+def _restore_bytes(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_restore_bytes(item) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1 and _BYTES_TAG in value:
+            return base64.b64decode(value[_BYTES_TAG])
+        return {k: _restore_bytes(v) for k, v in value.items()}
+    return value
+
+
+def _encode_cache_value(value: Any) -> bytes:
+    """
+    共有キャッシュに保存する値をJSONに変換
+
+    Raises:
+        TypeError: JSONで表せない値（datetime・dataclass・文字列以外のdictキー等）の場合
+    """
+    return orjson.dumps(value, default=_encode_json_default, option=_REDIS_DUMPS_OPTIONS)
+
+
+def _decode_cache_value(raw: bytes) -> Any:
+    """_encode_cache_value で保存した値を復元（タプルはリストになる）"""
+    value = orjson.loads(raw)
+    return _restore_bytes(value) if _BYTES_TAG.encode() in raw else value
+
+
+class RedisCache(CacheBackend):
+    """
+    Redisキャッシュ（ワーカー間で共有するL2）
+
+    Redisに書き込める相手がアプリのコードを実行できないよう、値はpickleではなくJSONで保存する。
+    JSONで表せない値はL2に保存せず、タプルはリストとして復元される。
+    同期クライアントを使うため、イベントループ上からは *_async（スレッドで実行）を使う。
+    """
+
+    def __init__(self, client, namespace: str = "bud:cache:"):
+        self.client = client
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.namespace + key)
+        except Exception as e:
+            # Redis障害時はキャッシュミスとして扱い、本処理を止めない
+            logger.warning(f"Redis cache GET failed: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            return _decode_cache_value(raw)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Redis cache value is not valid JSON: {key}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        try:
+            raw = _encode_cache_value(value)
+        except TypeError as e:
+            logger.debug(f"Redis cache SKIP (not JSON serializable): {key} ({e})")
+            return
+        try:
+            self.client.set(self.namespace + key, raw, ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.warning(f"Redis cache SET failed: {e}")
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    async def replace_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        await asyncio.to_thread(self.replace, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(self.namespace + key)
+        except Exception as e:
+            logger.warning(f"Redis cache DELETE failed: {e}")
+
+
+class TieredCache(CacheBackend):
+    """
+    多層キャッシュ（L1: プロセス内メモリ / L2: Redis）
+
+    無効化（replace・delete）はRedis Pub/Subで他ワーカーへ通知し、各ワーカーのL1から削除する。
+    計算結果やトークンなどの通常の書き込み（set）は通知せず、他ワーカーのL1は
+    l1_ttl 秒以内にL2の値へ置き換わる。通知が届かない場合に備えて、L1の保持期間は
+    l1_ttl 秒までに制限する。
+    Redisへのアクセスはブロッキングのため、イベントループ上からは *_async を使う
+    （L1にある値はスレッドを介さずに返す）。
+    """
+
+    def __init__(
+        self,
+        l1: SimpleMemoryCache,
+        l2: CacheBackend,
+        client=None,
+        channel: str = "bud:cache:invalidate",
+        l1_ttl: int = 60,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.client = client
+        self.channel = channel
+        self.l1_ttl = l1_ttl
+        # 自分が送った通知を識別するためのID
+        self.instance_id = uuid.uuid4().hex
+        self._listener_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._l2_hits = 0
+        self._l2_misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is None:
+            value = self._fill_l1(key, self.l2.get(key))
+        return value
+
+    def set(self, key: str, value: Any, ttl: int = 300) -> None:
+        self.l2.set(key, value, ttl)
+        self.l1.set(key, value, min(ttl, self.l1_ttl))
+
+    def replace(self, key: str, value: Any, ttl: int = 300) -> None:
+        self.set(key, value, ttl)
+        self._publish_invalidation(key)
+
+    def delete(self, key: str) -> None:
+        self.l2.delete(key)
+        self.l1.delete(key)
+        self._publish_invalidation(key)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is None:
+            value = self._fill_l1(key, await self.l2.get_async(key))
+        return value
+
+    async def set_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    async def replace_async(self, key: str, value: Any, ttl: int = 300) -> None:
+        await asyncio.to_thread(self.replace, key, value, ttl)
+
+    def _fill_l1(self, key: str, value: Optional[Any]) -> Optional[Any]:
+        """L2から取得した値をL1に保存"""
+        if value is not None:
+            self._l2_hits += 1
+            self.l1.set(key, value, self.l1_ttl)
+        else:
+            self._l2_misses += 1
+        return value
+
+    def stats(self) -> dict:
+        return {
+            **self.l1.stats(),
+            "backend": "tiered",
+            "l1_ttl": self.l1_ttl,
+            "l2_hits": self._l2_hits,
+            "l2_misses": self._l2_misses,
+        }
+
+    def handle_invalidation(self, message: str) -> None:
+        """他ワーカーからの無効化通知を処理"""
+        sender, _, key = message.partition(":")
+        if sender != self.instance_id and key:
+            self.l1.delete(key)
+
+    def _publish_invalidation(self, key: str) -> None:
+        if self.client is None:
+            return
+        try:
+            self.client.publish(self.channel, f"{self.instance_id}:{key}")
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+
+    def start_listener(self) -> None:
+        """無効化通知の購読を開始（バックグラウンドスレッド）"""
+        if self.client is None or self._listener_thread is not None:
+            return
+
+        self._stop_event.clear()
+        # 起動直後の通知を取りこぼさないよう、購読は呼び出し元スレッドで済ませる
+        pubsub = self._subscribe()
+        self._listener_thread = threading.Thread(
+            target=self._listen, args=(pubsub,), name="cache-invalidation", daemon=True
+        )
+        self._listener_thread.start()
+        logger.info(f"Cache invalidation listener started: {self.channel}")
+
+    def stop_listener(self) -> None:
+        """無効化通知の購読を停止"""
+        if self._listener_thread is None:
+            return
+        self._stop_event.set()
+        self._listener_thread.join(timeout=5)
+        self._listener_thread = None
+
+    def _subscribe(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        return pubsub
+
+    def _listen(self, pubsub) -> None:
+        while not self._stop_event.is_set():
+            try:
+                if pubsub is None:
+                    pubsub = self._subscribe()
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    self.handle_invalidation(data)
+            except Exception as e:
+                # 接続断の間に通知を取りこぼす可能性があるためL1を破棄して再接続
+                logger.warning(f"Cache invalidation listener error: {e}")
+                self.l1.clear()
+                pubsub = None
+                self._stop_event.wait(5)
+
+        if pubsub is not None:
+            pubsub.close()
+
+
+def create_cache_backend() -> CacheBackend:
+    """設定に応じたキャッシュバックエンドを作成"""
+    if settings.CACHE_BACKEND != "redis":
+        return SimpleMemoryCache(max_bytes=settings.CACHE_MAX_BYTES)
+
+    if redis is None:
+        logger.warning("redis package is not installed; falling back to in-memory cache")
+        return SimpleMemoryCache(max_bytes=settings.CACHE_MAX_BYTES)
+
+    client = redis.Redis.from_url(
+        settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+    )
+    return TieredCache(
+        l1=SimpleMemoryCache(max_bytes=settings.CACHE_MAX_BYTES),
+        l2=RedisCache(client),
+        client=client,
+        l1_ttl=settings.CACHE_L1_TTL,
+    )
+
 
 # グローバルキャッシュインスタンス
-_cache = SimpleMemoryCache()
+_cache = create_cache_backend()
+
+
+class CachePurgeTask:
+    """
+    プロセス内キャッシュの期限切れエントリの定期回収（asyncioタスク）
+
+    読み書きのないキャッシュでも、期限切れの値とその推定メモリ量を保持し続けないようにする。
+    """
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = (
+            CACHE_CONFIG["PURGE_INTERVAL_SECONDS"] if interval_seconds is None else interval_seconds
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def purge(self) -> int:
+        """全てのプロセス内キャッシュから期限切れを回収し、削除件数を返す"""
+        return sum(cache.purge_expired() for cache in list(_memory_caches))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                removed = self.purge()
+                if removed:
+                    logger.debug(f"Cache purge: {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Cache purge error: {e}")
+
+    def start(self) -> None:
+        """回収開始（実行中のイベントループにタスクを登録し、待たずに戻る）"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="cache-purge")
+
+    async def stop(self) -> None:
+        """回収停止"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+cache_purge_task = CachePurgeTask()
+
+
+def start_cache_purge() -> None:
+    """期限切れエントリの定期回収を開始"""
+    cache_purge_task.start()
+
+
+async def stop_cache_purge() -> None:
+    """期限切れエントリの定期回収を停止"""
+    await cache_purge_task.stop()
 
 
-def cached(ttl: int = 300, key_prefix: str = ""):
+def start_cache_invalidation_listener() -> None:
+    """多層キャッシュのL1無効化通知の購読を開始"""
+    if isinstance(_cache, TieredCache):
+        _cache.start_listener()
+
+
+def stop_cache_invalidation_listener() -> None:
+    """多層キャッシュのL1無効化通知の購読を停止"""
+    if isinstance(_cache, TieredCache):
+        _cache.stop_listener()
+
+
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "",
+    early_refresh_beta: float = 0.0,
+    key_func: Optional[Callable[..., Any]] = None,
+):
     """
-    関数結果をキャッシュするデコレータ
+    関数結果をキャッシュするデコレータ（同期関数・async関数の両方に対応）
+
+    同じキーのキャッシュミスが同時に発生した場合は、1回の計算結果を共有する。
 
     Args:
         ttl: キャッシュ有効期間（秒）
         key_prefix: キャッシュキーのプレフィックス
+        early_refresh_beta: 確率的早期更新の係数（0で無効、1が標準）。
+            期限が近いほど高い確率で期限前に再計算し、期限切れ時の一斉再計算を防ぐ
+        key_func: 関数と同じ引数を受け取り、キーに使う値（タプル等）を返す関数。
+            省略時は全引数をキーにする。DBセッションなどキーにできない引数がある場合は必須
     """
 
     def decorator(func: Callable):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # キャッシュキーを生成
-            cache_key = _generate_cache_key(func.__name__, args, kwargs, key_prefix)
-
-            # キャッシュから取得を試行
-            cached_result = _cache.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_result
-
-            # キャッシュミス時は関数を実行
-            logger.debug(f"Cache MISS: {cache_key}")
-            result = func(*args, **kwargs)
+        namespace = _cache_key_namespace(func, key_prefix)
 
-            # 結果をキャッシュに保存
-            _cache.set(cache_key, result, ttl)
-            return result
+        def build_key(args: tuple, kwargs: dict) -> str:
+            if key_func is None:
+                return build_cache_key(namespace, args, kwargs)
+            return build_cache_key(namespace, (key_func(*args, **kwargs),), {})
 
-        return wrapper
+        if asyncio.iscoroutinefunction(func):
+            return _async_cached(func, build_key, ttl, early_refresh_beta)
+        return _sync_cached(func, build_key, ttl, early_refresh_beta)
 
     return decorator
 
 
-def _generate_cache_key(func_name: str, args: tuple, kwargs: dict, prefix: str = "") -> str:
-    """キャッシュキーを生成"""
-    # 引数をJSON文字列に変換してハッシュ化
-    args_str = json.dumps([str(arg) for arg in args], sort_keys=True)
-    kwargs_str = json.dumps(kwargs, sort_keys=True, default=str)
-
-    combined = f"{func_name}:{args_str}:{kwargs_str}"
-    cache_key = hashlib.md5(combined.encode()).hexdigest()
+def _store_result(cache_key: str, result: Any, compute_seconds: float, ttl: int) -> None:
+    """計算時間と有効期限（早期更新の判定用）を添えて保存"""
+    _cache.set(cache_key, (result, compute_seconds, time.time() + ttl), ttl)
+
+
+async def _store_result_async(
+    cache_key: str, result: Any, compute_seconds: float, ttl: int
+) -> None:
+    """_store_result のイベントループ用"""
+    await _cache.set_async(cache_key, (result, compute_seconds, time.time() + ttl), ttl)
+
+
+def _should_refresh_early(entry: tuple, beta: float) -> bool:
+    """確率的早期更新（XFetch）の判定"""
+    if beta <= 0:
+        return False
+    _, compute_seconds, expires_at = entry
+    return time.time() - compute_seconds * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _async_cached(func: Callable, build_key: Callable, ttl: int, early_refresh_beta: float):
+    # 計算中のキー -> 計算タスク
+    # 計算は呼び出し元とは別のタスクで行い、各呼び出し元は shield して待つ
+    # （最初に計算を始めた呼び出し元が取り消されても、他の待機者には結果を渡す）
+    inflight: Dict[str, asyncio.Task] = {}
+
+    async def compute(cache_key: str, args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        result = await func(*args, **kwargs)
+        await _store_result_async(cache_key, result, time.perf_counter() - start, ttl)
+        return result
+
+    def on_compute_done(cache_key: str, task: asyncio.Task) -> None:
+        if inflight.get(cache_key) is task:
+            del inflight[cache_key]
+        # 待機者がいない場合の未取得警告を防ぐ
+        if not task.cancelled():
+            task.exception()
+
+    def start_compute(cache_key: str, args: tuple, kwargs: dict) -> asyncio.Task:
+        task = asyncio.ensure_future(compute(cache_key, args, kwargs))
+        inflight[cache_key] = task
+        task.add_done_callback(functools.partial(on_compute_done, cache_key))
+        return task
+
+    def on_refresh_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache early refresh failed: {task.exception()}")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        cache_key = build_key(args, kwargs)
+
+        entry = await _cache.get_async(cache_key)
+        if entry is not None:
+            logger.debug(f"Cache HIT: {cache_key}")
+            if cache_key not in inflight and _should_refresh_early(entry, early_refresh_beta):
+                # 現在の値を返しつつ、バックグラウンドで1回だけ再計算
+                start_compute(cache_key, args, kwargs).add_done_callback(on_refresh_done)
+            return entry[0]
+
+        # 計算中の同じキーがあれば、その結果を待つ
+        task = inflight.get(cache_key)
+        if task is not None:
+            logger.debug(f"Cache WAIT: {cache_key}")
+        else:
+            logger.debug(f"Cache MISS: {cache_key}")
+            task = start_compute(cache_key, args, kwargs)
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+class _KeyLock:
+    """キーごとの計算ロックと、そのロックを取得中・待機中のスレッド数"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+def _sync_cached(func: Callable, build_key: Callable, ttl: int, early_refresh_beta: float):
+    # キーごとの計算ロック（スレッドプールから同時に呼ばれる場合の重複計算防止）
+    # 取得中・待機中のスレッドがいなくなったら削除する（削除後に別のロックが作られて重複計算しないように）
+    key_locks: Dict[str, _KeyLock] = {}
+    key_locks_guard = threading.Lock()
+
+    def compute(cache_key: str, args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        _store_result(cache_key, result, time.perf_counter() - start, ttl)
+        return result
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # キャッシュキーを生成
+        cache_key = build_key(args, kwargs)
+
+        # キャッシュから取得を試行
+        entry = _cache.get(cache_key)
+        refresh = entry is not None and _should_refresh_early(entry, early_refresh_beta)
+        if entry is not None and not refresh:
+            logger.debug(f"Cache HIT: {cache_key}")
+            return entry[0]
+
+        with key_locks_guard:
+            key_lock = key_locks.get(cache_key)
+            if key_lock is None:
+                key_lock = key_locks[cache_key] = _KeyLock()
+            key_lock.users += 1
+        lock = key_lock.lock
+
+        try:
+            if refresh:
+                # 早期更新は他に計算中のスレッドがいない場合のみ実行
+                if not lock.acquire(blocking=False):
+                    return entry[0]
+                try:
+                    return compute(cache_key, args, kwargs)
+                finally:
+                    lock.release()
+
+            # キャッシュミス時は1スレッドだけが関数を実行
+            with lock:
+                entry = _cache.get(cache_key)
+                if entry is not None:
+                    return entry[0]
+                logger.debug(f"Cache MISS: {cache_key}")
+                return compute(cache_key, args, kwargs)
+        finally:
+            with key_locks_guard:
+                key_lock.users -= 1
+                if key_lock.users == 0 and key_locks.get(cache_key) is key_lock:
+                    del key_locks[cache_key]
+
+    return wrapper
+
+
+# キーの一部としてそのまま使える型（reprが型ごとに区別でき、プロセス間で安定しているもの）
+_KEY_SCALAR_TYPES = frozenset(
+    {str, int, float, bool, type(None), bytes, uuid.UUID, date, datetime, dt_time, Decimal}
+)
+# これより長いキーはハッシュ化して保存する
+MAX_CACHE_KEY_LENGTH = 250
+
+
+class _KeyContainer(NamedTuple):
+    """dict・setをキー化した表現（同じ要素のタプルと区別するため型名を残す）"""
+
+    kind: str
+    items: tuple
+
+
+def _normalize_key_part(value: Any) -> Any:
+    """
+    引数をreprが一意・安定な値に正規化する
 
-    if prefix:
-        cache_key = f"{prefix}:{cache_key}"
+    1 / "1" / 1.0 / True はreprが異なるため別のキーになる。
+    str()での文字列化とは異なり、型の違うオブジェクトが同じキーになることはない。
+    """
+    value_type = type(value)
+    if value_type in _KEY_SCALAR_TYPES or isinstance(value, Enum):
+        return value
+    if value_type is tuple or value_type is list:
+        return value_type(_normalize_key_part(item) for item in value)
+    if value_type is dict:
+        items = sorted(
+            (repr(_normalize_key_part(k)), _normalize_key_part(v)) for k, v in value.items()
+        )
+        return _KeyContainer("dict", tuple(items))
+    if value_type is set or value_type is frozenset:
+        # 文字列のハッシュ値はプロセスごとに異なるため、reprで並べて順序を固定する
+        return _KeyContainer(
+            value_type.__name__, tuple(sorted(repr(_normalize_key_part(v)) for v in value))
+        )
+    raise TypeError(
+        f"キャッシュキーに使用できない引数です: {value_type.__name__}（key_funcを指定してください）"
+    )
+
+
+def _cache_key_namespace(func: Callable, prefix: str = "") -> str:
+    """関数ごとのキー名前空間（モジュール名まで含め、同名関数の衝突を防ぐ）"""
+    name = f"{func.__module__}.{func.__qualname__}"
+    return f"{prefix}:{name}" if prefix else name
+
+
+def build_cache_key(namespace: str, args: tuple, kwargs: dict) -> str:
+    """
+    引数から型付きのキャッシュキーを生成
 
+    JSON化・MD5を使わず、正規化した引数タプルのreprをそのままキーにする。
+    長すぎる場合のみBLAKE2bで短縮する。
+    """
+    parts = tuple(_normalize_key_part(arg) for arg in args)
+    if kwargs:
+        # キーワード引数名は常にstrのため、dictより軽い正規化で済ませる
+        items = tuple(sorted((name, _normalize_key_part(v)) for name, v in kwargs.items()))
+        parts += (_KeyContainer("kwargs", items),)
+
+    cache_key = f"{namespace}:{parts!r}"
+    if len(cache_key) > MAX_CACHE_KEY_LENGTH:
+        digest = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+        cache_key = f"{namespace}:#{digest}"
     return cache_key
 
 
@@ -134,7 +861,7 @@ def should_cache_api_response(endpoint: str, user_context: dict = None) -> tuple
         return True, 120
 
     # 会話履歴（30秒キャッシュ - 比較的新しいデータが重要）
-    if "/api/conversations" in endpoint:
+    if "/api/conversations" in endpoint or endpoint.startswith("/api/voice/history/"):
         return True, 30
 
     # リアルタイム性が重要なデータはキャッシュしない
@@ -145,8 +872,108 @@ def should_cache_api_response(endpoint: str, user_context: dict = None) -> tuple
     return False, 0
 
 
+# 認証済みトークンの保持期間（Firebase IDトークンの有効期限内でさらに短く保つ）
+AUTH_TOKEN_CACHE_TTL = 300
+# レスポンスのバージョン保持期間
+RESPONSE_VERSION_TTL = 24 * 60 * 60
+# ETag・レスポンスキャッシュは、書き込み時のバージョン更新が全ワーカーに届く場合だけ使う
+# （ワーカーごとのメモリキャッシュでは、更新していないワーカーが古い304・本文を返し続けるため）
+RESPONSE_CACHE_ENABLED = isinstance(_cache, TieredCache) or settings.WEB_CONCURRENCY <= 1
+
+
+def _token_cache_key(token: str) -> str:
+    # トークンそのものは保持せずハッシュのみをキーにする
+    return "auth_token:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+async def remember_authenticated_token(
+    token: str, user_id: str, expires_at: Optional[float] = None
+) -> None:
+    """検証済みトークンとユーザーの対応を記録（レスポンスキャッシュのユーザー特定用）"""
+    ttl = AUTH_TOKEN_CACHE_TTL
+    if expires_at is not None:
+        ttl = min(ttl, int(expires_at - time.time()))
+    if ttl > 0:
+        await _cache.set_async(_token_cache_key(token), user_id, ttl)
+
+
+async def get_authenticated_user_id(token: str) -> Optional[str]:
+    """検証済みトークンに対応するユーザーIDを取得（未検証ならNone）"""
+    return await _cache.get_async(_token_cache_key(token))
+
+
+async def _response_version(user_id: str, path: str) -> str:
+    """ユーザー・パス単位のキャッシュバージョンを取得"""
+    version_key = f"resp_ver:{user_id}:{path}"
+    version = await _cache.get_async(version_key)
+    if version is None:
+        # バージョンが追い出された場合も、古いレスポンスを返さないよう新しい値を発行
+        version = uuid.uuid4().hex[:12]
+        await _cache.set_async(version_key, version, RESPONSE_VERSION_TTL)
+    return version
+
+
+async def build_response_cache_key(user_id: str, path: str, query: str = "") -> str:
+    """ユーザー単位のレスポンスキャッシュキーを生成"""
+    return f"resp:{user_id}:{path}:{await _response_version(user_id, path)}:{query}"
+
+
+async def get_cached_response(
+    cache_key: str,
+) -> Optional[Tuple[bytes, Optional[str], Optional[str]]]:
+    """キャッシュ済みレスポンス（body, media_type, etag）を取得"""
+    return await _cache.get_async(cache_key)
+
+
+async def set_cached_response(
+    cache_key: str, body: bytes, media_type: Optional[str], etag: Optional[str], ttl: int
+) -> None:
+    """レスポンスをキャッシュ"""
+    await _cache.set_async(cache_key, (body, media_type, etag), ttl)
+
+
+# ブラウザに毎回ETagで再検証させる（ユーザー固有データのため共有キャッシュは禁止）
+ETAG_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+async def get_resource_etag(user_id: str, path: str) -> Optional[str]:
+    """
+    ユーザー・パス単位のバージョンから強いETagを生成（RESPONSE_CACHE_ENABLED でなければNone）
+
+    書き込み時に invalidate_user_responses でバージョンが更新されるため、
+    本文をシリアライズせずに変更有無を判定できる。
+    行の取得より前に呼び出すこと（取得中の更新で古い本文に新しいETagが付くのを防ぐ）。
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    return f'"{await _response_version(user_id, path)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    If-None-MatchヘッダーがETagと一致するか判定
+
+    "*" は一致とみなさない。ETagの一致を閲覧権限の証明として権限確認前に304を返すため、
+    "*" を受け付けると権限のないリソースにも304を返してしまう。
+    """
+    if not if_none_match or not etag:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+async def invalidate_user_responses(user_id: str, *paths: str) -> None:
+    """指定ユーザーの指定パスのレスポンスキャッシュを無効化（クエリ違いも含む）"""
+    if not RESPONSE_CACHE_ENABLED:
+        return
+    for path in paths:
+        await _cache.replace_async(
+            f"resp_ver:{user_id}:{path}", uuid.uuid4().hex[:12], RESPONSE_VERSION_TTL
+        )
+
+
 # 使用例のサンプル関数
-@cached(ttl=300, key_prefix="children")
+@cached(ttl=300, key_prefix="children", key_func=lambda user_id: user_id)
 def get_cached_children_data(user_id: int) -> dict:
     """子どもデータの取得（キャッシュ付き）"""
     # 実際のDB処理はここで実行される
@@ -154,7 +981,7 @@ def get_cached_children_data(user_id: int) -> dict:
     pass
 
 
-@cached(ttl=600, key_prefix="static")
+@cached(ttl=600, key_prefix="static", key_func=lambda: ())
 def get_cached_help_phrases() -> list:
     """お助けフレーズ（10分キャッシュ）"""
     # 静的コンテンツは長めのキャッシュ
@@ -163,8 +990,4 @@ def get_cached_help_phrases() -> list:
 
 def get_cache_stats() -> dict:
     """キャッシュ統計情報を取得"""
-    return {
-        "cache_size": len(_cache._cache),
-        "max_size": _cache._max_size,
-        "usage_percent": (len(_cache._cache) / _cache._max_size) * 100,
-    }
+    return _cache.stats()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import List
 
 from pydantic_settings import BaseSettings
@@ -12,6 +13,9 @@ class Settings(BaseSettings):
     # SECURITY: 本番環境では必ず環境変数から設定すること
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = "HS256"
+    # 管理API（プロファイリングなど）を利用できるユーザーのメールアドレス（カンマ区切り）
+    # Firebaseのカスタムクレーム admin: true を持つユーザーも利用できる
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
     # TODO: 本番環境での適切なデータベース接続文字列設定が必要
@@ -20,6 +24,45 @@ class Settings(BaseSettings):
     ALLOWED_HOSTS: str = os.getenv("ALLOWED_HOSTS", "http://localhost:3000,http://127.0.0.1:3000")
 
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # キャッシュバックエンド: "memory"（ワーカー単位）または "redis"（L1メモリ + L2 Redis）
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    # 多層キャッシュでL1に保持する最大秒数（無効化通知の取りこぼし対策）
+    CACHE_L1_TTL: int = int(os.getenv("CACHE_L1_TTL", "60"))
+    # プロセス内キャッシュのメモリ上限（推定バイト数）
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # ワーカープロセス数（uvicorn・gunicornは --workers 省略時にこの値を使う）
+    # 2以上でメモリキャッシュの場合、ETag・レスポンスキャッシュを無効にする
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+    # 正常リクエストの追跡ログを出力する割合（0.0〜1.0、エラー・遅延リクエストは常に出力）
+    TRACE_LOG_SAMPLE_RATE: float = float(os.getenv("TRACE_LOG_SAMPLE_RATE", "1.0"))
+
+    # 複数ワーカー時に同じアラートの通知を1回にまとめる（判定は各ワーカーが自身の記録で行う）
+    # 同一ホストのワーカーが送信記録のファイルをロックして共有する
+    MONITORING_SHARED_SUPPRESSION: bool = (
+        os.getenv("MONITORING_SHARED_SUPPRESSION", "false").lower() == "true"
+    )
+    MONITORING_NOTIFICATION_STATE_FILE: str = os.getenv(
+        "MONITORING_NOTIFICATION_STATE_FILE",
+        os.path.join(tempfile.gettempdir(), "bud-alert-notifications.json"),
+    )
+    # 複数ワーカー時に1つのワーカーだけがアラート判定を行う（同一ホストのファイルロックで選出）
+    # 判定はリーダーのワーカーの記録だけに基づく
+    MONITORING_LEADER_ELECTION: bool = (
+        os.getenv("MONITORING_LEADER_ELECTION", "false").lower() == "true"
+    )
+    MONITORING_LOCK_FILE: str = os.getenv(
+        "MONITORING_LOCK_FILE", os.path.join(tempfile.gettempdir(), "bud-monitoring.lock")
+    )
+
+    # レスポンスに処理フェーズ別の所要時間（Server-Timingヘッダー）を付ける
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+    # /metrics のスクレイプ用トークン（未設定なら /metrics を無効にする）
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # イベントループを止めた処理のスタックを記録する（監視スレッドが定期的にループの応答を確認）
+    LOOP_BLOCK_DEBUG: bool = os.getenv("LOOP_BLOCK_DEBUG", "false").lower() == "true"
 
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
@@ -38,6 +81,11 @@ class Settings(BaseSettings):
         """Convert comma-separated ALLOWED_HOSTS string to list"""
         return [host.strip() for host in self.ALLOWED_HOSTS.split(",")]
 
+    @property
+    def admin_emails_list(self) -> List[str]:
+        """Convert comma-separated ADMIN_EMAILS string to list"""
+        return [email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -4,6 +4,9 @@ from typing import AsyncGenerator
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.resource_monitor import db_monitor
 
 # 環境変数から直接DATABASE_URLを取得
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/bud")
@@ -17,14 +20,17 @@ if "+psycopg2" in DATABASE_URL:
 ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
 # 非同期エンジンの作成
+# 接続の取得待ち・保持時間を db_monitor に記録する（pool_size/max_overflow の見直し用）
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
+    poolclass=db_monitor.pool_class(AsyncAdaptedQueuePool),
     pool_size=20,
     max_overflow=30,
     pool_pre_ping=True,
     pool_recycle=3600,
     echo=False,
 )
+db_monitor.attach(async_engine)
 
 # 同期エンジン（Alembicで使用）
 sync_engine = create_engine(DATABASE_URL)
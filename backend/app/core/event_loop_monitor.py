@@ -0,0 +1,202 @@
+"""イベントループ監視 - ループの遅延計測とブロッキング処理の検出"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import Deque, Optional, Tuple
+
+from app.constants.config import MONITORING_CONFIG
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.metrics import LatencyHistogram
+
+logger = get_logger("event_loop")
+
+# スタックに含める最大フレーム数
+MAX_STACK_FRAMES = 30
+
+
+def find_request_in_stack(frame: Optional[FrameType]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    スタック上のASGIアプリのフレームから処理中のリクエストのルートとリクエストIDを求める
+
+    BaseHTTPMiddlewareの内側は別タスクで動くため、contextvarsではなく
+    スタック上のローカル変数 scope（全ミドルウェアで同じdict）から取得する。
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = getattr(scope.get("route"), "path", None) or scope.get("path")
+            request_id = scope.get("state", {}).get("request_id")
+            return route, request_id
+        frame = frame.f_back
+    return None, None
+
+
+class EventLoopMonitor:
+    """
+    イベントループの遅延監視
+
+    - 遅延計測: interval_ms ごとに sleep し、予定時刻と実際に再開した時刻の差をヒストグラムに記録
+    - ブロッキング検出（debug時）: 監視スレッドがループに定期的に合図を送り、
+      block_threshold_ms 以上応答がなければループのスレッドのスタックを取得して、
+      処理中のルート・リクエストIDとともに記録する
+    """
+
+    def __init__(
+        self,
+        interval_ms: Optional[float] = None,
+        block_threshold_ms: Optional[float] = None,
+        debug: Optional[bool] = None,
+        max_reports: int = 20,
+    ):
+        self.interval_ms = (
+            MONITORING_CONFIG["LOOP_LAG_INTERVAL_MS"] if interval_ms is None else interval_ms
+        )
+        self.block_threshold_ms = (
+            MONITORING_CONFIG["LOOP_BLOCK_THRESHOLD_MS"]
+            if block_threshold_ms is None
+            else block_threshold_ms
+        )
+        self.debug = settings.LOOP_BLOCK_DEBUG if debug is None else debug
+        self.lag_histogram = LatencyHistogram()
+        self.max_lag_ms = 0.0
+        self.blocked_count = 0
+        # 直近のブロッキング検出結果
+        self.blocking_reports: Deque[dict] = deque(maxlen=max_reports)
+
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # 応答確認を送った時刻（ループが処理するとNoneに戻る、監視スレッドとの共有）
+        self._beat_sent_at: Optional[float] = None
+        self._current_report: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _measure_lag(self) -> None:
+        interval = self.interval_ms / 1000
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.lag_histogram.record(lag_ms)
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+
+    def _beat(self) -> None:
+        """ループ上で実行される応答確認（ブロッキングが終わった時点で所要時間を確定する）"""
+        report = self._current_report
+        if report is not None and self._beat_sent_at is not None:
+            report["blocked_ms"] = round((time.monotonic() - self._beat_sent_at) * 1000, 1)
+            self._current_report = None
+        self._beat_sent_at = None
+
+    def _watch(self) -> None:
+        check_interval = self.block_threshold_ms / 2000
+        while not self._stop_event.wait(check_interval):
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                return
+            if not self.debug:
+                continue
+
+            sent_at = self._beat_sent_at
+            if sent_at is None:
+                # 前回の応答確認は処理済み。次の確認を送る
+                self._beat_sent_at = time.monotonic()
+                try:
+                    loop.call_soon_threadsafe(self._beat)
+                except RuntimeError:
+                    return
+                continue
+
+            blocked_ms = (time.monotonic() - sent_at) * 1000
+            if blocked_ms >= self.block_threshold_ms and self._current_report is None:
+                self._report_blocking(blocked_ms)
+
+    def _report_blocking(self, blocked_ms: float) -> None:
+        """ブロック中のループのスタックを取得して記録"""
+        if self._loop_thread_id is None:
+            return
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        route, request_id = find_request_in_stack(frame)
+        stack = traceback.format_stack(frame, limit=MAX_STACK_FRAMES)
+        report = {
+            "timestamp": time.time(),
+            "blocked_ms": round(blocked_ms, 1),  # ブロッキング終了時に確定値へ更新
+            "route": route,
+            "request_id": request_id,
+            "stack": stack,
+        }
+        self._current_report = report
+        self.blocking_reports.append(report)
+        self.blocked_count += 1
+        logger.warning(
+            f"Event loop blocked for {blocked_ms:.0f}ms+ "
+            f"(route: {route}, request_id: {request_id})\n{''.join(stack[-5:])}"
+        )
+
+    def start(self) -> None:
+        """監視開始（実行中のイベントループにタスクを登録し、待たずに戻る）"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat_sent_at = None
+        self._task = self._loop.create_task(self._measure_lag(), name="event-loop-lag")
+
+        self._stop_event.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """監視停止"""
+        self._stop_event.set()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+        self._loop = None
+
+    def get_stats(self) -> dict:
+        """遅延の統計と直近のブロッキング検出結果"""
+        return {
+            "debug": self.debug,
+            "interval_ms": self.interval_ms,
+            "block_threshold_ms": self.block_threshold_ms,
+            "lag_ms": self.lag_histogram.summary(),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "blocked_count": self.blocked_count,
+            "blocking_reports": list(self.blocking_reports),
+        }
+
+
+# グローバルイベントループモニター
+event_loop_monitor = EventLoopMonitor()
+
+
+def start_event_loop_monitor() -> None:
+    """イベントループ監視開始"""
+    event_loop_monitor.start()
+
+
+async def stop_event_loop_monitor() -> None:
+    """イベントループ監視停止"""
+    await event_loop_monitor.stop()
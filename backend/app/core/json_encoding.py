@@ -0,0 +1,25 @@
+"""JSONエンコード - orjsonによるAPIレスポンス・構造化ログの高速シリアライズ"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# UUID・datetime・dataclassはorjsonが直接扱う。dictの非文字列キーも許可する
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+__all__ = ["ORJSONResponse", "json_dumps", "json_dumps_bytes"]
+
+
+def json_dumps_bytes(data: Any) -> bytes:
+    """JSONバイト列に変換（未対応の型は str() で文字列化）"""
+    return orjson.dumps(data, default=str, option=_DUMPS_OPTIONS)
+
+
+def json_dumps(data: Any) -> str:
+    """
+    JSON文字列に変換（ログ出力用）
+
+    json.dumps(data, ensure_ascii=False) と同様に日本語をそのまま出力する。
+    """
+    return json_dumps_bytes(data).decode()
@@ -1,9 +1,14 @@
 """ログ設定 - サーバー状態の適切なモニタリング"""
 
+import atexit
+import copy
 import logging
 import logging.handlers
 import os
+import queue
+import threading
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 # ログディレクトリの作成
 LOG_DIR = Path("logs")
@@ -12,9 +17,99 @@ LOG_DIR.mkdir(exist_ok=True)
 # ログレベルの設定（環境変数から取得）
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# キュー経由の非同期ログ出力（ファイル書き込みをリクエスト処理から切り離す）
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+# ログキューの最大件数（超えた分は破棄してカウント）
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
-def setup_logging():
-    """アプリケーション全体のログ設定"""
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    キューが満杯のときにブロックせずレコードを破棄するQueueHandler
+
+    ファイル出力が追いつかない場合でもリクエスト処理を待たせないため、
+    溢れたレコードは捨てて件数だけを数える。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.log_queue = log_queue
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        レコードを整形せずにキューへ渡す（整形はリスナースレッドのハンドラーが行う）
+
+        既定の prepare() は呼び出し元のスレッド（イベントループ）でメッセージと例外を整形するため、
+        属性の書き換えが他のハンドラーに影響しないよう浅いコピーだけを作る。exc_info もそのまま残す。
+        """
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.log_queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """停止時の終了通知だけは、キューが満杯でも空くまで待って必ず追加する"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, **kwargs):
+        super().__init__(log_queue, *handlers, **kwargs)
+        self.log_queue = log_queue
+
+    def enqueue_sentinel(self) -> None:
+        # QueueListener の終了通知は None
+        self.log_queue.put(None)
+
+
+# 起動中のキューハンドラーとリスナー（停止・統計用）
+_queue_handlers: Dict[str, DroppingQueueHandler] = {}
+_queue_listeners: List[Tuple[logging.Logger, _QueueListener]] = []
+
+
+def _attach_queued(name: str, target: logging.Logger, *handlers: logging.Handler) -> None:
+    """ハンドラー群をバックグラウンドスレッドで処理するキューハンドラーをロガーに追加"""
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    listener = _QueueListener(queue_handler.log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    target.addHandler(queue_handler)
+    _queue_handlers[name] = queue_handler
+    _queue_listeners.append((target, listener))
+
+
+def stop_logging() -> None:
+    """キューに残ったログを書き出してリスナーを停止"""
+    while _queue_listeners:
+        target, listener = _queue_listeners.pop()
+        for queue_handler in _queue_handlers.values():
+            target.removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    _queue_handlers.clear()
+
+
+def get_logging_stats() -> Dict[str, Dict[str, int]]:
+    """ログキューごとの滞留件数・破棄件数"""
+    return {
+        name: {"queued": handler.log_queue.qsize(), "dropped": handler.dropped}
+        for name, handler in _queue_handlers.items()
+    }
+
+
+def setup_logging(use_queue: bool = LOG_QUEUE_ENABLED):
+    """
+    アプリケーション全体のログ設定
+
+    use_queue=True の場合、ハンドラーはQueueListenerのスレッドで実行され、
+    ロガー呼び出し側はキューへの追加だけで戻る。
+    """
+    # 再設定時は既存のリスナーを止めてから組み直す
+    stop_logging()
 
     # ルートロガーの設定
     root_logger = logging.getLogger()
@@ -63,13 +158,17 @@ def setup_logging():
     access_handler.setFormatter(simple_formatter)
 
     # ハンドラーをロガーに追加
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(error_handler)
+    access_logger = logging.getLogger("access")
+    if use_queue:
+        _attach_queued("root", root_logger, console_handler, file_handler, error_handler)
+        _attach_queued("access", access_logger, access_handler)
+    else:
+        root_logger.addHandler(console_handler)
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(error_handler)
+        access_logger.addHandler(access_handler)
 
     # アクセスログ用の専用ロガー
-    access_logger = logging.getLogger("access")
-    access_logger.addHandler(access_handler)
     access_logger.propagate = False
 
     # uvicornのログレベル調整
@@ -80,6 +179,10 @@ def setup_logging():
     return root_logger
 
 
+# プロセス終了時にキューの残りを書き出す
+atexit.register(stop_logging)
+
+
 # ログカテゴリ別のロガー取得関数
 def get_logger(name: str) -> logging.Logger:
     """カテゴリ別のロガーを取得"""
@@ -0,0 +1,338 @@
+"""メトリクス - ルート・ステータス別のレイテンシヒストグラムと外部API呼び出しの集計"""
+
+import math
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from starlette.types import Scope
+
+from app.constants.config import MONITORING_CONFIG
+
+# どのルートにも一致しなかったリクエスト（404など）の集計キー
+UNMATCHED_ROUTE = "__unmatched__"
+# 集計ルート数の上限を超えた分の集計キー
+OVERFLOW_ROUTE = "__overflow__"
+
+# 処理中のリクエストのASGI scope（DB接続の保持などをルート単位で記録するため）
+current_request_scope: ContextVar[Optional[Scope]] = ContextVar(
+    "current_request_scope", default=None
+)
+
+# 処理中のリクエストのフェーズ別所要時間（Server-Timingヘッダー用）
+current_request_timings: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "current_request_timings", default=None
+)
+
+# 2のべき乗区間ごとの分割数（相対誤差は最大 1/(2*SUB_BUCKETS) ≒ 3%）
+SUB_BUCKETS = 16
+# 記録できる最大値の指数（2^31マイクロ秒 ≒ 36分、それ以上は最後のバケットに入れる）
+MAX_EXPONENT = 31
+BUCKET_COUNT = MAX_EXPONENT * SUB_BUCKETS
+# メトリクス出力用の固定バケット境界（ミリ秒、値がこの値以下なら該当）
+EXPORT_BUCKETS_MS = (5, 10, 25, 50, 100, 200, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _bucket_index(value_us: float) -> int:
+    """マイクロ秒の値からバケット番号を求める（O(1)）"""
+    if value_us < 1:
+        return 0
+    mantissa, exponent = math.frexp(value_us)  # value = mantissa * 2**exponent, 0.5 <= m < 1
+    index = (exponent - 1) * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+    return min(index, BUCKET_COUNT - 1)
+
+
+def _bucket_midpoint_us(index: int) -> float:
+    """バケットの代表値（区間の中央、マイクロ秒）"""
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    width = 2.0**exponent / SUB_BUCKETS
+    return 2.0**exponent + width * (sub + 0.5)
+
+
+class LatencyHistogram:
+    """
+    HDR形式の対数バケットヒストグラム（ミリ秒で記録）
+
+    - メモリ: バケット数固定（約4KB）で、記録件数によらず一定
+    - 記録: frexpでバケットを求めるO(1)
+    - 集約: 同じバケット構成同士で加算・差分ができ、ワーカー間や期間の集計に使える
+    """
+
+    __slots__ = ("counts", "export_counts", "count", "sum_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        # 出力用バケット（EXPORT_BUCKETS_MSごと＋超過分）の件数。出力時に全バケットを走査しない
+        self.export_counts = array("Q", bytes(8 * (len(EXPORT_BUCKETS_MS) + 1)))
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def record(self, value_ms: float) -> None:
+        """レイテンシを記録"""
+        self.counts[_bucket_index(value_ms * 1000)] += 1
+        self.export_counts[bisect_left(EXPORT_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if self.max_ms is None or value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """パーセンタイル値（ミリ秒）を取得（記録がない場合はNone）"""
+        min_ms, max_ms = self.min_ms, self.max_ms
+        if not self.count or min_ms is None or max_ms is None:
+            return None
+        rank = max(1, math.ceil(quantile * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                # 実測の最小・最大を超えないよう丸める
+                value_ms = _bucket_midpoint_us(index) / 1000
+                return min(max(value_ms, min_ms), max_ms)
+        return max_ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """他のヒストグラムを加算（自身を返す）"""
+        counts = self.counts
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                counts[index] += bucket_count
+        for index, bucket_count in enumerate(other.export_counts):
+            self.export_counts[index] += bucket_count
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        for value in (other.min_ms, other.max_ms):
+            if value is not None:
+                self.min_ms = value if self.min_ms is None else min(self.min_ms, value)
+                self.max_ms = value if self.max_ms is None else max(self.max_ms, value)
+        return self
+
+    def snapshot(self) -> "LatencyHistogram":
+        """現時点のコピーを作成"""
+        return LatencyHistogram().merge(self)
+
+    def delta(self, previous: Optional["LatencyHistogram"]) -> "LatencyHistogram":
+        """previous（以前のスナップショット）以降に記録された分だけのヒストグラム"""
+        if previous is None:
+            return self.snapshot()
+        result = LatencyHistogram()
+        result.counts = array(
+            "Q", (now - before for now, before in zip(self.counts, previous.counts))
+        )
+        result.export_counts = array(
+            "Q", (now - before for now, before in zip(self.export_counts, previous.export_counts))
+        )
+        result.count = self.count - previous.count
+        result.sum_ms = self.sum_ms - previous.sum_ms
+        # 期間内の最小・最大は求められないため、バケットの範囲から近似する
+        indexes = [index for index, bucket_count in enumerate(result.counts) if bucket_count]
+        if indexes:
+            result.min_ms = _bucket_midpoint_us(indexes[0]) / 1000
+            result.max_ms = _bucket_midpoint_us(indexes[-1]) / 1000
+        return result
+
+    def summary(self) -> dict:
+        """件数・平均・パーセンタイルの要約（ミリ秒）"""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 2) if self.count else None,
+            "min_ms": self.min_ms,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+        }
+
+
+def merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    """複数のヒストグラムを合算した新しいヒストグラムを作成"""
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged
+
+
+def current_route() -> Optional[str]:
+    """処理中のリクエストのルートテンプレート（リクエスト外ならNone）"""
+    scope = current_request_scope.get()
+    if scope is None:
+        return None
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+class RequestTimings:
+    """
+    1リクエスト内の処理フェーズ（認証・DB・OpenAIなど）ごとの所要時間
+
+    同じフェーズが複数回あれば合計する。Server-Timingヘッダーとして出力すると、
+    ブラウザの開発者ツールで内訳を確認できる。
+    """
+
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, duration_ms: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration_ms
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """Server-Timingヘッダーの値（例: auth;dur=12.3, db;dur=4.5, total;dur=20.1）"""
+        entries = [f"{phase};dur={duration_ms:.1f}" for phase, duration_ms in self.phases.items()]
+        if total_ms is not None:
+            entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+def record_phase(phase: str, duration_ms: float) -> None:
+    """処理中のリクエストにフェーズの所要時間を加算（リクエスト外では何もしない）"""
+    timings = current_request_timings.get()
+    if timings is not None:
+        timings.add(phase, duration_ms)
+
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """with ブロック内の処理時間を処理中のリクエストのフェーズとして記録"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, (time.perf_counter() - start) * 1000)
+
+
+def status_class(status_code: int) -> str:
+    """ステータスコードの分類（200 -> "2xx"）"""
+    return f"{status_code // 100}xx"
+
+
+class RouteLatencyMetrics:
+    """ルートテンプレート・ステータス分類ごとのレイテンシヒストグラム"""
+
+    def __init__(self, max_routes: Optional[int] = None):
+        # route -> status_class -> histogram
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        # 記録件数の合計（変化がなければメトリクス出力で前回の文字列を再利用する）
+        self.recorded = 0
+        # 処理中のリクエスト数
+        self.in_flight = 0
+        self.max_routes = (
+            MONITORING_CONFIG["MAX_TRACKED_ROUTES"] if max_routes is None else max_routes
+        )
+
+    def record(self, route: str, status_code: int, value_ms: float) -> str:
+        """レイテンシを記録し、実際に集計したルートキーを返す"""
+        by_status = self.histograms.get(route)
+        if by_status is None:
+            if len(self.histograms) >= self.max_routes and route != UNMATCHED_ROUTE:
+                # 上限を超えたルートはまとめて集計し、メモリ使用量を一定に保つ
+                route = OVERFLOW_ROUTE
+                by_status = self.histograms.get(route)
+            if by_status is None:
+                by_status = self.histograms[route] = {}
+
+        key = status_class(status_code)
+        histogram = by_status.get(key)
+        if histogram is None:
+            histogram = by_status[key] = LatencyHistogram()
+        histogram.record(value_ms)
+        self.recorded += 1
+        return route
+
+    def route_snapshots(self) -> Dict[str, LatencyHistogram]:
+        """ルートごとに全ステータスを合算したスナップショット"""
+        return {
+            route: merge_histograms(by_status.values())
+            for route, by_status in self.histograms.items()
+        }
+
+    def summary(self) -> dict:
+        """ルート・ステータス分類ごとの要約"""
+        return {
+            route: {key: histogram.summary() for key, histogram in by_status.items()}
+            for route, by_status in self.histograms.items()
+        }
+
+
+class PhaseLatencyMetrics:
+    """ルートテンプレート・フェーズごとのレイテンシヒストグラム"""
+
+    def __init__(self):
+        # (route, phase) -> histogram
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        # 記録件数の合計（変化がなければメトリクス出力で前回の文字列を再利用する）
+        self.recorded = 0
+
+    def record(self, route: str, timings: RequestTimings) -> None:
+        """1リクエスト分のフェーズ別所要時間を記録（route は集計済みのルートキー）"""
+        for phase, duration_ms in timings.phases.items():
+            key = (route, phase)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(duration_ms)
+            self.recorded += 1
+
+    def summary(self) -> dict:
+        """ルート・フェーズごとの要約"""
+        result: Dict[str, dict] = {}
+        for (route, phase), histogram in self.histograms.items():
+            result.setdefault(route, {})[phase] = histogram.summary()
+        return result
+
+
+class ExternalCallMetrics:
+    """外部API（OpenAIなど）の呼び出しレイテンシと使用トークン数"""
+
+    def __init__(self, phase: Optional[str] = None):
+        # 呼び出し時間を処理中のリクエストのフェーズとしても記録する（Server-Timing用）
+        self.phase = phase
+        # (operation, outcome) -> histogram
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        # (operation, kind) -> tokens
+        self.tokens: Dict[Tuple[str, str], int] = {}
+
+    def record_call(self, operation: str, duration_ms: float, outcome: str = "success") -> None:
+        """呼び出し1回分のレイテンシを記録"""
+        key = (operation, outcome)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(duration_ms)
+
+    def record_usage(self, operation: str, usage: Any) -> None:
+        """レスポンスのusage（prompt_tokens / completion_tokens）を加算"""
+        if usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None) or 0
+            if tokens:
+                key = (operation, kind)
+                self.tokens[key] = self.tokens.get(key, 0) + tokens
+
+    @contextmanager
+    def measure(self, operation: str) -> Iterator[None]:
+        """with ブロック内の処理時間を記録（例外時は outcome="error"）"""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.record_call(operation, duration_ms, outcome)
+            if self.phase is not None:
+                record_phase(self.phase, duration_ms)
+
+
+# グローバルインスタンス
+route_latency_metrics = RouteLatencyMetrics()
+phase_latency_metrics = PhaseLatencyMetrics()
+openai_metrics = ExternalCallMetrics(phase="openai")
@@ -1,81 +1,238 @@
 """バックグラウンド監視タスク"""
 
-import threading
+import asyncio
+import json
+import os
 import time
+from typing import Dict, Optional, Set, TextIO
 
 from app.core.alert_monitor import alert_monitor
 from app.core.alert_notifier import notification_manager
+from app.core.config import settings
 from app.core.logging_config import get_logger
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windowsではワーカー間の排他を行わない
+    fcntl = None  # type: ignore[assignment]
+
 logger = get_logger(__name__)
 
 
-class MonitoringTask:
-    """監視タスク管理"""
+class LeaderElection:
+    """
+    同一ホストのワーカー間のリーダー選出（ファイルロック）
+
+    ロックを取得できたワーカーだけがリーダーになる。
+    リーダーのプロセスが終了するとOSがロックを解放し、次に取得を試みたワーカーが引き継ぐ。
+    """
+
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self._lock_file: Optional[TextIO] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    def try_acquire(self) -> bool:
+        """ロックの取得を試みる（取得済みならそのままTrue、他のワーカーが保持中なら待たずにFalse）"""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            return True
 
-    def __init__(self, check_interval: int = 30):
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        logger.info(f"監視タスクのリーダーになりました (pid: {os.getpid()})")
+        return True
+
+    def release(self) -> None:
+        """ロックを解放"""
+        if self._lock_file is None:
+            return
+        # ファイルを閉じるとロックも解放される
+        self._lock_file.close()
+        self._lock_file = None
+
+
+class SharedAlertSuppression:
+    """
+    同一ホストのワーカー間でのアラート通知の重複防止（ファイルロック）
+
+    アラート判定は各ワーカーが自身のカウンターで行い、通知の直前にロックを取って
+    共有ファイルの送信記録を確認する。同じルールの通知が suppression_window 秒以内に
+    他のワーカーから送られていれば送信しない。
+    """
+
+    def __init__(self, state_path: str, suppression_window: float):
+        self.state_path = state_path
+        self.suppression_window = suppression_window
+
+    def should_send(self, rule_name: str) -> bool:
+        """送信してよければ送信記録を更新してTrueを返す（ロックの保持はファイルの読み書きの間だけ）"""
+        with open(self.state_path, "a+", encoding="utf-8") as state_file:
+            if fcntl is not None:
+                # ファイルを閉じるとロックも解放される
+                fcntl.flock(state_file.fileno(), fcntl.LOCK_EX)
+            state_file.seek(0)
+            try:
+                sent_at: Dict[str, float] = json.loads(state_file.read() or "{}")
+            except ValueError:
+                sent_at = {}
+
+            now = time.time()
+            last_sent = sent_at.get(rule_name)
+            if last_sent is not None and now - last_sent < self.suppression_window:
+                return False
+
+            # 期限切れの記録は書き戻さない
+            sent_at = {
+                name: sent for name, sent in sent_at.items() if now - sent < self.suppression_window
+            }
+            sent_at[rule_name] = now
+            state_file.seek(0)
+            state_file.truncate()
+            state_file.write(json.dumps(sent_at))
+            return True
+
+
+class MonitoringTask:
+    """
+    監視タスク管理（asyncioタスク）
+
+    FastAPIのlifespanで開始・停止する。アラート判定は各ワーカーが自身のカウンターで行う。
+    - leader_election を指定した場合は、リーダーのワーカーだけが判定する
+      （判定対象はリーダーのワーカーの記録だけになる）
+    - shared_suppression を指定した場合は、同じアラートの通知を他のワーカーと重複して送らない
+    """
+
+    def __init__(
+        self,
+        check_interval: int = 30,
+        shared_suppression: Optional[SharedAlertSuppression] = None,
+        leader_election: Optional[LeaderElection] = None,
+    ):
         self.check_interval = check_interval  # 30秒間隔
-        self.running = False
-        self.thread = None
+        self.shared_suppression = shared_suppression
+        self.leader_election = leader_election
+        self._task: Optional[asyncio.Task] = None
+        # 送信中のアラート通知（停止時に完了を待つ）
+        self._notifications: Set[asyncio.Task] = set()
 
         # アラートハンドラーを登録
         alert_monitor.add_alert_handler(self.handle_alert)
 
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
     def handle_alert(self, alert_event):
         """アラート処理"""
         try:
-            # 同期版通知を使用（バックグラウンドスレッドから実行）
-            notification_manager.send_alert_sync(alert_event)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # イベントループ外から呼ばれた場合は同期版で通知
+            if self._should_send(alert_event):
+                notification_manager.send_alert_sync(alert_event)
+            return
+
+        try:
+            task = loop.create_task(self._send_alert(alert_event))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
         except Exception as e:
             logger.error(f"アラート処理エラー: {e}")
 
-    def monitoring_loop(self):
+    def _should_send(self, alert_event) -> bool:
+        """他のワーカーが同じアラートを通知済みでなければTrue"""
+        if self.shared_suppression is None:
+            return True
+        if self.shared_suppression.should_send(alert_event.rule.name):
+            return True
+        logger.debug(f"他のワーカーが通知済みのアラート: {alert_event.rule.name}")
+        return False
+
+    async def _send_alert(self, alert_event) -> None:
+        # 共有ファイルのロック待ち・読み書きでイベントループを止めないようスレッドで確認する
+        if await asyncio.to_thread(self._should_send, alert_event):
+            await notification_manager.send_alert(alert_event)
+
+    async def monitoring_loop(self):
         """監視ループ"""
         logger.info("監視タスク開始")
 
-        while self.running:
-            try:
-                # 監視チェック実行
-                alert_monitor.run_monitoring_cycle()
-                time.sleep(self.check_interval)
-            except Exception as e:
-                logger.error(f"監視ループエラー: {e}")
-                time.sleep(self.check_interval)
-
-        logger.info("監視タスク終了")
+        try:
+            while True:
+                await asyncio.sleep(self.check_interval)
+                if self.leader_election is not None and not await asyncio.to_thread(
+                    self.leader_election.try_acquire
+                ):
+                    continue
+                try:
+                    # 監視チェック実行
+                    alert_monitor.run_monitoring_cycle()
+                except Exception as e:
+                    logger.error(f"監視ループエラー: {e}")
+        finally:
+            logger.info("監視タスク終了")
 
     def start(self):
-        """監視開始"""
+        """監視開始（実行中のイベントループにタスクを登録し、待たずに戻る）"""
         if self.running:
             logger.warning("監視タスクは既に実行中です")
             return
 
-        self.running = True
-        self.thread = threading.Thread(target=self.monitoring_loop, daemon=True)
-        self.thread.start()
+        self._task = asyncio.get_running_loop().create_task(
+            self.monitoring_loop(), name="monitoring"
+        )
         logger.info(f"監視タスク開始 (チェック間隔: {self.check_interval}秒)")
 
-    def stop(self):
-        """監視停止"""
-        if not self.running:
-            return
+    async def stop(self, timeout: float = 5.0):
+        """監視停止（送信中の通知は timeout 秒まで待つ）"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
-        self.running = False
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=5)
-        logger.info("監視タスク停止")
+        if self._notifications:
+            await asyncio.wait(set(self._notifications), timeout=timeout)
 
+        if self.leader_election is not None:
+            self.leader_election.release()
+        if task is not None:
+            logger.info("監視タスク停止")
 
-# グローバル監視タスク
-monitoring_task = MonitoringTask()
 
-
-# アプリケーション起動時に監視を開始する関数
+# グローバル監視タスク
+monitoring_task = MonitoringTask(
+    shared_suppression=(
+        SharedAlertSuppression(
+            settings.MONITORING_NOTIFICATION_STATE_FILE, alert_monitor.suppression_window
+        )
+        if settings.MONITORING_SHARED_SUPPRESSION
+        else None
+    ),
+    leader_election=(
+        LeaderElection(settings.MONITORING_LOCK_FILE)
+        if settings.MONITORING_LEADER_ELECTION
+        else None
+    ),
+)
+
+
+# アプリケーション起動時（lifespan）に監視を開始する関数
 def start_monitoring():
     """監視開始"""
     monitoring_task.start()
 
 
-def stop_monitoring():
+async def stop_monitoring():
     """監視停止"""
-    monitoring_task.stop()
+    await monitoring_task.stop()
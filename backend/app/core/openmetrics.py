@@ -0,0 +1,291 @@
+"""OpenMetrics出力 - リクエスト・DBプール・キャッシュ・OpenAI呼び出しのメトリクスをテキスト形式で出力"""
+
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple, cast
+
+from sqlalchemy.pool import QueuePool
+
+from app.core.cache import get_cache_stats
+from app.core.database import async_engine
+from app.core.event_loop_monitor import EventLoopMonitor, event_loop_monitor
+from app.core.logging_config import get_logging_stats
+from app.core.metrics import (
+    EXPORT_BUCKETS_MS,
+    ExternalCallMetrics,
+    LatencyHistogram,
+    PhaseLatencyMetrics,
+    RouteLatencyMetrics,
+    openai_metrics,
+    phase_latency_metrics,
+    route_latency_metrics,
+)
+from app.core.resource_monitor import db_monitor
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape_label(value: str) -> str:
+    """ラベル値のエスケープ（バックスラッシュ・ダブルクォート・改行）"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+
+
+def _histogram_template(name: str, labels: str) -> str:
+    """ヒストグラム1系列分の出力テンプレート（値だけを % 演算子で埋める。str.format より速い）"""
+    labels = labels.replace("%", "%%")
+    bucket_prefix = f"{{{labels}," if labels else "{"
+    series_labels = f"{{{labels}}}" if labels else ""
+    lines = [f'{name}_bucket{bucket_prefix}le="{le / 1000}"}} %s' for le in EXPORT_BUCKETS_MS]
+    lines.append(f'{name}_bucket{bucket_prefix}le="+Inf"}} %s')
+    lines.append(f"{name}_count{series_labels} %s")
+    lines.append(f"{name}_sum{series_labels} %s")
+    return "\n".join(lines)
+
+
+class OpenMetricsRenderer:
+    """
+    メトリクスのテキスト出力
+
+    ヒストグラムは系列ごとにテンプレートを一度だけ組み立て、
+    前回出力から件数が変わっていない系列は前回の文字列をそのまま使う。
+    ルート別のファミリーは、前回出力から1件も記録がなければ系列の確認も省く。
+    系列数はルート数の上限で抑えられているため、キャッシュも一定量に収まる。
+
+    出力時間は変化した系列の数に比例する。約9,000系列（tests/benchmark_metrics_export.py）で
+    記録のないスクレイプは約0.1ms、ルートの1割に記録があると約0.5ms、全ルートで約2〜3msが目安。
+    1ms未満の目標はルートの1割程度までが変化した場合に限る（docs/performance.md）。
+    """
+
+    def __init__(
+        self,
+        route_metrics: RouteLatencyMetrics = route_latency_metrics,
+        external_metrics: ExternalCallMetrics = openai_metrics,
+        loop_monitor: EventLoopMonitor = event_loop_monitor,
+        phase_metrics: PhaseLatencyMetrics = phase_latency_metrics,
+    ):
+        self.route_metrics = route_metrics
+        self.phase_metrics = phase_metrics
+        self.external_metrics = external_metrics
+        self.loop_monitor = loop_monitor
+        # (name, *label_values) -> (histogram, count, text, template)
+        self._histogram_cache: Dict[Tuple[str, ...], tuple] = {}
+        # name -> (出力時の記録件数, 系列ごとの文字列)
+        self._family_cache: Dict[str, Tuple[int, List[str]]] = {}
+
+    def render(self) -> str:
+        lines: List[str] = []
+        self._render_requests(lines)
+        self._render_db_pool(lines)
+        self._render_cache(lines)
+        self._render_openai(lines)
+        self._render_logging(lines)
+        self._render_event_loop(lines)
+        lines.append("# EOF\n")
+        return "\n".join(lines)
+
+    def _render_histogram(self, name: str, histogram: LatencyHistogram, **labels: str) -> str:
+        key = (name, *labels.values())
+        cached = self._histogram_cache.get(key)
+        if cached is not None and cached[0] is histogram and cached[1] == histogram.count:
+            return cached[2]
+
+        if cached is not None:
+            template = cached[3]
+        else:
+            template = _histogram_template(name, _labels(**labels))
+        text = template % (
+            *accumulate(histogram.export_counts),
+            histogram.count,
+            histogram.sum_ms / 1000,
+        )
+        self._histogram_cache[key] = (histogram, histogram.count, text, template)
+        return text
+
+    def _render_histogram_family(
+        self,
+        lines: List[str],
+        name: str,
+        recorded: int,
+        label_names: Tuple[str, ...],
+        series: Iterable[Tuple[Tuple[str, ...], LatencyHistogram]],
+    ) -> None:
+        """
+        1ファミリー分のヒストグラム系列を追加
+
+        recorded（ファミリー全体の記録件数）が前回出力時と同じなら、
+        series を走査せずに前回の系列ごとの文字列をそのまま使う。
+        """
+        cached = self._family_cache.get(name)
+        if cached is None or cached[0] != recorded:
+            histogram_cache = self._histogram_cache
+            texts = []
+            for label_values, histogram in series:
+                entry = histogram_cache.get((name, *label_values))
+                if entry is not None and entry[0] is histogram and entry[1] == histogram.count:
+                    texts.append(entry[2])
+                else:
+                    labels = dict(zip(label_names, label_values))
+                    texts.append(self._render_histogram(name, histogram, **labels))
+            cached = self._family_cache[name] = (recorded, texts)
+        lines.extend(cached[1])
+
+    def _render_requests(self, lines: List[str]) -> None:
+        name = "bud_http_request_duration_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# UNIT {name} seconds")
+        lines.append(f"# HELP {name} HTTP response latency by route template and status class.")
+        self._render_histogram_family(
+            lines,
+            name,
+            self.route_metrics.recorded,
+            ("route", "status"),
+            (
+                ((route, status), histogram)
+                for route, by_status in self.route_metrics.histograms.items()
+                for status, histogram in by_status.items()
+            ),
+        )
+
+        name = "bud_http_request_phase_duration_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# UNIT {name} seconds")
+        lines.append(f"# HELP {name} Time spent per request phase (auth, db, openai) by route.")
+        self._render_histogram_family(
+            lines,
+            name,
+            self.phase_metrics.recorded,
+            ("route", "phase"),
+            self.phase_metrics.histograms.items(),
+        )
+
+        lines.append("# TYPE bud_http_requests_in_flight gauge")
+        lines.append("# HELP bud_http_requests_in_flight HTTP requests currently being processed.")
+        lines.append(f"bud_http_requests_in_flight {self.route_metrics.in_flight}")
+
+    def _render_db_pool(self, lines: List[str]) -> None:
+        # 非同期エンジンのプールはQueuePool系（AsyncAdaptedQueuePool）
+        pool = cast(QueuePool, async_engine.sync_engine.pool)
+        gauges = {
+            "bud_db_pool_size": ("Configured connection pool size.", pool.size()),
+            "bud_db_pool_checked_out": ("Connections currently checked out.", pool.checkedout()),
+            # QueuePoolのoverflowは未使用時に負の値になるため0で丸める
+            "bud_db_pool_overflow": (
+                "Connections opened beyond pool_size.",
+                max(0, pool.overflow()),
+            ),
+            "bud_db_connections_peak": (
+                "Peak tracked DB connections.",
+                db_monitor.peak_connections,
+            ),
+        }
+        for name, (help_text, value) in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"{name} {value}")
+
+        histograms = {
+            "bud_db_pool_wait_seconds": (
+                "Time spent waiting to check out a pooled connection.",
+                db_monitor.wait_histogram,
+            ),
+            "bud_db_connection_hold_seconds": (
+                "Time a connection stayed checked out.",
+                db_monitor.hold_histogram,
+            ),
+        }
+        for name, (help_text, histogram) in histograms.items():
+            lines.append(f"# TYPE {name} histogram")
+            lines.append(f"# UNIT {name} seconds")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(self._render_histogram(name, histogram))
+
+        # プールイベントは他のスレッドからも記録されるため、ロック中に複製してから出力する
+        with db_monitor.lock:
+            events = list(db_monitor.events.items())
+            slow_holds = [(route, stats["count"]) for route, stats in db_monitor.slow_holds.items()]
+
+        lines.append("# TYPE bud_db_pool_events counter")
+        lines.append("# HELP bud_db_pool_events Connection pool events by type.")
+        for event_name, count in events:
+            lines.append(f"bud_db_pool_events_total{{{_labels(event=event_name)}}} {count}")
+
+        name = "bud_db_slow_connection_holds"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"# HELP {name} Connections held longer than the threshold, by route.")
+        for route, hold_count in slow_holds:
+            lines.append(f"{name}_total{{{_labels(route=route)}}} {hold_count}")
+
+    def _render_cache(self, lines: List[str]) -> None:
+        stats = get_cache_stats()
+        prefixes: Dict[str, dict] = stats.get("prefixes", {})
+
+        for field in ("hits", "misses", "evictions", "expirations"):
+            name = f"bud_cache_{field}"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"# HELP {name} Cache {field} by key prefix.")
+            for prefix, prefix_stats in prefixes.items():
+                lines.append(f"{name}_total{{{_labels(prefix=prefix)}}} {prefix_stats[field]}")
+
+        lines.append("# TYPE bud_cache_hit_ratio gauge")
+        lines.append("# HELP bud_cache_hit_ratio Cache hit ratio by key prefix.")
+        for prefix, prefix_stats in prefixes.items():
+            ratio: Optional[float] = prefix_stats.get("hit_ratio")
+            if ratio is not None:
+                lines.append(f"bud_cache_hit_ratio{{{_labels(prefix=prefix)}}} {ratio}")
+
+        lines.append("# TYPE bud_cache_memory_bytes gauge")
+        lines.append("# UNIT bud_cache_memory_bytes bytes")
+        lines.append("# HELP bud_cache_memory_bytes Estimated memory used by cache entries.")
+        lines.append(f"bud_cache_memory_bytes {stats.get('memory_bytes', 0)}")
+
+    def _render_openai(self, lines: List[str]) -> None:
+        name = "bud_openai_request_duration_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# UNIT {name} seconds")
+        lines.append(f"# HELP {name} OpenAI API call latency by operation and outcome.")
+        for (operation, outcome), histogram in self.external_metrics.histograms.items():
+            lines.append(
+                self._render_histogram(name, histogram, operation=operation, outcome=outcome)
+            )
+
+        lines.append("# TYPE bud_openai_tokens counter")
+        lines.append("# HELP bud_openai_tokens OpenAI tokens used by operation and kind.")
+        for (operation, kind), tokens in self.external_metrics.tokens.items():
+            labels = _labels(operation=operation, kind=kind)
+            lines.append(f"bud_openai_tokens_total{{{labels}}} {tokens}")
+
+    def _render_logging(self, lines: List[str]) -> None:
+        stats = get_logging_stats()
+        lines.append("# TYPE bud_log_queue_depth gauge")
+        lines.append("# HELP bud_log_queue_depth Log records waiting to be written.")
+        for name, queue_stats in stats.items():
+            lines.append(f"bud_log_queue_depth{{{_labels(queue=name)}}} {queue_stats['queued']}")
+        lines.append("# TYPE bud_log_records_dropped counter")
+        lines.append("# HELP bud_log_records_dropped Log records dropped on queue overflow.")
+        for name, queue_stats in stats.items():
+            labels = _labels(queue=name)
+            lines.append(f"bud_log_records_dropped_total{{{labels}}} {queue_stats['dropped']}")
+
+    def _render_event_loop(self, lines: List[str]) -> None:
+        name = "bud_event_loop_lag_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# UNIT {name} seconds")
+        lines.append(f"# HELP {name} Delay between scheduled and actual wake-up of the lag probe.")
+        lines.append(self._render_histogram(name, self.loop_monitor.lag_histogram))
+
+        name = "bud_event_loop_blocked"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"# HELP {name} Callbacks that blocked the event loop past the threshold.")
+        lines.append(f"{name}_total {self.loop_monitor.blocked_count}")
+
+
+# グローバルインスタンス
+metrics_renderer = OpenMetricsRenderer()
+
+
+def render_openmetrics() -> str:
+    """全メトリクスをOpenMetricsテキスト形式で出力"""
+    return metrics_renderer.render()
@@ -0,0 +1,212 @@
+"""オンデマンドプロファイリング - サンプリング方式のCPUプロファイルとtracemallocの差分"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional
+
+from app.constants.config import PROFILING_CONFIG
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 差分の集計から除外するフレーム（計測自体の割り当て）
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class ProfilerBusyError(RuntimeError):
+    """同じ種類のプロファイルが既に実行中"""
+
+
+def _frame_label(frame: FrameType) -> str:
+    """collapsed形式の1フレーム分の表記（関数単位に集約するため定義行を使う）"""
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class CPUProfiler:
+    """
+    サンプリング方式のCPUプロファイラー
+
+    別スレッドが interval_ms ごとに全スレッドのスタックを取得し、
+    flamegraph.pl / speedscope で読めるcollapsed形式（"root;...;leaf 件数"）で集計する。
+    計測対象のコードには手を加えないため、オーバーヘッドはサンプリング間隔と
+    スタックの深さ（MAX_STACK_DEPTH）で決まり、計測時間も MAX_SECONDS で打ち切る。
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_depth: Optional[int] = None):
+        self.max_seconds = (
+            PROFILING_CONFIG["CPU_MAX_SECONDS"] if max_seconds is None else max_seconds
+        )
+        self.max_depth = PROFILING_CONFIG["CPU_MAX_STACK_DEPTH"] if max_depth is None else max_depth
+        self.min_interval_ms = PROFILING_CONFIG["CPU_MIN_INTERVAL_MS"]
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _collapse(self, frame: Optional[FrameType], thread_name: str) -> str:
+        labels: List[str] = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ":"))
+        return ";".join(reversed(labels))
+
+    def _sample(self, stacks: Counter, own_ident: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stacks[self._collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+
+    def profile(self, seconds: float, interval_ms: float = 10) -> Dict[str, int]:
+        """
+        seconds 秒間サンプリングしてスタックごとの件数を返す（呼び出したスレッドで待つ）
+
+        Raises:
+            ProfilerBusyError: 別のCPUプロファイルが実行中の場合
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("CPUプロファイルは既に実行中です")
+        try:
+            seconds = min(seconds, self.max_seconds)
+            interval = max(interval_ms, self.min_interval_ms) / 1000
+            own_ident = threading.get_ident()
+            stacks: Counter = Counter()
+
+            logger.info(f"CPUプロファイル開始 ({seconds}秒, 間隔: {interval * 1000:.0f}ms)")
+            deadline = time.monotonic() + seconds
+            next_sample = time.monotonic()
+            while next_sample < deadline:
+                self._sample(stacks, own_ident)
+                next_sample += interval
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            logger.info(f"CPUプロファイル終了 (サンプル数: {sum(stacks.values())})")
+            return dict(stacks)
+        finally:
+            self._lock.release()
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """スタックごとの件数をcollapsed形式のテキストにする（件数の多い順）"""
+    lines = [f"{stack} {count}" for stack, count in Counter(stacks).most_common()]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class MemoryProfiler:
+    """
+    tracemallocによる割り当ての差分計測
+
+    start() で計測を始めて基準スナップショットを取り、diff() で基準からの増加分を
+    割り当て箇所ごとに返す。tracemallocは全ての割り当てに記録のコストがかかるため、
+    max_seconds 経過後に自動で停止する。
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_frames: Optional[int] = None):
+        self.max_seconds = (
+            PROFILING_CONFIG["MEMORY_MAX_SECONDS"] if max_seconds is None else max_seconds
+        )
+        self.max_frames = (
+            PROFILING_CONFIG["MEMORY_MAX_FRAMES"] if max_frames is None else max_frames
+        )
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_at: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._baseline is not None
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+
+    def start(self, seconds: Optional[float] = None, frames: int = 1) -> dict:
+        """
+        計測開始（seconds 秒後に自動停止）
+
+        Raises:
+            ProfilerBusyError: 既に計測中、またはアプリ外でtracemallocが有効な場合
+        """
+        with self._lock:
+            if self._baseline is not None or tracemalloc.is_tracing():
+                raise ProfilerBusyError("メモリプロファイルは既に実行中です")
+
+            seconds = self.max_seconds if seconds is None else min(seconds, self.max_seconds)
+            tracemalloc.start(max(1, min(frames, self.max_frames)))
+            self._baseline = self._take_snapshot()
+            self._started_at = time.time()
+
+            self._timer = threading.Timer(seconds, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+            logger.info(f"メモリプロファイル開始 (最大{seconds}秒, フレーム数: {frames})")
+            return self.get_status()
+
+    def diff(self, limit: int = 20, group_by: str = "lineno") -> List[dict]:
+        """
+        基準スナップショットからの増加量が大きい割り当て箇所
+
+        Raises:
+            RuntimeError: 計測中でない場合
+        """
+        with self._lock:
+            if self._baseline is None:
+                raise RuntimeError("メモリプロファイルは実行されていません")
+            snapshot = self._take_snapshot()
+            stats = snapshot.compare_to(self._baseline, group_by)
+
+        return [
+            {
+                "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def stop(self) -> dict:
+        """計測停止（計測中でなければ何もしない）"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._baseline is None:
+                return self.get_status()
+            self._baseline = None
+            self._started_at = None
+            tracemalloc.stop()
+            logger.info("メモリプロファイル停止")
+            return self.get_status()
+
+    def get_status(self) -> dict:
+        """計測状態"""
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        return {
+            "running": self.running,
+            "started_at": self._started_at,
+            "max_seconds": self.max_seconds,
+            "traceback_limit": tracemalloc.get_traceback_limit() if self.running else None,
+            "traced_bytes": traced_bytes,
+            "peak_bytes": peak_bytes,
+        }
+
+
+# グローバルインスタンス
+cpu_profiler = CPUProfiler()
+memory_profiler = MemoryProfiler()
@@ -1,21 +1,207 @@
 """リソース管理とモニタリング - メモリ、I/O、DB接続の適切な管理"""
 
+import asyncio
 import gc
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Deque, Dict, List, Optional
 
 import psutil
+from sqlalchemy import event
 
+from app.constants.config import MONITORING_CONFIG
 from app.core.logging_config import get_logger
+from app.core.metrics import OVERFLOW_ROUTE, LatencyHistogram, current_route, record_phase
 
 logger = get_logger("resource_monitor")
 
 
+@dataclass(frozen=True)
+class ResourceSample:
+    """ある時点のシステムリソース（I/Oは起動時からの累積値）"""
+
+    timestamp: float  # time.time()
+    monotonic: float  # 間隔計算用
+    cpu_percent: float
+    process_cpu_percent: float
+    memory_total: int
+    memory_available: int
+    memory_percent: float
+    process_rss: int
+    disk_total: int
+    disk_free: int
+    disk_percent: float
+    net_bytes_sent: Optional[int]
+    net_bytes_recv: Optional[int]
+    disk_read_bytes: Optional[int]
+    disk_write_bytes: Optional[int]
+
+
+# 増加率を求める累積カウンター
+RATE_FIELDS = ("net_bytes_sent", "net_bytes_recv", "disk_read_bytes", "disk_write_bytes")
+# 増加率を集計する期間（秒）
+RATE_WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+# プロセスのCPU使用率は同じProcessオブジェクトの前回呼び出しとの差分で求まる
+_process = psutil.Process()
+
+
+def collect_resource_sample() -> ResourceSample:
+    """
+    システムリソースを取得（ブロックしない）
+
+    CPU使用率は前回呼び出しからの平均になるため、一定間隔で呼び出す前提。
+    """
+    process = _process
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage("/")
+    net_io = psutil.net_io_counters()
+    disk_io = psutil.disk_io_counters()
+    return ResourceSample(
+        timestamp=time.time(),
+        monotonic=time.monotonic(),
+        cpu_percent=psutil.cpu_percent(interval=None),
+        process_cpu_percent=process.cpu_percent(interval=None),
+        memory_total=memory.total,
+        memory_available=memory.available,
+        memory_percent=memory.percent,
+        process_rss=process.memory_info().rss,
+        disk_total=disk.total,
+        disk_free=disk.free,
+        disk_percent=(disk.used / disk.total) * 100,
+        net_bytes_sent=net_io.bytes_sent if net_io else None,
+        net_bytes_recv=net_io.bytes_recv if net_io else None,
+        disk_read_bytes=disk_io.read_bytes if disk_io else None,
+        disk_write_bytes=disk_io.write_bytes if disk_io else None,
+    )
+
+
+class ResourceSampler:
+    """
+    システムリソースの定期サンプリング（asyncioタスク）
+
+    psutilの呼び出しは別スレッドで一定間隔ごとに行い、結果を固定長のリングに保持する。
+    リクエスト処理は最新のサンプルを参照するだけでよく、待ち時間は発生しない。
+    """
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        history_seconds: Optional[float] = None,
+        collect: Callable[[], ResourceSample] = collect_resource_sample,
+    ):
+        self.interval_seconds = (
+            MONITORING_CONFIG["RESOURCE_SAMPLE_INTERVAL_SECONDS"]
+            if interval_seconds is None
+            else interval_seconds
+        )
+        if history_seconds is None:
+            history_seconds = MONITORING_CONFIG["RESOURCE_HISTORY_SECONDS"]
+        # 最長の集計期間の両端を含めるため1件多く持つ
+        self.history: Deque[ResourceSample] = deque(
+            maxlen=int(history_seconds // self.interval_seconds) + 1
+        )
+        self._collect = collect
+        self._task: Optional[asyncio.Task] = None
+        # サンプルを取得するたびに呼ばれる処理（しきい値のチェックなど）
+        self.listeners: List[Callable[[ResourceSample], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def sample(self) -> ResourceSample:
+        """サンプルを1件取得して履歴に追加"""
+        sample = self._collect()
+        # 初回のCPU使用率は比較対象がなく不正確なため、しきい値のチェックには使わない
+        first = not self.history
+        self.history.append(sample)
+        if first:
+            return sample
+        for listener in self.listeners:
+            try:
+                listener(sample)
+            except Exception as e:
+                logger.error(f"Resource sample listener error: {e}")
+        return sample
+
+    def latest(self) -> Optional[ResourceSample]:
+        """最新のサンプル（未取得ならNone）"""
+        history = self.history
+        return history[-1] if history else None
+
+    def rates(self, window_seconds: float) -> Optional[Dict[str, Optional[float]]]:
+        """
+        直近 window_seconds 秒のI/Oの増加率（bytes/sec）とCPU使用率の平均
+
+        履歴が期間に満たない場合は、保持している範囲で計算する。
+        """
+        history = list(self.history)
+        if len(history) < 2:
+            return None
+
+        latest = history[-1]
+        window = [s for s in history if latest.monotonic - s.monotonic <= window_seconds]
+        oldest = window[0] if len(window) >= 2 else history[-2]
+        elapsed = latest.monotonic - oldest.monotonic
+        if elapsed <= 0:
+            return None
+
+        result: Dict[str, Optional[float]] = {}
+        for field in RATE_FIELDS:
+            now, before = getattr(latest, field), getattr(oldest, field)
+            if now is None or before is None or now < before:
+                # 取得できない環境、またはカウンターのリセット
+                result[f"{field}_per_sec"] = None
+            else:
+                result[f"{field}_per_sec"] = (now - before) / elapsed
+        # 各サンプルのCPU使用率は前回サンプルからの平均なので、期間内のものを平均する
+        cpu_samples = [s.cpu_percent for s in window[1:]] or [latest.cpu_percent]
+        result["cpu_percent_avg"] = sum(cpu_samples) / len(cpu_samples)
+        result["window_seconds"] = elapsed
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception as e:
+                logger.error(f"Resource sampling error: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """サンプリング開始（実行中のイベントループにタスクを登録し、待たずに戻る）"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="resource-sampler")
+
+    async def stop(self) -> None:
+        """サンプリング停止"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+# グローバルリソースサンプラー
+resource_sampler = ResourceSampler()
+
+
+# アラートレベル（数値が大きいほど重大）
+ALERT_LEVELS = {"ok": 0, "warning": 1, "critical": 2}
+
+
 class ResourceMonitor:
     """システムリソースの監視と管理"""
 
-    def __init__(self):
-        self.alerts_sent = set()
+    def __init__(self, sampler: Optional[ResourceSampler] = None):
+        self.sampler = sampler or resource_sampler
+        # リソースごとの現在のアラートレベル（しきい値をまたいだ時だけ通知する）
+        self.alert_state: Dict[str, str] = {"memory": "ok", "cpu": "ok", "disk": "ok"}
         self.monitoring_enabled = True
 
         # リソース警告しきい値
@@ -27,113 +213,107 @@ class ResourceMonitor:
             "disk_critical": 95,  # ディスク使用率95%で重大警告
         }
 
+        # 新しいサンプルごとにしきい値をチェック
+        self.sampler.listeners.append(self._on_sample)
+
+    def _on_sample(self, sample: ResourceSample) -> None:
+        self.check_resource_alerts(self._format_sample(sample))
+
     def get_system_resources(self) -> Dict:
-        """現在のシステムリソース状況を取得"""
+        """現在のシステムリソース状況を取得（バックグラウンドで取得済みの最新サンプル）"""
         try:
-            # CPU使用率
-            cpu_percent = psutil.cpu_percent(interval=1)
-
-            # メモリ情報
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            memory_available = memory.available / (1024**3)  # GB
-
-            # ディスク情報
-            disk = psutil.disk_usage("/")
-            disk_percent = (disk.used / disk.total) * 100
-            disk_free = disk.free / (1024**3)  # GB
-
-            # プロセス情報
-            process = psutil.Process()
-            process_memory = process.memory_info().rss / (1024**2)  # MB
-            process_cpu = process.cpu_percent()
-
-            # ネットワークI/O
-            net_io = psutil.net_io_counters()
-
-            # ディスクI/O
-            disk_io = psutil.disk_io_counters()
-
-            return {
-                "timestamp": datetime.now().isoformat(),
-                "cpu": {"percent": cpu_percent, "process_percent": process_cpu},
-                "memory": {
-                    "total_gb": memory.total / (1024**3),
-                    "used_percent": memory_percent,
-                    "available_gb": memory_available,
-                    "process_mb": process_memory,
-                },
-                "disk": {
-                    "total_gb": disk.total / (1024**3),
-                    "used_percent": disk_percent,
-                    "free_gb": disk_free,
-                },
-                "network_io": (
-                    {
-                        "bytes_sent": net_io.bytes_sent if net_io else 0,
-                        "bytes_recv": net_io.bytes_recv if net_io else 0,
-                    }
-                    if net_io
-                    else None
-                ),
-                "disk_io": (
-                    {
-                        "read_bytes": disk_io.read_bytes if disk_io else 0,
-                        "write_bytes": disk_io.write_bytes if disk_io else 0,
-                    }
-                    if disk_io
-                    else None
-                ),
+            sample = self.sampler.latest()
+            if sample is None:
+                # 起動直後でまだサンプルがない場合のみその場で取得（ブロックしない）
+                sample = self.sampler.sample()
+            resources = self._format_sample(sample)
+            resources["rates"] = {
+                name: self.sampler.rates(seconds) for name, seconds in RATE_WINDOWS.items()
             }
+            return resources
 
         except Exception as e:
             logger.error(f"Resource monitoring error: {e}")
             return {"error": str(e)}
 
+    @staticmethod
+    def _format_sample(sample: ResourceSample) -> Dict:
+        return {
+            "timestamp": datetime.fromtimestamp(sample.timestamp).isoformat(),
+            "cpu": {"percent": sample.cpu_percent, "process_percent": sample.process_cpu_percent},
+            "memory": {
+                "total_gb": sample.memory_total / (1024**3),
+                "used_percent": sample.memory_percent,
+                "available_gb": sample.memory_available / (1024**3),
+                "process_mb": sample.process_rss / (1024**2),
+            },
+            "disk": {
+                "total_gb": sample.disk_total / (1024**3),
+                "used_percent": sample.disk_percent,
+                "free_gb": sample.disk_free / (1024**3),
+            },
+            "network_io": (
+                {"bytes_sent": sample.net_bytes_sent, "bytes_recv": sample.net_bytes_recv}
+                if sample.net_bytes_sent is not None
+                else None
+            ),
+            "disk_io": (
+                {"read_bytes": sample.disk_read_bytes, "write_bytes": sample.disk_write_bytes}
+                if sample.disk_read_bytes is not None
+                else None
+            ),
+        }
+
+    def _update_alert(self, resource: str, level: str, message: str) -> Optional[str]:
+        """アラートレベルを更新し、より重大なレベルに上がった時だけアラート文を返す"""
+        previous = self.alert_state[resource]
+        self.alert_state[resource] = level
+        if ALERT_LEVELS[level] <= ALERT_LEVELS[previous]:
+            return None
+
+        alert = f"{level.upper()}: {message}"
+        if level == "critical":
+            logger.critical(alert)
+        else:
+            logger.warning(alert)
+        return alert
+
     def check_resource_alerts(self, resources: Dict) -> List[str]:
-        """リソース使用量をチェックしてアラートを生成"""
+        """リソース使用量をチェックし、しきい値を新たに超えた分のアラートを生成"""
         alerts = []
 
         # メモリアラート
         memory_percent = resources.get("memory", {}).get("used_percent", 0)
         if memory_percent >= self.thresholds["memory_critical"]:
-            alert = f"CRITICAL: Memory usage {memory_percent:.1f}%"
-            if alert not in self.alerts_sent:
-                alerts.append(alert)
-                self.alerts_sent.add(alert)
-                logger.critical(alert)
+            level = "critical"
         elif memory_percent >= self.thresholds["memory_warning"]:
-            alert = f"WARNING: Memory usage {memory_percent:.1f}%"
-            if alert not in self.alerts_sent:
-                alerts.append(alert)
-                self.alerts_sent.add(alert)
-                logger.warning(alert)
+            level = "warning"
+        else:
+            level = "ok"
+        alerts.append(self._update_alert("memory", level, f"Memory usage {memory_percent:.1f}%"))
 
         # CPU警告
         cpu_percent = resources.get("cpu", {}).get("percent", 0)
-        if cpu_percent >= self.thresholds["cpu_warning"]:
-            alert = f"WARNING: High CPU usage {cpu_percent:.1f}%"
-            if alert not in self.alerts_sent:
-                alerts.append(alert)
-                self.alerts_sent.add(alert)
-                logger.warning(alert)
+        level = "warning" if cpu_percent >= self.thresholds["cpu_warning"] else "ok"
+        alerts.append(self._update_alert("cpu", level, f"High CPU usage {cpu_percent:.1f}%"))
 
         # ディスク警告
         disk_percent = resources.get("disk", {}).get("used_percent", 0)
         if disk_percent >= self.thresholds["disk_critical"]:
-            alert = f"CRITICAL: Disk usage {disk_percent:.1f}%"
-            if alert not in self.alerts_sent:
-                alerts.append(alert)
-                self.alerts_sent.add(alert)
-                logger.critical(alert)
+            level = "critical"
         elif disk_percent >= self.thresholds["disk_warning"]:
-            alert = f"WARNING: Disk usage {disk_percent:.1f}%"
-            if alert not in self.alerts_sent:
-                alerts.append(alert)
-                self.alerts_sent.add(alert)
-                logger.warning(alert)
+            level = "warning"
+        else:
+            level = "ok"
+        alerts.append(self._update_alert("disk", level, f"Disk usage {disk_percent:.1f}%"))
 
-        return alerts
+        return [alert for alert in alerts if alert is not None]
+
+    def get_active_alerts(self) -> List[str]:
+        """現在しきい値を超えているリソース（例: "memory:warning"）"""
+        return [
+            f"{resource}:{level}" for resource, level in self.alert_state.items() if level != "ok"
+        ]
 
     def force_garbage_collection(self) -> Dict:
         """メモリ使用量が高い時の強制ガベージコレクション"""
@@ -159,44 +339,198 @@ class ResourceMonitor:
 resource_monitor = ResourceMonitor()
 
 
+# プールのイベント種別（bud_db_pool_events_total のラベル）
+POOL_EVENTS = ("connect", "checkout", "checkin", "overflow", "invalidate", "close")
+# リクエスト外（バックグラウンド処理など）で取得された接続の集計キー
+BACKGROUND_ROUTE = "__background__"
+# クエリの開始時刻を保持する実行コンテキストの属性名
+_QUERY_STARTED_AT = "_bud_query_started_at"
+
+
+class MonitoredPoolMixin:
+    """
+    プールからの接続取得の待ち時間を計測するプールクラス用Mixin
+
+    取得開始を通知するプールイベントはないため connect() を計測する。
+    プールの再作成（dispose）でも引き継がれるよう、インスタンスではなくクラスで拡張する。
+    """
+
+    connection_monitor: "DatabaseConnectionMonitor"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.connection_monitor.record_wait((time.perf_counter() - start) * 1000)
+
+
 class DatabaseConnectionMonitor:
-    """データベース接続のリソース管理"""
+    """
+    データベース接続のリソース管理
+
+    attach() でエンジンのプールイベント・クエリ実行イベントに接続し、次を記録する。
+    - 取得待ち時間・保持時間のヒストグラム（pool_size/max_overflow の見直し用）
+    - connect/checkout/checkin/overflow/invalidate/close の件数
+    - slow_hold_ms 以上接続を保持したルート
+    - 処理中のリクエストの取得待ち・クエリ時間（Server-Timingの db_wait / db フェーズ）
+
+    プールイベントは複数のスレッド（同期エンジンのスレッドプール）から呼ばれるため、
+    件数・接続数の更新は lock で保護する。
+    """
 
-    def __init__(self):
+    def __init__(self, slow_hold_ms: Optional[float] = None, max_routes: Optional[int] = None):
         self.active_connections = 0
         self.peak_connections = 0
-        self.connection_history = []
+        self.connection_history: Deque[dict] = deque(maxlen=100)
+        self.slow_hold_ms = (
+            MONITORING_CONFIG["DB_SLOW_HOLD_MS"] if slow_hold_ms is None else slow_hold_ms
+        )
+        self.max_routes = (
+            MONITORING_CONFIG["MAX_TRACKED_ROUTES"] if max_routes is None else max_routes
+        )
+        self.wait_histogram = LatencyHistogram()
+        self.hold_histogram = LatencyHistogram()
+        self.events: Dict[str, int] = dict.fromkeys(POOL_EVENTS, 0)
+        # route -> {"count", "max_ms"}
+        self.slow_holds: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+        self._pool = None
+
+    def pool_class(self, base: type) -> type:
+        """接続の取得待ち時間をこのモニターに記録するプールクラスを作成"""
+        return type(
+            f"Monitored{base.__name__}",
+            (MonitoredPoolMixin, base),
+            {"connection_monitor": self},
+        )
+
+    def attach(self, engine) -> None:
+        """エンジン（同期・非同期）のプールイベントに接続"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        pool = sync_engine.pool
+        # クエリ時間は処理中のリクエストの "db" フェーズとして記録する（Server-Timing用）
+        event.listen(sync_engine, "before_cursor_execute", self._on_before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._on_after_execute)
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        event.listen(pool, "close", self._on_close)
+        self._pool = pool
+
+    def _on_before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # 開始時刻は実行ごとのコンテキストに持たせる
+        # （失敗して after_cursor_execute が呼ばれない実行の記録が、接続に残り続けないように）
+        if context is not None:
+            setattr(context, _QUERY_STARTED_AT, time.perf_counter())
+
+    def _on_after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, _QUERY_STARTED_AT, None)
+        if started is not None:
+            record_phase("db", (time.perf_counter() - started) * 1000)
+
+    def _count_event(self, name: str) -> None:
+        with self.lock:
+            self.events[name] += 1
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self._count_event("connect")
+        # QueuePoolのoverflowは pool_size を超えて開いている接続数
+        overflow = getattr(self._pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            self._count_event("overflow")
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self._count_event("checkout")
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        connection_record.info["checked_out_by"] = current_route() or BACKGROUND_ROUTE
+        self.track_connection(acquired=True)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self._count_event("checkin")
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        route = connection_record.info.pop("checked_out_by", BACKGROUND_ROUTE)
+        if checked_out_at is None:
+            # 監視開始前に取得された接続
+            return
+        self.track_connection(acquired=False)
+        self.record_hold((time.perf_counter() - checked_out_at) * 1000, route)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self._count_event("invalidate")
+
+    def _on_close(self, dbapi_connection, connection_record) -> None:
+        self._count_event("close")
+
+    def record_wait(self, wait_ms: float) -> None:
+        """プールからの接続取得の待ち時間を記録"""
+        with self.lock:
+            self.wait_histogram.record(wait_ms)
+        record_phase("db_wait", wait_ms)
+
+    def record_hold(self, hold_ms: float, route: str) -> None:
+        """接続の保持時間を記録し、長時間保持したルートを記録"""
+        with self.lock:
+            self.hold_histogram.record(hold_ms)
+            if hold_ms < self.slow_hold_ms:
+                return
+
+            stats = self.slow_holds.get(route)
+            if stats is None:
+                if len(self.slow_holds) >= self.max_routes:
+                    route = OVERFLOW_ROUTE
+                    stats = self.slow_holds.get(route)
+                if stats is None:
+                    stats = self.slow_holds[route] = {"count": 0, "max_ms": 0.0}
+            stats["count"] += 1
+            stats["max_ms"] = max(stats["max_ms"], hold_ms)
+        logger.warning(
+            f"DB connection held for {hold_ms:.0f}ms by {route} "
+            f"(threshold: {self.slow_hold_ms}ms)"
+        )
 
     def track_connection(self, acquired: bool = True):
         """接続の取得/解放を追跡"""
+        with self.lock:
+            if acquired:
+                self.active_connections += 1
+                self.peak_connections = max(self.peak_connections, self.active_connections)
+            else:
+                self.active_connections = max(0, self.active_connections - 1)
+            active = self.active_connections
+
+            # 履歴記録（最大100件）
+            self.connection_history.append(
+                {
+                    "timestamp": datetime.now(),
+                    "active_connections": active,
+                    "action": "acquire" if acquired else "release",
+                }
+            )
+
         if acquired:
-            self.active_connections += 1
-            self.peak_connections = max(self.peak_connections, self.active_connections)
-            logger.debug(f"DB connection acquired. Active: {self.active_connections}")
+            logger.debug(f"DB connection acquired. Active: {active}")
         else:
-            self.active_connections = max(0, self.active_connections - 1)
-            logger.debug(f"DB connection released. Active: {self.active_connections}")
-
-        # 履歴記録（最大100件）
-        self.connection_history.append(
-            {
-                "timestamp": datetime.now(),
-                "active_connections": self.active_connections,
-                "action": "acquire" if acquired else "release",
-            }
-        )
-
-        if len(self.connection_history) > 100:
-            self.connection_history.pop(0)
+            logger.debug(f"DB connection released. Active: {active}")
 
     def get_connection_stats(self) -> Dict:
         """接続統計を取得"""
-        return {
-            "active_connections": self.active_connections,
-            "peak_connections": self.peak_connections,
-            "history_size": len(self.connection_history),
-            "recent_activity": self.connection_history[-10:] if self.connection_history else [],
-        }
+        # パーセンタイルの計算中に記録を止めないよう、ロック中は複製だけを取る
+        with self.lock:
+            stats = {
+                "active_connections": self.active_connections,
+                "peak_connections": self.peak_connections,
+                "history_size": len(self.connection_history),
+                "recent_activity": list(self.connection_history)[-10:],
+                "events": dict(self.events),
+                "slow_holds": {route: dict(stats) for route, stats in self.slow_holds.items()},
+            }
+            wait_histogram = LatencyHistogram().merge(self.wait_histogram)
+            hold_histogram = LatencyHistogram().merge(self.hold_histogram)
+        stats["wait_ms"] = wait_histogram.summary()
+        stats["hold_ms"] = hold_histogram.summary()
+        return stats
 
 
 # グローバルDB接続モニター
@@ -213,4 +547,15 @@ def get_resource_summary() -> Dict:
         "database_connections": db_stats,
         "monitoring_enabled": resource_monitor.monitoring_enabled,
         "thresholds": resource_monitor.thresholds,
+        "active_alerts": resource_monitor.get_active_alerts(),
     }
+
+
+def start_resource_sampling() -> None:
+    """リソースのバックグラウンドサンプリング開始"""
+    resource_sampler.start()
+
+
+async def stop_resource_sampling() -> None:
+    """リソースのバックグラウンドサンプリング停止"""
+    await resource_sampler.stop()
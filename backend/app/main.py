@@ -1,25 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.api.routers import ai_feedback, auth, children, logging_control
+from app.api.routers import admin, ai_feedback, auth, children, logging_control, metrics, profiling
 from app.api.routers.voice import router as voice_router
+from app.core.cache import (
+    start_cache_invalidation_listener,
+    start_cache_purge,
+    stop_cache_invalidation_listener,
+    stop_cache_purge,
+)
 from app.core.database import get_db
-from app.utils.auth import verify_firebase_token
+from app.core.event_loop_monitor import start_event_loop_monitor, stop_event_loop_monitor
+from app.core.json_encoding import ORJSONResponse
 from app.core.logging_config import get_logger, setup_logging
-from app.core.monitoring_task import start_monitoring
+from app.core.monitoring_task import start_monitoring, stop_monitoring
+from app.core.resource_monitor import start_resource_sampling, stop_resource_sampling
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.error_handler import ErrorHandlerMiddleware
 from app.middleware.performance_monitoring import PerformanceMonitoringMiddleware
+from app.middleware.response_cache import ResponseCacheMiddleware
 from app.middleware.traceability_logging import TraceabilityMiddleware
 from app.services.user_service import UserService
+from app.utils.auth import verify_firebase_token
 
 # ログ設定の初期化
 setup_logging()
 logger = get_logger(__name__)
 
-# 監視システム開始
-start_monitoring()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動・終了時のバックグラウンド処理の管理"""
+    # 監視システム・リソースサンプリング開始（タスクを登録するだけで起動は待たせない）
+    start_monitoring()
+    start_resource_sampling()
+    start_event_loop_monitor()
+    start_cache_purge()
+
+    # 多層キャッシュ（CACHE_BACKEND=redis）のL1無効化通知の購読開始
+    # Redisへの接続でイベントループを止めないよう別スレッドで行う
+    await asyncio.to_thread(start_cache_invalidation_listener)
+
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(stop_cache_invalidation_listener)
+        await stop_cache_purge()
+        await stop_event_loop_monitor()
+        await stop_resource_sampling()
+        await stop_monitoring()
 
 
 # Pydanticモデル定義
@@ -27,12 +61,17 @@ class LoginRequest(BaseModel):
     idToken: str
 
 
-app = FastAPI(title="BUD Backend API")
+# レスポンスは標準のjsonより高速なorjsonでエンコードする
+app = FastAPI(title="BUD Backend API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # ミドルウェアを追加（順序重要：トレーサビリティ → 性能測定 → エラーハンドリング）
+# レスポンスキャッシュは最も内側に置き、キャッシュヒットも性能測定・追跡の対象にする
+# 圧縮はエラーレスポンスも含めた最終的な本文に対して行う
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(TraceabilityMiddleware)
 app.add_middleware(PerformanceMonitoringMiddleware)
 app.add_middleware(ErrorHandlerMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -90,6 +129,9 @@ app.include_router(children.router, prefix="/api/children", tags=["children"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(ai_feedback.router, prefix="/api")
 app.include_router(logging_control.router, prefix="/api/admin", tags=["admin"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(profiling.router, prefix="/api/admin", tags=["admin"])
+app.include_router(metrics.router, tags=["metrics"])
 
 # Voice Transcription API
 app.include_router(voice_router)
@@ -0,0 +1,170 @@
+"""レスポンス圧縮ミドルウェア - Accept-Encodingに応じたbrotli/gzip圧縮"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.constants.config import COMPRESSION_CONFIG
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotliは任意依存
+    brotli = None
+
+# 優先順（同じq値ならbrotliを選ぶ）
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encodingから使用する圧縮方式を選択（q=0は除外、対応なしはNone）"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """gzip/brotliの逐次圧縮（チャンクごとにフラッシュして即時送信できるようにする）"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_CONFIG["BROTLI_QUALITY"])
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: gzipヘッダー付き
+            self._zlib = zlib.compressobj(COMPRESSION_CONFIG["GZIP_LEVEL"], zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """データを圧縮し、ここまでの分をフラッシュして返す"""
+        if self._zlib is None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """残りのデータを圧縮して終端する"""
+        if self._zlib is None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+def is_compressible(headers: MutableHeaders) -> bool:
+    """圧縮対象のレスポンスか（未圧縮かつ対象のContent-Type）"""
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSION_CONFIG["COMPRESSIBLE_TYPES"])
+
+
+class CompressionMiddleware:
+    """
+    レスポンス圧縮（ASGIミドルウェア）
+
+    - Accept-Encodingでbrotli（インストール時）またはgzipを選択
+    - 本文が minimum_size 未満のレスポンスは圧縮しない
+    - StreamingResponseはチャンクごとに圧縮・フラッシュし、全体をバッファしない
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = (
+            COMPRESSION_CONFIG["MINIMUM_SIZE"] if minimum_size is None else minimum_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # http.response.start を受け取るまで送信を保留するため、受け取った時点で設定する
+        start_message: Message = {}
+        compressor: Optional[_Compressor] = None
+        # 圧縮するか決まるまで（minimum_sizeに達するまで）の本文
+        pending = b""
+        passthrough = False
+
+        async def send_start(compress: bool, more_body: bool, body: bytes = b"") -> None:
+            headers = MutableHeaders(scope=start_message)
+            if compress:
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                # 圧縮後の本文は別表現になるため、強いETagは弱いETagにする
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            elif is_compressible(headers):
+                # 小さいため圧縮しなかった場合もキャッシュがエンコーディング別に扱えるようにする
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+
+        async def send_with_compression(message: Message) -> None:
+            nonlocal start_message, compressor, pending, passthrough
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                start_message = message
+                headers = MutableHeaders(scope=message)
+                passthrough = message["status"] in (204, 304) or not is_compressible(headers)
+                if passthrough:
+                    await send(message)
+                return
+
+            if message_type != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                # ストリーミング中：チャンクごとに圧縮して送信
+                data = compressor.compress(body) if more_body else compressor.finish(body)
+                if data or not more_body:
+                    await send({"type": message_type, "body": data, "more_body": more_body})
+                return
+
+            pending += body
+            if more_body and len(pending) < self.minimum_size:
+                # 小さいチャンクは圧縮するか決まるまで保持する
+                return
+
+            if len(pending) < self.minimum_size:
+                await send_start(False, more_body)
+                await send({"type": message_type, "body": pending, "more_body": False})
+            elif not more_body:
+                data = _Compressor(encoding).finish(pending)
+                await send_start(True, False, data)
+                await send({"type": message_type, "body": data, "more_body": False})
+            else:
+                compressor = _Compressor(encoding)
+                await send_start(True, True)
+                data = compressor.compress(pending)
+                await send({"type": message_type, "body": data, "more_body": True})
+            pending = b""
+
+        await self.app(scope, receive, send_with_compression)
@@ -1,47 +1,120 @@
 """性能測定ミドルウェア - レスポンスタイムとスループット計測"""
 
 import time
-from collections import deque
-from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.constants.config import MONITORING_CONFIG
+from app.core.config import settings
 from app.core.logging_config import get_logger
+from app.core.metrics import (
+    UNMATCHED_ROUTE,
+    LatencyHistogram,
+    PhaseLatencyMetrics,
+    RequestTimings,
+    RouteLatencyMetrics,
+    current_request_scope,
+    current_request_timings,
+    merge_histograms,
+    phase_latency_metrics,
+    route_latency_metrics,
+)
 
 logger = get_logger("performance")
 
-
-class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
-    """APIレスポンスタイムとスループットを測定"""
-
-    def __init__(self, app):
-        super().__init__(app)
-        # 最近1分間のリクエスト記録
-        self.recent_requests = deque(maxlen=1000)
-        # エンドポイント別のレスポンスタイム記録
-        self.response_times: Dict[str, deque] = {}
+# 統計ログを出力する間隔（リクエスト数）
+STATS_LOG_INTERVAL = 100
+
+
+def resolve_route_template(scope: Scope) -> str:
+    """
+    リクエストに一致したルートのテンプレート（/api/children/{child_id} など）を取得
+
+    実際のパスはIDごとに異なるため、メトリクスのキーには使わない。
+    ルーティング前に応答したリクエスト（レスポンスキャッシュのヒットなど）は、
+    アプリのルート一覧と照合して求める。
+    """
+    route = scope.get("route")
+    if route is None:
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class PerformanceMonitoringMiddleware:
+    """APIレスポンスタイムとスループットを測定（ASGIミドルウェア）"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: Optional[RouteLatencyMetrics] = None,
+        phase_metrics: Optional[PhaseLatencyMetrics] = None,
+        server_timing: Optional[bool] = None,
+    ):
+        self.app = app
+        # ルートテンプレート・ステータス分類別のレイテンシヒストグラム
+        self.metrics = metrics or route_latency_metrics
+        # ルートテンプレート・処理フェーズ（認証・DB・OpenAIなど）別のレイテンシヒストグラム
+        self.phase_metrics = phase_metrics or phase_latency_metrics
+        self.server_timing = (
+            settings.SERVER_TIMING_ENABLED if server_timing is None else server_timing
+        )
         # 性能要件（docs/performance.mdより）
-        self.target_response_time = 200  # ms
-        self.target_throughput = 100  # req/sec
+        self.target_response_time = MONITORING_CONFIG["TARGET_RESPONSE_TIME_MS"]  # ms
+        self.target_throughput = MONITORING_CONFIG["TARGET_THROUGHPUT"]  # req/sec
+        # 前回の統計ログ時点のスナップショット（区間ごとのパーセンタイル算出用）
+        self._stats_baseline: Dict[str, LatencyHistogram] = {}
+        self._stats_started_at = time.monotonic()
+        self._requests_since_stats = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         # 測定開始
         start_time = time.time()
-        path = request.url.path
+        response_time = None
+        status_code = 500
+        timings = RequestTimings()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal response_time, status_code
+            if message["type"] == "http.response.start":
+                # レスポンスタイム計算（ミリ秒、ヘッダー送信までの時間）
+                response_time = (time.time() - start_time) * 1000
+                status_code = message["status"]
+                # ヘッダーに性能情報を追加
+                headers = MutableHeaders(scope=message)
+                headers["X-Response-Time"] = f"{response_time:.2f}ms"
+                if self.server_timing:
+                    headers.append("Server-Timing", timings.server_timing(response_time))
+            await send(message)
 
         # リクエスト処理
-        response = await call_next(request)
-
-        # レスポンスタイム計算（ミリ秒）
-        response_time = (time.time() - start_time) * 1000
-
-        # 記録
-        self.record_request(path, response_time)
+        self.metrics.in_flight += 1
+        scope_token = current_request_scope.set(scope)
+        timings_token = current_request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_timings.reset(timings_token)
+            current_request_scope.reset(scope_token)
+            self.metrics.in_flight -= 1
+
+        if response_time is None:
+            return
 
-        # ヘッダーに性能情報を追加
-        response.headers["X-Response-Time"] = f"{response_time:.2f}ms"
+        # 記録（実際のパスではなくルートテンプレート単位）
+        path = self.record_request(resolve_route_template(scope), status_code, response_time)
+        self.phase_metrics.record(path, timings)
 
         # 性能要件チェック
         if response_time > self.target_response_time:
@@ -50,70 +123,58 @@ class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
                 f"(target: {self.target_response_time}ms)"
             )
 
-        # 定期的に統計情報をログ出力（1分ごと）
-        if len(self.recent_requests) % 100 == 0:
+        # 定期的に統計情報をログ出力
+        self._requests_since_stats += 1
+        if self._requests_since_stats >= STATS_LOG_INTERVAL:
             await self.log_performance_stats()
 
-        return response
-
-    def record_request(self, path: str, response_time: float):
-        """リクエストを記録"""
-        now = datetime.now()
-        self.recent_requests.append(
-            {"timestamp": now, "path": path, "response_time": response_time}
-        )
-
-        # エンドポイント別の記録
-        if path not in self.response_times:
-            self.response_times[path] = deque(maxlen=100)
-        self.response_times[path].append(response_time)
+    def record_request(self, path: str, status_code: int, response_time: float) -> str:
+        """リクエストを記録し、集計先のルートキーを返す"""
+        return self.metrics.record(path, status_code, response_time)
 
     async def log_performance_stats(self):
-        """性能統計をログ出力"""
-        if not self.recent_requests:
-            return
-
-        # 直近1分間のリクエストを抽出
-        one_minute_ago = datetime.now() - timedelta(minutes=1)
-        recent = [r for r in self.recent_requests if r["timestamp"] > one_minute_ago]
-
-        if not recent:
+        """前回の出力以降の性能統計をログ出力"""
+        now = time.monotonic()
+        elapsed = max(now - self._stats_started_at, 1e-6)
+
+        # ルートごとの区間ヒストグラム（累積スナップショットの差分）
+        snapshots = self.metrics.route_snapshots()
+        intervals = {
+            path: snapshot.delta(self._stats_baseline.get(path))
+            for path, snapshot in snapshots.items()
+        }
+        self._stats_baseline = snapshots
+        self._stats_started_at = now
+        self._requests_since_stats = 0
+
+        overall = merge_histograms(intervals.values())
+        if not overall.count:
             return
 
         # スループット計算（req/sec）
-        throughput = len(recent) / 60.0
-
-        # 平均レスポンスタイム
-        avg_response_time = sum(r["response_time"] for r in recent) / len(recent)
-
-        # エンドポイント別統計
-        endpoint_stats = {}
-        for path, times in self.response_times.items():
-            if times:
-                endpoint_stats[path] = {
-                    "avg": sum(times) / len(times),
-                    "max": max(times),
-                    "min": min(times),
-                }
+        throughput = overall.count / elapsed
 
         # ログ出力
         logger.info(
             f"Performance Stats - "
             f"Throughput: {throughput:.2f} req/sec (target: {self.target_throughput}), "
-            f"Avg Response: {avg_response_time:.2f}ms (target: {self.target_response_time}ms)"
+            f"p50: {overall.percentile(0.50):.2f}ms, "
+            f"p95: {overall.percentile(0.95):.2f}ms, "
+            f"p99: {overall.percentile(0.99):.2f}ms (target: {self.target_response_time}ms)"
         )
 
         # 性能要件違反チェック
         if throughput < self.target_throughput * 0.8:
             logger.warning(f"Low throughput: {throughput:.2f} req/sec")
 
-        # エンドポイント別の詳細
-        for path, stats in endpoint_stats.items():
-            if stats["avg"] > self.target_response_time:
+        # エンドポイント別の詳細（平均では隠れる裾の遅延をp95で判定）
+        for path, histogram in intervals.items():
+            if histogram.count and histogram.percentile(0.95) > self.target_response_time:
                 logger.warning(
                     f"Endpoint {path} - "
-                    f"Avg: {stats['avg']:.2f}ms, "
-                    f"Max: {stats['max']:.2f}ms"
+                    f"p50: {histogram.percentile(0.50):.2f}ms, "
+                    f"p95: {histogram.percentile(0.95):.2f}ms, "
+                    f"p99: {histogram.percentile(0.99):.2f}ms"
                 )
 
 
@@ -121,7 +182,9 @@ def get_performance_metrics() -> Dict:
     """現在の性能メトリクスを取得（API用）"""
     # この関数は他のモジュールから呼び出し可能
     return {
-        "target_response_time_ms": 200,
-        "target_throughput_req_sec": 100,
+        "target_response_time_ms": MONITORING_CONFIG["TARGET_RESPONSE_TIME_MS"],
+        "target_throughput_req_sec": MONITORING_CONFIG["TARGET_THROUGHPUT"],
         "measurement": "Real-time monitoring enabled",
+        "routes": route_latency_metrics.summary(),
+        "phases": phase_latency_metrics.summary(),
     }
@@ -0,0 +1,102 @@
+"""レスポンスキャッシュミドルウェア - ユーザー単位のGETレスポンスキャッシュ"""
+
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import (
+    ETAG_CACHE_HEADERS,
+    RESPONSE_CACHE_ENABLED,
+    build_response_cache_key,
+    etag_matches,
+    get_authenticated_user_id,
+    get_cached_response,
+    set_cached_response,
+    should_cache_api_response,
+)
+
+
+def get_bearer_token(headers: Headers) -> str:
+    """AuthorizationヘッダーからBearerトークンを取得"""
+    auth_header = headers.get("authorization", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header[7:].strip()
+    return ""
+
+
+class ResponseCacheMiddleware:
+    """
+    should_cache_api_response で対象となるGETレスポンスを、認証ユーザー単位でキャッシュ（ASGIミドルウェア）
+
+    ユーザーはFirebase検証済みトークンの記録から特定するため、
+    未検証のトークンでは常に本処理（認証あり）を通る。
+    対象外のメソッド・パスはレスポンスに手を加えずそのまま通す。
+    ワーカー間で無効化を共有できない構成（RESPONSE_CACHE_ENABLED がFalse）では何もしない。
+    """
+
+    def __init__(self, app: ASGIApp, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = RESPONSE_CACHE_ENABLED if enabled is None else enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        should_cache, ttl = should_cache_api_response(path)
+        request_headers = Headers(scope=scope)
+        token = get_bearer_token(request_headers)
+        if not should_cache or not token:
+            await self.app(scope, receive, send)
+            return
+
+        # キャッシュヒット時は認証・DBアクセスを省略
+        # キーは本処理の前に確定させる（処理中の更新で古い本文を新しいバージョンに保存しないため）
+        cache_key: Optional[str] = None
+        user_id = await get_authenticated_user_id(token)
+        if user_id is not None:
+            query = scope.get("query_string", b"").decode("latin-1")
+            cache_key = await build_response_cache_key(user_id, path, query)
+            cached_response = await get_cached_response(cache_key)
+            if cached_response is not None:
+                body, media_type, cached_etag = cached_response
+                headers = {"X-Cache": "HIT"}
+                if cached_etag:
+                    headers.update(ETAG_CACHE_HEADERS, ETag=cached_etag)
+                    if etag_matches(request_headers.get("if-none-match"), cached_etag):
+                        response = Response(status_code=304, headers=headers)
+                        await response(scope, receive, send)
+                        return
+                response = Response(content=body, media_type=media_type, headers=headers)
+                await response(scope, receive, send)
+                return
+
+        # 本文はそのまま送りつつ、200のレスポンスだけ保存用に写しを取る
+        # 初回（トークン未記録）は保存せず、次回以降のリクエストからキャッシュする
+        body_parts: Optional[List[bytes]] = None
+        content_type: Optional[str] = None
+        etag: Optional[str] = None
+
+        async def send_with_cache(message: Message) -> None:
+            nonlocal body_parts, content_type, etag
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Cache"] = "MISS"
+                if message["status"] == 200 and cache_key is not None:
+                    body_parts = []
+                    content_type = headers.get("content-type")
+                    etag = headers.get("etag")
+            elif message["type"] == "http.response.body" and body_parts is not None:
+                body_parts.append(message.get("body", b""))
+                if not message.get("more_body", False) and cache_key is not None:
+                    # 最後のチャンクを送ってから保存する（共有キャッシュへの書き込みを待たせない）
+                    body, body_parts = b"".join(body_parts), None
+                    await send(message)
+                    await set_cached_response(cache_key, body, content_type, etag, ttl)
+                    return
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache)
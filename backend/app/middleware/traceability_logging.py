@@ -1,87 +1,190 @@
 """トレーサビリティ対応ログミドルウェア - リクエスト追跡とユーザー操作ログ"""
 
-import json
+import logging
+import random
 import time
 import uuid
-from typing import Optional
+from typing import Iterable, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.constants.config import MONITORING_CONFIG
 from app.core.alert_monitor import (
     record_auth_failure,
     record_error,
     record_security_warning,
     record_slow_request,
 )
+from app.core.config import settings
+from app.core.json_encoding import json_dumps
 from app.core.logging_config import get_logger
 
 logger = get_logger("traceability")
 
 
-class TraceabilityMiddleware(BaseHTTPMiddleware):
-    """リクエスト追跡とユーザー操作のトレーサビリティログ"""
+class _JsonMessage:
+    """ログ出力時に初めてJSON文字列化するメッセージ引数"""
 
-    async def dispatch(self, request: Request, call_next):
-        # リクエストIDを生成
-        request_id = str(uuid.uuid4())[:8]
-        start_time = time.time()
+    __slots__ = ("data",)
 
-        # リクエスト情報を取得
-        client_ip = self.get_client_ip(request)
-        user_agent = request.headers.get("user-agent", "")
-        method = request.method
-        url = str(request.url)
+    def __init__(self, data: dict):
+        self.data = data
 
-        # 認証情報の取得（可能であれば）
-        user_id = self.extract_user_info(request)
+    def __str__(self) -> str:
+        return json_dumps(self.data)
 
-        # リクエスト開始ログ
-        self.log_request_start(request_id, method, url, client_ip, user_id, user_agent)
 
-        # リクエスト処理
-        response = await call_next(request)
+class TraceLogSampler:
+    """
+    リクエスト追跡ログのサンプリング設定
 
-        # 処理時間計算
-        duration = time.time() - start_time
-        duration_ms = duration * 1000
+    - 除外パス（ヘルスチェックなど）は正常時にログを出力しない
+    - 正常リクエストは sample_rate の割合だけ開始・完了ログを出力する
+    - エラー（4xx/5xx）と遅いリクエストはサンプリングに関係なく完了ログを出力する
+    """
 
-        # アラート監視メトリクス記録
-        if response.status_code >= 500:
-            record_error()
-        elif response.status_code >= 400:
-            if response.status_code == 401 or response.status_code == 403:
-                record_auth_failure()
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        excluded_paths: Iterable[str] = (),
+        slow_request_ms: float = MONITORING_CONFIG["TRACE_SLOW_REQUEST_MS"],
+    ):
+        self.sample_rate = sample_rate
+        self.excluded_paths = frozenset(excluded_paths)
+        self.slow_request_ms = slow_request_ms
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, value: float) -> None:
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"sample_rate must be between 0.0 and 1.0: {value}")
+        self._sample_rate = value
+
+    def should_sample(self, path: str) -> bool:
+        """正常リクエストのログを出力するかを判定"""
+        if path in self.excluded_paths:
+            return False
+        rate = self._sample_rate
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def must_log(self, status_code: int, duration_ms: float) -> bool:
+        """サンプリングに関係なく出力すべきリクエストか（エラー・遅延）"""
+        return status_code >= 400 or duration_ms >= self.slow_request_ms
+
+    def get_config(self) -> dict:
+        return {
+            "sample_rate": self._sample_rate,
+            "excluded_paths": sorted(self.excluded_paths),
+            "slow_request_ms": self.slow_request_ms,
+        }
+
+
+class TraceabilityMiddleware:
+    """
+    リクエスト追跡とユーザー操作のトレーサビリティログ（ASGIミドルウェア）
+
+    BaseHTTPMiddlewareと異なりレスポンス本文をラップせず、
+    http.response.start だけを観測してステータス記録とヘッダー追加を行う。
+    """
+
+    def __init__(self, app: ASGIApp, sampler: Optional[TraceLogSampler] = None):
+        self.app = app
+        self.sampler = sampler or trace_log_sampler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # 遅いリクエストの記録
-        record_slow_request(duration_ms)
+        # リクエストIDを生成
+        request_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+        # request.state.request_id として内側の処理（イベントループ監視など）から参照できるようにする
+        scope.setdefault("state", {})["request_id"] = request_id
 
-        # レスポンス完了ログ
-        self.log_request_end(request_id, method, url, response.status_code, duration, user_id)
+        # リクエスト情報を取得
+        headers = Headers(scope=scope)
+        method = scope["method"]
 
-        # レスポンスヘッダーにリクエストIDを追加
-        response.headers["X-Request-ID"] = request_id
+        # 認証情報の取得（可能であれば）
+        user_id = self.extract_user_info(headers)
+
+        # 正常時のログはサンプリングし、INFOが無効なら組み立て自体を省く
+        sampled = logger.isEnabledFor(logging.INFO) and self.sampler.should_sample(scope["path"])
+        if sampled:
+            # リクエスト開始ログ
+            self.log_request_start(
+                request_id,
+                method,
+                str(URL(scope=scope)),
+                self.get_client_ip(headers, scope),
+                user_id,
+                headers.get("user-agent", ""),
+            )
+
+        # レスポンス開始前に例外になった場合は500として記録
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # レスポンスヘッダーにリクエストIDを追加
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
-        return response
+        try:
+            # リクエスト処理
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            # 処理時間計算（ストリーミングレスポンスは本文の送信完了まで）
+            duration = time.time() - start_time
+            duration_ms = duration * 1000
+
+            # アラート監視メトリクス記録
+            if status_code >= 500:
+                record_error()
+            elif status_code == 401 or status_code == 403:
+                record_auth_failure()
 
-    def get_client_ip(self, request: Request) -> str:
+            # 遅いリクエストの記録
+            record_slow_request(duration_ms)
+
+            # レスポンス完了ログ（エラー・遅延はサンプリング対象外なら送信元も含める）
+            if sampled or self.sampler.must_log(status_code, duration_ms):
+                self.log_request_end(
+                    request_id,
+                    method,
+                    str(URL(scope=scope)),
+                    status_code,
+                    duration,
+                    user_id,
+                    client_ip=None if sampled else self.get_client_ip(headers, scope),
+                )
+
+    def get_client_ip(self, headers: Headers, scope: Scope) -> str:
         """クライアントIPアドレスを取得"""
         # プロキシ経由の場合のIP取得
-        forwarded_for = request.headers.get("x-forwarded-for")
+        forwarded_for = headers.get("x-forwarded-for")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
 
-        real_ip = request.headers.get("x-real-ip")
+        real_ip = headers.get("x-real-ip")
         if real_ip:
             return real_ip
 
-        return request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        return client[0] if client else "unknown"
 
-    def extract_user_info(self, request: Request) -> Optional[str]:
+    def extract_user_info(self, headers: Headers) -> Optional[str]:
         """リクエストからユーザー情報を抽出"""
         try:
             # Authorizationヘッダーからユーザー情報を推定
-            auth_header = request.headers.get("authorization", "")
+            auth_header = headers.get("authorization", "")
             if auth_header.startswith("Bearer "):
                 # 実際のJWT解析は省略し、ダミーのユーザーIDを返す
                 # 本番では適切なJWT解析を実装
@@ -102,6 +205,8 @@ class TraceabilityMiddleware(BaseHTTPMiddleware):
         user_agent: str,
     ):
         """リクエスト開始ログ"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
         log_data = {
             "event": "request_start",
             "request_id": request_id,
@@ -113,7 +218,7 @@ class TraceabilityMiddleware(BaseHTTPMiddleware):
             "timestamp": time.time(),
         }
 
-        logger.info(f"REQUEST_START | {json.dumps(log_data, ensure_ascii=False)}")
+        logger.info("REQUEST_START | %s", _JsonMessage(log_data))
 
     def log_request_end(
         self,
@@ -123,8 +228,13 @@ class TraceabilityMiddleware(BaseHTTPMiddleware):
         status_code: int,
         duration: float,
         user_id: Optional[str],
+        client_ip: Optional[str] = None,
     ):
         """リクエスト完了ログ"""
+        # エラーレスポンスは警告レベル
+        level = logging.WARNING if status_code >= 400 else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
         log_data = {
             "event": "request_end",
             "request_id": request_id,
@@ -135,12 +245,18 @@ class TraceabilityMiddleware(BaseHTTPMiddleware):
             "user_id": user_id or "anonymous",
             "timestamp": time.time(),
         }
+        if client_ip is not None:
+            log_data["client_ip"] = client_ip
 
-        # エラーレスポンスは警告レベル
-        if status_code >= 400:
-            logger.warning(f"REQUEST_ERROR | {json.dumps(log_data, ensure_ascii=False)}")
-        else:
-            logger.info(f"REQUEST_END | {json.dumps(log_data, ensure_ascii=False)}")
+        event = "REQUEST_ERROR" if status_code >= 400 else "REQUEST_END"
+        logger.log(level, "%s | %s", event, _JsonMessage(log_data))
+
+
+# グローバルインスタンス
+trace_log_sampler = TraceLogSampler(
+    sample_rate=settings.TRACE_LOG_SAMPLE_RATE,
+    excluded_paths=MONITORING_CONFIG["TRACE_EXCLUDED_PATHS"],
+)
 
 
 class UserActionLogger:
@@ -158,7 +274,7 @@ class UserActionLogger:
             "timestamp": time.time(),
         }
 
-        logger.info(f"USER_ACTION | {json.dumps(log_data, ensure_ascii=False)}")
+        logger.info(f"USER_ACTION | {json_dumps(log_data)}")
 
     @staticmethod
     def log_data_access(
@@ -175,7 +291,7 @@ class UserActionLogger:
             "timestamp": time.time(),
         }
 
-        logger.info(f"DATA_ACCESS | {json.dumps(log_data, ensure_ascii=False)}")
+        logger.info(f"DATA_ACCESS | {json_dumps(log_data)}")
 
     @staticmethod
     def log_security_event(
@@ -201,11 +317,11 @@ class UserActionLogger:
             record_security_warning()
 
         if severity == "critical":
-            logger.critical(f"SECURITY_CRITICAL | {json.dumps(log_data, ensure_ascii=False)}")
+            logger.critical(f"SECURITY_CRITICAL | {json_dumps(log_data)}")
         elif severity == "warning":
-            logger.warning(f"SECURITY_WARNING | {json.dumps(log_data, ensure_ascii=False)}")
+            logger.warning(f"SECURITY_WARNING | {json_dumps(log_data)}")
         else:
-            logger.info(f"SECURITY_INFO | {json.dumps(log_data, ensure_ascii=False)}")
+            logger.info(f"SECURITY_INFO | {json_dumps(log_data)}")
 
 
 # グローバルインスタンス
@@ -5,6 +5,8 @@ from typing import Optional
 import openai
 from fastapi import HTTPException
 
+from app.core.metrics import openai_metrics
+
 
 class AIFeedbackService:
     def __init__(self):
@@ -108,7 +110,10 @@ class AIFeedbackService:
                 timeout=30.0,
             )
 
-        return await loop.run_in_executor(None, _sync_call)
+        with openai_metrics.measure("chat.completions"):
+            response = await loop.run_in_executor(None, _sync_call)
+        openai_metrics.record_usage("chat.completions", response.usage)
+        return response
 
     async def _call_openai_api_with_system(
         self,
@@ -133,4 +138,7 @@ class AIFeedbackService:
                 timeout=30.0,
             )
 
-        return await loop.run_in_executor(None, _sync_call)
+        with openai_metrics.measure("chat.completions"):
+            response = await loop.run_in_executor(None, _sync_call)
+        openai_metrics.record_usage("chat.completions", response.usage)
+        return response
@@ -0,0 +1,215 @@
+"""音声セグメント分割 - ストリーミング受信中のWAVを無音区間で切り出す"""
+
+import struct
+import sys
+from array import array
+from typing import List, Optional
+
+from app.constants.config import VOICE_CONFIG
+
+# 解析に使うフレーム長（ミリ秒）
+FRAME_MS = 30
+
+
+class WavStreamSegmenter:
+    """
+    PCM 16bit WAVをチャンク単位で受け取り、無音区間でセグメントに分割する
+
+    各セグメントは単体で再生可能なWAVとして返すため、
+    受信途中でもWhisper APIへ並列に送信できる。
+    """
+
+    def __init__(
+        self,
+        min_segment_seconds: float = VOICE_CONFIG["SEGMENT_MIN_SECONDS"],
+        max_segment_seconds: float = VOICE_CONFIG["SEGMENT_MAX_SECONDS"],
+        silence_threshold: int = VOICE_CONFIG["SILENCE_THRESHOLD"],
+        min_silence_ms: int = VOICE_CONFIG["SILENCE_MIN_MS"],
+    ):
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self.silence_threshold = silence_threshold
+        self.min_silence_ms = min_silence_ms
+
+        # ヘッダー解析前のバッファ
+        self._header = bytearray()
+        self._header_parsed = False
+
+        # フォーマット情報（ヘッダー解析後に設定）
+        self.sample_rate = 0
+        self.channels = 0
+        self._block_align = 0
+        self._frame_bytes = 0
+        self._data_remaining: Optional[int] = None
+
+        # セグメント組み立て用の状態
+        self._pending = bytearray()
+        self._segment = bytearray()
+        self._segment_has_voice = False
+        self._silent_run_bytes = 0
+        self.total_pcm_bytes = 0
+
+    @property
+    def duration_seconds(self) -> float:
+        """これまでに受信した音声の長さ（秒）"""
+        if not self._block_align:
+            return 0.0
+        return self.total_pcm_bytes / (self._block_align * self.sample_rate)
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """チャンクを追加し、確定したセグメント（WAV）を返す"""
+        if not self._header_parsed:
+            self._header.extend(chunk)
+            if not self._parse_header():
+                return []
+            chunk = bytes(self._header)
+            self._header = bytearray()
+
+        if self._data_remaining is not None:
+            chunk = chunk[: self._data_remaining]
+            self._data_remaining -= len(chunk)
+
+        self._pending.extend(chunk)
+        return self._consume_frames()
+
+    def finish(self) -> List[bytes]:
+        """受信完了時に残りの音声をセグメントとして返す"""
+        if not self._header_parsed:
+            if self._header:
+                raise ValueError("WAVヘッダーが不完全です")
+            return []
+
+        # 端数フレームも最後のセグメントに含める（端数で区切りが確定した場合もそのセグメントを返す）
+        segments = []
+        usable = len(self._pending) - len(self._pending) % self._block_align
+        if usable:
+            segment = self._append_frame(bytes(self._pending[:usable]))
+            if segment is not None:
+                segments.append(segment)
+        self._pending = bytearray()
+
+        if self._segment_has_voice:
+            segments.append(self._encode_wav(bytes(self._segment)))
+        self._reset_segment()
+        return segments
+
+    def _parse_header(self) -> bool:
+        """RIFFヘッダーを解析（データ不足ならFalse）"""
+        header = self._header
+        if len(header) < 12:
+            return False
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError("WAV(RIFF)形式ではありません")
+
+        offset = 12
+        fmt_found = False
+        while True:
+            if len(header) < offset + 8:
+                return False
+            chunk_id = bytes(header[offset : offset + 4])
+            chunk_size = struct.unpack("<I", header[offset + 4 : offset + 8])[0]
+            body_start = offset + 8
+
+            if chunk_id == b"data":
+                if not fmt_found:
+                    raise ValueError("fmtチャンクがありません")
+                # ストリーミング録音ではサイズが0や最大値のことがあるため末尾まで読む
+                if 0 < chunk_size < 0xFFFFFFFF:
+                    self._data_remaining = chunk_size
+                del header[:body_start]
+                self._header_parsed = True
+                return True
+
+            # fmtチャンクやその他のチャンクは全体が揃うまで待つ
+            padded_size = chunk_size + (chunk_size & 1)
+            if len(header) < body_start + padded_size:
+                return False
+
+            if chunk_id == b"fmt ":
+                audio_format, channels, sample_rate, _, block_align, bits = struct.unpack(
+                    "<HHIIHH", header[body_start : body_start + 16]
+                )
+                if audio_format != 1 or bits != 16:
+                    raise ValueError("PCM 16bit のWAVのみ対応しています")
+                self.channels = channels
+                self.sample_rate = sample_rate
+                self._block_align = block_align
+                frames_per_chunk = max(1, sample_rate * FRAME_MS // 1000)
+                self._frame_bytes = frames_per_chunk * block_align
+                fmt_found = True
+
+            offset = body_start + padded_size
+
+    def _consume_frames(self) -> List[bytes]:
+        """完全なフレーム単位で無音判定し、区切りが確定したセグメントを返す"""
+        segments = []
+        frame_bytes = self._frame_bytes
+        pending = self._pending
+        position = 0
+
+        while len(pending) - position >= frame_bytes:
+            frame = bytes(pending[position : position + frame_bytes])
+            position += frame_bytes
+            segment = self._append_frame(frame)
+            if segment is not None:
+                segments.append(segment)
+
+        del pending[:position]
+        return segments
+
+    def _append_frame(self, frame: bytes) -> Optional[bytes]:
+        """フレームを現在のセグメントに追加し、区切り条件を満たせばWAVを返す"""
+        samples = array("h", frame)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        peak = max(max(samples), -min(samples)) if samples else 0
+
+        self._segment.extend(frame)
+        self.total_pcm_bytes += len(frame)
+
+        if peak < self.silence_threshold:
+            self._silent_run_bytes += len(frame)
+        else:
+            self._silent_run_bytes = 0
+            self._segment_has_voice = True
+
+        bytes_per_second = self.sample_rate * self._block_align
+        segment_seconds = len(self._segment) / bytes_per_second
+        silence_ms = self._silent_run_bytes * 1000 / bytes_per_second
+
+        at_silence = (
+            segment_seconds >= self.min_segment_seconds and silence_ms >= self.min_silence_ms
+        )
+        if not at_silence and segment_seconds < self.max_segment_seconds:
+            return None
+
+        # 無音だけのセグメントは送信しない（Whisperの誤認識とAPIコストを避ける）
+        segment = self._encode_wav(bytes(self._segment)) if self._segment_has_voice else None
+        self._reset_segment()
+        return segment
+
+    def _reset_segment(self) -> None:
+        self._segment = bytearray()
+        self._segment_has_voice = False
+        self._silent_run_bytes = 0
+
+    def _encode_wav(self, pcm: bytes) -> bytes:
+        """PCMデータにWAVヘッダーを付与"""
+        byte_rate = self.sample_rate * self._block_align
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + len(pcm),
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,
+            self.channels,
+            self.sample_rate,
+            byte_rate,
+            self._block_align,
+            16,
+            b"data",
+            len(pcm),
+        )
+        return header + pcm
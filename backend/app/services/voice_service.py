@@ -1,13 +1,45 @@
+import asyncio
+import hashlib
 import os
 import tempfile
+from typing import Any, AsyncIterator, Dict, Optional
 
 import openai
 from fastapi import HTTPException
 
+from app.constants.config import VOICE_CONFIG
+from app.constants.messages import ERROR_MESSAGES
+from app.core.cache import SimpleMemoryCache
+from app.core.metrics import openai_metrics
+from app.services.audio_segmenter import WavStreamSegmenter
+
+WHISPER_MODEL = "whisper-1"
+
 
 class VoiceService:
     def __init__(self):
         self.client = None
+        # 再送された同一音声の文字起こし結果キャッシュ
+        # プライバシー保護のため音声そのものは保持せず、ハッシュとテキストのみを短時間保持する
+        self._transcription_cache = SimpleMemoryCache(
+            max_size=VOICE_CONFIG["TRANSCRIPTION_CACHE_SIZE"]
+        )
+
+    @staticmethod
+    def _transcription_cache_key(audio_hash: str) -> str:
+        return f"transcription:{WHISPER_MODEL}:{audio_hash}"
+
+    def get_cached_transcription(self, audio_hash: str) -> Optional[str]:
+        """音声ハッシュに対応する文字起こし結果を取得"""
+        return self._transcription_cache.get(self._transcription_cache_key(audio_hash))
+
+    def cache_transcription(self, audio_hash: str, text: str) -> None:
+        """文字起こし結果をハッシュと紐づけて保存"""
+        self._transcription_cache.set(
+            self._transcription_cache_key(audio_hash),
+            text,
+            ttl=VOICE_CONFIG["TRANSCRIPTION_CACHE_TTL"],
+        )
 
     def _get_client(self):
         """遅延初期化でOpenAIクライアントを取得"""
@@ -22,6 +54,11 @@ class VoiceService:
 
     async def transcribe_audio(self, audio_content: bytes, filename: str) -> str:
         """音声ファイルをテキストに変換"""
+        audio_hash = hashlib.sha256(audio_content).hexdigest()
+        cached_text = self.get_cached_transcription(audio_hash)
+        if cached_text is not None:
+            return cached_text
+
         try:
             client = self._get_client()
 
@@ -32,11 +69,15 @@ class VoiceService:
 
             # Whisper APIで音声認識
             with open(temp_file_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(model="whisper-1", file=audio_file)
+                with openai_metrics.measure("audio.transcriptions"):
+                    transcript = client.audio.transcriptions.create(
+                        model=WHISPER_MODEL, file=audio_file
+                    )
 
             # 一時ファイル削除
             os.unlink(temp_file_path)
 
+            self.cache_transcription(audio_hash, transcript.text)
             return transcript.text
 
         except Exception as e:
@@ -47,6 +88,107 @@ class VoiceService:
                     pass
             raise HTTPException(status_code=500, detail=f"音声認識エラー: {str(e)}")
 
+    async def transcribe_segment(
+        self, audio_content: bytes, filename: str, audio_hash: Optional[str] = None
+    ) -> str:
+        """音声セグメントを文字起こし（同期クライアントはスレッドで実行）"""
+        if audio_hash is None:
+            audio_hash = hashlib.sha256(audio_content).hexdigest()
+        cached_text = self.get_cached_transcription(audio_hash)
+        if cached_text is not None:
+            return cached_text
+
+        client = self._get_client()
+        loop = asyncio.get_running_loop()
+
+        def _sync_call():
+            return client.audio.transcriptions.create(
+                model=WHISPER_MODEL, file=(filename, audio_content)
+            )
+
+        try:
+            with openai_metrics.measure("audio.transcriptions"):
+                transcript = await loop.run_in_executor(None, _sync_call)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"音声認識エラー: {str(e)}")
+
+        self.cache_transcription(audio_hash, transcript.text)
+        return transcript.text
+
+    async def transcribe_stream(
+        self, chunks: AsyncIterator[bytes], audio_format: str
+    ) -> Dict[str, Any]:
+        """
+        チャンク受信しながら音声を文字起こし
+
+        WAVは無音区間で分割し、確定したセグメントから順に並列で文字起こしする。
+        無音判定ができない圧縮形式（webm等）は受信完了後にまとめて文字起こしする。
+        圧縮形式は受信しながら全体のハッシュを、WAVはセグメントごとのハッシュを計算し、
+        再送時はキャッシュから結果を返す。
+        """
+        max_size = VOICE_CONFIG["MAX_FILE_SIZE"]
+        semaphore = asyncio.Semaphore(VOICE_CONFIG["MAX_PARALLEL_SEGMENTS"])
+        segmenter = WavStreamSegmenter() if audio_format == "wav" else None
+        buffer = bytearray()
+        # 全体のハッシュは非WAVのキャッシュキーにのみ使う（WAVはセグメント単位でハッシュを取るため更新しない）
+        hasher = hashlib.sha256()
+        tasks: list[asyncio.Task] = []
+        received = 0
+
+        async def _transcribe(index: int, segment: bytes) -> str:
+            async with semaphore:
+                return await self.transcribe_segment(segment, f"segment_{index}.wav")
+
+        def _schedule(segments: list[bytes]) -> None:
+            for segment in segments:
+                tasks.append(asyncio.create_task(_transcribe(len(tasks), segment)))
+
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"音声ファイルが大きすぎます（上限: {max_size // (1024 * 1024)}MB）",
+                    )
+
+                if segmenter is None:
+                    hasher.update(chunk)
+                    buffer.extend(chunk)
+                    continue
+
+                _schedule(segmenter.feed(chunk))
+                if segmenter.duration_seconds > VOICE_CONFIG["MAX_DURATION"]:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"録音が長すぎます（上限: {VOICE_CONFIG['MAX_DURATION']}秒）",
+                    )
+
+            if segmenter is not None:
+                _schedule(segmenter.finish())
+            elif buffer:
+                tasks.append(
+                    asyncio.create_task(
+                        self.transcribe_segment(
+                            bytes(buffer), f"audio.{audio_format}", hasher.hexdigest()
+                        )
+                    )
+                )
+
+            texts = await asyncio.gather(*tasks)
+
+        except ValueError:
+            raise HTTPException(status_code=400, detail=ERROR_MESSAGES["VOICE"]["INVALID_AUDIO"])
+        finally:
+            # エラー時は未完了の文字起こしを取り消す
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # セグメント順に結合
+        transcript = " ".join(text.strip() for text in texts if text and text.strip())
+        return {"transcript": transcript, "segments": len(tasks), "bytes_received": received}
+
     # ❌ generate_feedback() メソッドを削除
     # 今後はai_feedback_service.pyを使用
 
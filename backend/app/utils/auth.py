@@ -8,6 +8,10 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import auth, credentials
 
+from app.core.cache import remember_authenticated_token
+from app.core.config import settings
+from app.core.metrics import timed_phase
+
 # 1. Firebase初期化（最初に1回だけ）
 if not firebase_admin._apps:
     try:
@@ -60,8 +64,9 @@ async def get_current_user(
     token = token_credentials.credentials
 
     try:
-        # Firebase Admin SDKでトークン検証
-        decoded_token = auth.verify_id_token(token)
+        # Firebase Admin SDKでトークン検証（Server-Timingの auth フェーズとして記録）
+        with timed_phase("auth"):
+            decoded_token = auth.verify_id_token(token)
 
         # 検証成功！ユーザー情報を返す
         user_info = {
@@ -69,8 +74,12 @@ async def get_current_user(
             "email": decoded_token.get("email", ""),
             "name": decoded_token.get("name", ""),
             "email_verified": decoded_token.get("email_verified", False),
+            "is_admin": is_admin(decoded_token),
         }
 
+        # レスポンスキャッシュでユーザーを特定できるよう検証済みトークンを記録
+        await remember_authenticated_token(token, user_info["user_id"], decoded_token.get("exp"))
+
         print(f"✅ 認証成功: {user_info['email']}")
         return user_info
 
@@ -102,7 +111,34 @@ async def get_current_user_optional(
         return None
 
 
-# 5. トークンのみを検証する関数（main.py用）
+# 5. 管理者のみ許可する認証（管理API用）
+def is_admin(decoded_token: Dict[str, Any]) -> bool:
+    """カスタムクレーム admin: true、またはADMIN_EMAILSに含まれる確認済みメールアドレスなら管理者"""
+    if decoded_token.get("admin") is True:
+        return True
+    email = (decoded_token.get("email") or "").lower()
+    return (
+        bool(email)
+        and decoded_token.get("email_verified", False)
+        and email in settings.admin_emails_list
+    )
+
+
+async def get_admin_user(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    管理者のユーザー情報を返す
+
+    Raises:
+        HTTPException: 管理者でない場合（403）
+    """
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="管理者権限が必要です")
+    return current_user
+
+
+# 6. トークンのみを検証する関数（main.py用）
 async def verify_firebase_token(token: str) -> Dict[str, Any]:
     """
     Firebaseトークンを検証してデコード済みトークンを返す
@@ -0,0 +1,54 @@
+"""キャッシュのマイクロベンチマーク - エントリ数ごとの1操作あたりの処理時間
+
+実行例:
+    python tests/benchmark_cache.py
+"""
+
+import sys
+import time
+
+sys.path.append(".")
+
+from app.core.cache import SimpleMemoryCache  # noqa: E402
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def _per_op_ns(func, count: int) -> float:
+    start = time.perf_counter()
+    func(count)
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def run_benchmark(size: int) -> dict:
+    cache = SimpleMemoryCache(max_size=size)
+    keys = [f"key:{i}" for i in range(size * 2)]
+
+    def fill(count):
+        for key in keys[:count]:
+            cache.set(key, 1, ttl=300)
+
+    def get_hit(count):
+        for key in keys[:count]:
+            cache.get(key)
+
+    def set_under_pressure(count):
+        # 満杯の状態で新規キーを追加（毎回LRU追い出しが発生）
+        for key in keys[size : size + count]:
+            cache.set(key, 1, ttl=300)
+
+    fill_ns = _per_op_ns(fill, size)
+    get_ns = _per_op_ns(get_hit, size)
+    evict_ns = _per_op_ns(set_under_pressure, size)
+
+    return {"size": size, "set_ns": fill_ns, "get_ns": get_ns, "set_evict_ns": evict_ns}
+
+
+if __name__ == "__main__":
+    print(f"{'entries':>10} {'set(ns)':>10} {'get(ns)':>10} {'set+evict(ns)':>14}")
+    for size in SIZES:
+        result = run_benchmark(size)
+        print(
+            f"{result['size']:>10,} {result['set_ns']:>10.0f} "
+            f"{result['get_ns']:>10.0f} {result['set_evict_ns']:>14.0f}"
+        )
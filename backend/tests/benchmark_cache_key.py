@@ -0,0 +1,56 @@
+"""キャッシュキー生成のマイクロベンチマーク - 旧実装（JSON + MD5）との1回あたりの比較
+
+実行例:
+    python tests/benchmark_cache_key.py
+"""
+
+import hashlib
+import json
+import sys
+import time
+import uuid
+
+sys.path.append(".")
+
+from app.core.cache import build_cache_key  # noqa: E402
+
+ITERATIONS = 200_000
+
+CASES = {
+    "no args": ((), {}),
+    "user_id": (("firebase-uid-0123456789",), {}),
+    "uuid + int": ((uuid.uuid4(), 20), {}),
+    "kwargs": (("user1",), {"limit": 20, "offset": 40, "order": "desc"}),
+}
+
+
+def legacy_generate_cache_key(func_name: str, args: tuple, kwargs: dict, prefix: str = "") -> str:
+    """変更前の _generate_cache_key（比較用）"""
+    args_str = json.dumps([str(arg) for arg in args], sort_keys=True)
+    kwargs_str = json.dumps(kwargs, sort_keys=True, default=str)
+
+    combined = f"{func_name}:{args_str}:{kwargs_str}"
+    cache_key = hashlib.md5(combined.encode()).hexdigest()
+
+    if prefix:
+        cache_key = f"{prefix}:{cache_key}"
+
+    return cache_key
+
+
+def _per_call_ns(func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (time.perf_counter() - start) / ITERATIONS * 1e9
+
+
+if __name__ == "__main__":
+    namespace = "children:app.services.child_service.get_children"
+    print(f"{'case':>12} {'legacy(ns)':>12} {'typed(ns)':>12} {'speedup':>8}")
+    for name, (args, kwargs) in CASES.items():
+        legacy_ns = _per_call_ns(
+            legacy_generate_cache_key, "get_children", args, kwargs, "children"
+        )
+        typed_ns = _per_call_ns(build_cache_key, namespace, args, kwargs)
+        print(f"{name:>12} {legacy_ns:>12.0f} {typed_ns:>12.0f} {legacy_ns / typed_ns:>7.1f}x")
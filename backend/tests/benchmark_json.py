@@ -0,0 +1,102 @@
+"""JSONエンコードのベンチマーク - 音声履歴（500件）のレスポンスとトレースログ
+
+標準json（jsonable_encoder + JSONResponse）とorjsonの1回あたりの処理時間と
+エンコード中に確保したメモリのピーク（tracemalloc）を比較する。
+
+実行例:
+    python tests/benchmark_json.py
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(".")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core.json_encoding import ORJSONResponse, json_dumps  # noqa: E402
+
+CHALLENGES = 500
+ITERATIONS = 200
+
+
+def history_payload() -> dict:
+    """GET /api/voice/history/{child_id} と同じ形のレスポンス"""
+    now = datetime.now(timezone.utc)
+    return {
+        "child_id": str(uuid.uuid4()),
+        "transcripts": [
+            {
+                "id": uuid.uuid4(),
+                "transcript": f"Hello, my name is Taro. I like apples and bananas. ({i})",
+                "ai_feedback": "「りんご」と「バナナ」をはっきり言えていて、とても上手でしたね！"
+                "つぎは好きな色も英語で言ってみよう。",
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(CHALLENGES)
+        ],
+    }
+
+
+def trace_log_payload() -> dict:
+    """REQUEST_END ログと同じ形のデータ"""
+    return {
+        "event": "request_end",
+        "request_id": "1a2b3c4d",
+        "method": "GET",
+        "url": "http://localhost:8000/api/voice/history/2f1c0e4e-8d1a-4b7a-9a53-0c1f0f6e2d11",
+        "status_code": 200,
+        "duration_ms": 12.34,
+        "user_id": "user_from_token",
+        "timestamp": time.time(),
+    }
+
+
+def measure(encode, iterations: int) -> dict:
+    encode()  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode()
+    elapsed = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    encode()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us": elapsed * 1e6, "peak_kb": peak / 1024}
+
+
+def main() -> None:
+    history = history_payload()
+    log_data = trace_log_payload()
+
+    cases = {
+        "history: jsonable_encoder + json": (
+            lambda: JSONResponse(jsonable_encoder(history)).body,
+            ITERATIONS,
+        ),
+        "history: jsonable_encoder + orjson": (
+            lambda: ORJSONResponse(jsonable_encoder(history)).body,
+            ITERATIONS,
+        ),
+        "history: orjson direct": (lambda: ORJSONResponse(history).body, ITERATIONS),
+        "log: json.dumps": (
+            lambda: json.dumps(log_data, ensure_ascii=False),
+            ITERATIONS * 100,
+        ),
+        "log: json_dumps (orjson)": (lambda: json_dumps(log_data), ITERATIONS * 100),
+    }
+
+    print(f"{'case':>36} {'per call(us)':>13} {'peak(KB)':>9}")
+    for name, (encode, iterations) in cases.items():
+        result = measure(encode, iterations)
+        print(f"{name:>36} {result['us']:>13.1f} {result['peak_kb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""ログ出力のベンチマーク - 同期ファイル出力とキュー経由出力でのリクエストレイテンシ比較
+
+TraceabilityMiddleware（1リクエストあたり2行のログ）を通したアプリに、
+同時実行のリクエストを流してレイテンシを計測する。
+遅いディスク（NFSやコンテナのオーバーレイなど）を想定し、
+ファイル書き込み1回ごとに SLOW_DISK_MS の待ちを入れた場合も計測する。
+
+実行例:
+    python tests/benchmark_logging.py
+"""
+
+import asyncio
+import logging
+import logging.handlers
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(".")
+
+from benchmark_middleware import create_app, run_request  # noqa: E402
+
+from app.core import logging_config  # noqa: E402
+from app.middleware.traceability_logging import TraceabilityMiddleware  # noqa: E402
+
+CONCURRENCY = 50
+BATCHES = 40
+SLOW_DISK_MS = 0.5
+
+
+async def measure(app) -> list:
+    latencies = []
+
+    async def timed():
+        start = time.perf_counter()
+        await run_request(app)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for _ in range(BATCHES):
+        await asyncio.gather(*(timed() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+def slow_emit(original_emit):
+    """ファイル書き込みごとに待ちを入れる（遅いディスクの再現）"""
+
+    def emit(self, record):
+        time.sleep(SLOW_DISK_MS / 1000)
+        original_emit(self, record)
+
+    return emit
+
+
+def run(use_queue: bool) -> dict:
+    with tempfile.TemporaryDirectory() as log_dir:
+        logging_config.LOG_DIR = Path(log_dir)
+        logging_config.setup_logging(use_queue=use_queue)
+        try:
+            start = time.perf_counter()
+            latencies = sorted(asyncio.run(measure(create_app([TraceabilityMiddleware]))))
+            elapsed = time.perf_counter() - start
+        finally:
+            logging_config.stop_logging()
+            for handler in logging.getLogger().handlers[:]:
+                logging.getLogger().removeHandler(handler)
+                handler.close()
+
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "throughput": len(latencies) / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    # コンソール出力は計測対象外にする
+    sys.stderr = open(os.devnull, "w")
+    print(f"{'disk':>6} {'handlers':>10} {'p50(ms)':>9} {'p99(ms)':>9} {'req/sec':>9}")
+    original_emit = logging.handlers.RotatingFileHandler.emit
+    for disk in ("fast", "slow"):
+        if disk == "slow":
+            logging.handlers.RotatingFileHandler.emit = slow_emit(original_emit)
+        for label, use_queue in (("sync", False), ("queue", True)):
+            result = run(use_queue)
+            print(
+                f"{disk:>6} {label:>10} {result['p50']:>9.2f} {result['p99']:>9.2f} "
+                f"{result['throughput']:>9.0f}"
+            )
+    logging.handlers.RotatingFileHandler.emit = original_emit
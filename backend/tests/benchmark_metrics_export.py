@@ -0,0 +1,72 @@
+"""メトリクス出力のベンチマーク - 数千系列のOpenMetrics出力にかかる時間
+
+実行例:
+    python tests/benchmark_metrics_export.py
+"""
+
+import random
+import sys
+import time
+
+sys.path.append(".")
+
+from app.core.metrics import ExternalCallMetrics, RouteLatencyMetrics  # noqa: E402
+from app.core.openmetrics import OpenMetricsRenderer  # noqa: E402
+
+ROUTES = 200
+STATUSES = (200, 404, 500)
+RENDERS = 200
+# 前回出力からリクエストがあったルートの割合 -> 1回の出力時間の上限（ms）
+# 1ms未満の目標はルートの1割程度までが変化した場合に限り、それ以上は変化した系列の数に比例して増える
+BUDGET_MS = {0.0: 1.0, 0.1: 1.0, 0.5: 2.5, 1.0: 4.0}
+
+
+def build_renderer() -> tuple:
+    rng = random.Random(0)
+    route_metrics = RouteLatencyMetrics(max_routes=ROUTES)
+    external_metrics = ExternalCallMetrics()
+    for i in range(ROUTES):
+        for status in STATUSES:
+            for _ in range(20):
+                route_metrics.record(f"/api/route_{i}/{{item_id}}", status, rng.expovariate(0.02))
+    for operation in ("chat.completions", "audio.transcriptions"):
+        for _ in range(100):
+            external_metrics.record_call(operation, rng.uniform(300, 3000))
+    return route_metrics, OpenMetricsRenderer(route_metrics, external_metrics)
+
+
+def per_render_ms(renderer: OpenMetricsRenderer, before_each=None) -> float:
+    elapsed = 0.0
+    for _ in range(RENDERS):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        renderer.render()
+        elapsed += time.perf_counter() - start
+    return elapsed / RENDERS * 1000
+
+
+if __name__ == "__main__":
+    route_metrics, renderer = build_renderer()
+    text = renderer.render()
+    series = sum(1 for line in text.splitlines() if not line.startswith("#"))
+    rng = random.Random(1)
+
+    def touch_routes(fraction: float):
+        # スクレイプ間隔の間にリクエストがあったルートを模擬
+        def touch():
+            for route in list(route_metrics.histograms):
+                if rng.random() < fraction:
+                    route_metrics.record(route, 200, rng.expovariate(0.02))
+
+        return touch
+
+    print(f"series: {series:,}")
+    print(f"{'changed routes':>15} {'render(ms)':>11} {'budget(ms)':>11}")
+    over_budget = []
+    for fraction, budget_ms in BUDGET_MS.items():
+        render_ms = per_render_ms(renderer, touch_routes(fraction))
+        print(f"{fraction:>15.0%} {render_ms:>11.3f} {budget_ms:>11.1f}")
+        if render_ms > budget_ms:
+            over_budget.append(fraction)
+    assert not over_budget, f"出力時間が上限を超えました（変化したルートの割合: {over_budget}）"
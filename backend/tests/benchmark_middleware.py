@@ -0,0 +1,149 @@
+"""ミドルウェアのベンチマーク - BaseHTTPMiddleware版とASGI版の1リクエストあたりのオーバーヘッド
+
+HTTPサーバーを介さず、ASGIアプリをプロセス内で直接呼び出して計測する。
+ログ出力の影響を除くため、計測中はログを無効化する。
+
+実行例:
+    python tests/benchmark_middleware.py
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+sys.path.append(".")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.error_handler import ErrorHandlerMiddleware  # noqa: E402
+from app.middleware.performance_monitoring import PerformanceMonitoringMiddleware  # noqa: E402
+from app.middleware.traceability_logging import TraceabilityMiddleware  # noqa: E402
+
+REQUESTS = 5_000
+
+
+class LegacyTraceabilityMiddleware(BaseHTTPMiddleware):
+    """変更前のTraceabilityMiddleware相当（比較用）"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.impl = TraceabilityMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        client_ip = self.impl.get_client_ip(request.headers, request.scope)
+        user_id = self.impl.extract_user_info(request.headers)
+        url = str(request.url)
+        self.impl.log_request_start("bench", request.method, url, client_ip, user_id, "")
+        response = await call_next(request)
+        duration = time.time() - start_time
+        self.impl.log_request_end("bench", request.method, url, 200, duration, user_id)
+        response.headers["X-Request-ID"] = "bench"
+        return response
+
+
+class LegacyPerformanceMonitoringMiddleware(BaseHTTPMiddleware):
+    """変更前のPerformanceMonitoringMiddleware相当（比較用）"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.impl = PerformanceMonitoringMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response_time = (time.time() - start_time) * 1000
+        self.impl.record_request(request.url.path, response.status_code, response_time)
+        response.headers["X-Response-Time"] = f"{response_time:.2f}ms"
+        return response
+
+
+class LegacyErrorHandlerMiddleware(BaseHTTPMiddleware):
+    """変更前のErrorHandlerMiddleware相当（比較用）"""
+
+    async def dispatch(self, request: Request, call_next):
+        return await call_next(request)
+
+
+def create_app(middlewares: list) -> FastAPI:
+    app = FastAPI()
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    return app
+
+
+async def run_request(app) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"authorization", b"Bearer token")],
+    }
+
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    response_complete = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # TestClientと同様に、レスポンス送信完了後に切断を通知する
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    await app(scope, receive, send)
+
+
+async def per_request_us(app) -> float:
+    for _ in range(200):  # ウォームアップ
+        await run_request(app)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await run_request(app)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    stacks = {
+        "no middleware": [],
+        "BaseHTTPMiddleware x3": [
+            LegacyTraceabilityMiddleware,
+            LegacyPerformanceMonitoringMiddleware,
+            LegacyErrorHandlerMiddleware,
+        ],
+        "pure ASGI x3": [
+            TraceabilityMiddleware,
+            PerformanceMonitoringMiddleware,
+            ErrorHandlerMiddleware,
+        ],
+    }
+
+    baseline = None
+    print(f"{'stack':>24} {'per request(us)':>16} {'overhead(us)':>13}")
+    for name, middlewares in stacks.items():
+        elapsed = await per_request_us(create_app(middlewares))
+        baseline = elapsed if baseline is None else baseline
+        print(f"{name:>24} {elapsed:>16.1f} {elapsed - baseline:>13.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""ルーターを単体でテストするための準備（serviceAccountKey.json・OpenAI APIキーなしでインポートする）"""
+
+import importlib
+import os
+from types import ModuleType
+from typing import List, Tuple
+
+import firebase_admin
+from firebase_admin import credentials
+from google.auth.credentials import AnonymousCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_async_db, get_db
+from app.models import Challenge, Child, User
+
+
+class _LocalCredential(credentials.Base):
+    """Firebaseに接続しない認証情報（認証はテスト側で dependency_overrides により差し替える）"""
+
+    def get_credential(self):
+        return AnonymousCredentials()
+
+
+def import_router(module_name: str) -> ModuleType:
+    """app.utils.auth の初期化より先にFirebaseを初期化してからルーターをインポート"""
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(_LocalCredential(), {"projectId": "bud-test"})
+    return importlib.import_module(module_name)
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    """PostgreSQLのUUID列をSQLiteでは文字列として作成"""
+    return "CHAR(32)"
+
+
+def create_test_sessionmaker() -> sessionmaker:
+    """モデルのテーブルを作成したインメモリSQLiteのセッションファクトリ"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+class AsyncSessionAdapter:
+    """AsyncSession.execute を同期セッションで代替（非同期ドライバーのないテスト用）"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+def override_databases(app, session_factory: sessionmaker) -> None:
+    """get_db・get_async_db をテスト用のセッションに差し替える"""
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        db = session_factory()
+        try:
+            yield AsyncSessionAdapter(db)
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+def create_child_with_challenges(
+    session_factory: sessionmaker, firebase_uid: str, transcripts: List[str]
+) -> Tuple[str, List[str]]:
+    """保護者・子ども・チャレンジを作成し、子どものIDとチャレンジのIDを返す"""
+    with session_factory() as db:
+        user = User(email=f"{firebase_uid}@example.com", name="保護者", firebase_uid=firebase_uid)
+        db.add(user)
+        db.flush()
+        child = Child(nickname="たろう", user_id=user.id)
+        db.add(child)
+        db.flush()
+        challenges = [Challenge(child_id=child.id, transcript=text) for text in transcripts]
+        db.add_all(challenges)
+        db.commit()
+        return str(child.id), [str(challenge.id) for challenge in challenges]
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from router_testing import import_router
+
+admin = import_router("app.api.routers.admin")
+auth = import_router("app.utils.auth")
+
+ENDPOINTS = [
+    ("GET", "/api/admin/cache-stats"),
+    ("GET", "/api/admin/performance"),
+    ("GET", "/api/admin/event-loop"),
+    ("PUT", "/api/admin/event-loop"),
+]
+
+
+def _client(user: dict) -> TestClient:
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/admin")
+    app.dependency_overrides[auth.get_current_user] = lambda: user
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("method, path", ENDPOINTS)
+def test_admin_endpoints_reject_non_admin_users(method, path):
+    """管理者以外のユーザーは403になるテスト"""
+    client = _client({"user_id": "parent-uid", "is_admin": False})
+
+    response = client.request(method, path, json={"debug": False})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("method, path", ENDPOINTS)
+def test_admin_endpoints_allow_admin_users(method, path, monkeypatch):
+    """管理者は各エンドポイントを利用できるテスト"""
+    monkeypatch.setattr(admin.event_loop_monitor, "debug", admin.event_loop_monitor.debug)
+    client = _client({"user_id": "admin-uid", "is_admin": True})
+
+    response = client.request(method, path, json={"debug": False})
+
+    assert response.status_code == 200
+
+
+def test_admin_endpoints_require_authentication():
+    """トークンなしのリクエストは認証エラーになるテスト"""
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/admin")
+
+    response = TestClient(app).get("/api/admin/event-loop")
+
+    assert response.status_code == 403
@@ -0,0 +1,105 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from router_testing import (
+    create_child_with_challenges,
+    create_test_sessionmaker,
+    import_router,
+    override_databases,
+)
+
+ai_feedback = import_router("app.api.routers.ai_feedback")
+voice = import_router("app.api.routers.voice")
+auth = import_router("app.utils.auth")
+
+
+class FakeOpenAI:
+    """openai.OpenAI の代替（chat.completions.create に固定のフィードバックを返す）"""
+
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        message = SimpleNamespace(content=" Great job! ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def session_factory():
+    return create_test_sessionmaker()
+
+
+@pytest.fixture
+def client(session_factory):
+    firebase_uid = f"parent-{uuid.uuid4().hex[:8]}"
+    app = FastAPI()
+    app.include_router(voice.router)
+    app.include_router(ai_feedback.router, prefix="/api")
+    override_databases(app, session_factory)
+    app.dependency_overrides[auth.get_current_user] = lambda: {"user_id": firebase_uid}
+    client = TestClient(app)
+    client.firebase_uid = firebase_uid
+    return client
+
+
+def test_delete_challenge_invalidates_history(client, session_factory):
+    """チャレンジ削除後の履歴取得で、古いETagに304を返さず削除後の内容を返すテスト"""
+    child_id, challenge_ids = create_child_with_challenges(
+        session_factory, client.firebase_uid, ["hello", "good morning"]
+    )
+
+    before = client.get(f"/api/voice/history/{child_id}")
+    assert before.status_code == 200
+    assert {item["id"] for item in before.json()["transcripts"]} == set(challenge_ids)
+
+    deleted = client.delete(f"/api/ai-feedback/{challenge_ids[0]}")
+    assert deleted.status_code == 200
+
+    after = client.get(
+        f"/api/voice/history/{child_id}", headers={"If-None-Match": before.headers["etag"]}
+    )
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert [item["id"] for item in after.json()["transcripts"]] == [challenge_ids[1]]
+
+
+def test_generate_feedback_saves_ai_feedback(client, session_factory, monkeypatch):
+    """生成したフィードバックをai_feedbackに保存し、履歴にも反映されるテスト"""
+    monkeypatch.setattr("openai.OpenAI", FakeOpenAI)
+    child_id, challenge_ids = create_child_with_challenges(
+        session_factory, client.firebase_uid, ["hello"]
+    )
+
+    preview = client.post(f"/api/ai-feedback/preview/{challenge_ids[0]}")
+    assert preview.status_code == 200
+    assert preview.json()["current_comment"] is None
+    assert preview.json()["preview_feedback"] == "Great job!"
+
+    before = client.get(f"/api/voice/history/{child_id}")
+    generated = client.post(f"/api/ai-feedback/generate/{challenge_ids[0]}")
+    assert generated.status_code == 200
+    assert generated.json()["new_feedback"] == "Great job!"
+
+    after = client.get(
+        f"/api/voice/history/{child_id}", headers={"If-None-Match": before.headers["etag"]}
+    )
+    assert after.status_code == 200
+    assert after.json()["transcripts"][0]["ai_feedback"] == "Great job!"
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("POST", "/api/ai-feedback/generate/not-a-uuid"),
+        ("POST", "/api/ai-feedback/preview/not-a-uuid"),
+        ("DELETE", "/api/ai-feedback/not-a-uuid"),
+    ],
+)
+def test_malformed_challenge_id_is_rejected(client, method, path):
+    """UUIDでないチャレンジIDは500ではなく422になるテスト"""
+    response = client.request(method, path)
+
+    assert response.status_code == 422
@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+
+from app.core.alert_config import MetricsCounter
+
+
+def test_counts_only_events_inside_window():
+    """窓内のイベントだけを数え、古いイベントは集計されないテスト"""
+    counter = MetricsCounter(max_window_seconds=300)
+    now = time.time()
+
+    for _ in range(3):
+        counter.increment("errors", now)
+    counter.increment("errors", now - 30)
+    counter.increment("errors", now - 120)
+    counter.increment("errors", now - 1000)  # 保持期間外
+
+    assert counter.get_count_in_window("errors", 60) == 4
+    assert counter.get_count_in_window("errors", 300) == 5
+    assert counter.get_count_in_window("unknown", 60) == 0
+
+    counter.clear_metric("errors")
+    assert counter.get_count_in_window("errors", 300) == 0
+
+
+def test_memory_is_constant_during_error_storm():
+    """エラーが大量に発生してもバケットのリング以上にメモリが増えないテスト"""
+    counter = MetricsCounter(max_window_seconds=60)
+    counter.increment("errors")
+    buckets = counter._counters["errors"]
+    size = sys.getsizeof(buckets.counts) + sys.getsizeof(buckets.seconds)
+
+    now = time.time()
+    for i in range(100_000):
+        counter.increment("errors", now - (i % 120))
+
+    assert sys.getsizeof(buckets.counts) + sys.getsizeof(buckets.seconds) == size
+    assert len(buckets.counts) == 61
+
+
+def test_concurrent_increments_are_not_lost():
+    """複数スレッドからの記録と集計が同時に行われても件数が欠けないテスト"""
+    counter = MetricsCounter(max_window_seconds=60)
+    stop = threading.Event()
+
+    def increment_many():
+        for _ in range(10_000):
+            counter.increment("errors")
+
+    def query_until_stopped():
+        while not stop.is_set():
+            counter.get_count_in_window("errors", 60)
+
+    reader = threading.Thread(target=query_until_stopped)
+    reader.start()
+    writers = [threading.Thread(target=increment_many) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    stop.set()
+    reader.join()
+
+    assert counter.get_count_in_window("errors", 60) == 40_000
@@ -0,0 +1,90 @@
+import struct
+from array import array
+
+import pytest
+
+from app.services.audio_segmenter import WavStreamSegmenter
+
+SAMPLE_RATE = 8000
+
+
+def _wav(pcm: bytes) -> bytes:
+    """テスト用のモノラル16bit WAVを作成"""
+    return (
+        struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + len(pcm),
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,
+            1,
+            SAMPLE_RATE,
+            SAMPLE_RATE * 2,
+            2,
+            16,
+            b"data",
+            len(pcm),
+        )
+        + pcm
+    )
+
+
+def _tone(seconds: float) -> bytes:
+    return array("h", [3000, -3000] * int(SAMPLE_RATE * seconds / 2)).tobytes()
+
+
+def _silence(seconds: float) -> bytes:
+    return bytes(int(SAMPLE_RATE * seconds) * 2)
+
+
+def _feed_in_chunks(segmenter: WavStreamSegmenter, data: bytes, size: int = 777) -> list:
+    segments = []
+    for i in range(0, len(data), size):
+        segments.extend(segmenter.feed(data[i : i + size]))
+    segments.extend(segmenter.finish())
+    return segments
+
+
+def test_splits_at_silence_boundaries():
+    """無音区間でセグメントが区切られるテスト"""
+    pcm = _tone(2) + _silence(1) + _tone(2) + _silence(1) + _tone(1)
+    segmenter = WavStreamSegmenter(min_segment_seconds=1, max_segment_seconds=30)
+
+    segments = _feed_in_chunks(segmenter, _wav(pcm))
+
+    assert len(segments) == 3
+    assert all(segment[:4] == b"RIFF" for segment in segments)
+    # ヘッダーを除いたPCMの合計が入力と一致する
+    assert sum(len(segment) - 44 for segment in segments) == len(pcm)
+    assert segmenter.duration_seconds == pytest.approx(7, abs=0.01)
+
+
+def test_forces_split_at_max_length_and_drops_silence():
+    """無音がない場合の強制分割と、無音のみの区間を送らないテスト"""
+    pcm = _silence(3) + _tone(5)
+    segmenter = WavStreamSegmenter(min_segment_seconds=1, max_segment_seconds=2)
+
+    segments = _feed_in_chunks(segmenter, _wav(pcm))
+
+    assert len(segments) == 3
+
+
+def test_rejects_non_pcm_wav():
+    """PCM以外の入力でValueErrorになるテスト"""
+    segmenter = WavStreamSegmenter()
+    with pytest.raises(ValueError):
+        segmenter.feed(b"\x1aE\xdf\xa3" + bytes(64))
+
+
+def test_finish_keeps_segment_completed_by_partial_frame():
+    """最後の端数フレームで区切りが確定したセグメントもfinish()で返すテスト"""
+    # 390ms の無音は13フレームで、残りの20msを足すと区切りに必要な無音の長さに達する
+    pcm = _tone(6) + _silence(0.39) + _silence(0.02)
+    segmenter = WavStreamSegmenter(min_segment_seconds=1)
+
+    segments = _feed_in_chunks(segmenter, _wav(pcm))
+
+    assert len(segments) == 1
+    assert len(segments[0]) - 44 == len(pcm)
@@ -0,0 +1,357 @@
+import asyncio
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import (
+    MAX_CACHE_KEY_LENGTH,
+    CachePurgeTask,
+    RedisCache,
+    SimpleMemoryCache,
+    TieredCache,
+    build_cache_key,
+    cached,
+)
+
+
+class FakePubSub:
+    """Redis Pub/Subのプロセス内代替"""
+
+    def __init__(self, server):
+        self.server = server
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.server.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class FakeRedis:
+    """テスト用のプロセス内Redis代替（外部サービス不要）"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.published = []
+        self.caller_threads = []
+
+    def get(self, key):
+        self.caller_threads.append(threading.get_ident())
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def publish(self, channel, message):
+        self.published.append(message)
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.messages.put({"type": "message", "data": message.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+def _worker(server: FakeRedis) -> TieredCache:
+    return TieredCache(l1=SimpleMemoryCache(), l2=RedisCache(server), client=server)
+
+
+def test_lru_eviction_keeps_recently_used(monkeypatch):
+    """容量超過時に最も使われていないキーが追い出されるテスト"""
+    cache = SimpleMemoryCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # aを最近使った状態にする
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_byte_budget_evicts_large_entries_and_tracks_prefix_stats():
+    """メモリ予算で追い出され、プレフィックス別に統計が集計されるテスト"""
+    cache = SimpleMemoryCache(max_size=1000, max_bytes=20_000)
+    cache.set("history:child1", "x" * 8_000)
+    cache.set("history:child2", "y" * 8_000)
+    cache.set("children:user1", ["small"])
+
+    cache.set("history:child3", "z" * 8_000)  # child1が追い出される
+    cache.set("history:huge", "h" * 50_000)  # 予算超過のため保存しない
+
+    assert cache.get("history:child1") is None
+    assert cache.get("history:child3") is not None
+    assert cache.get("history:huge") is None
+
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 20_000
+    assert stats["prefixes"]["history"]["evictions"] == 1
+    assert stats["prefixes"]["history"]["entries"] == 2
+    assert stats["prefixes"]["history"]["hits"] == 1
+    assert stats["prefixes"]["history"]["misses"] == 2
+    assert stats["prefixes"]["children"]["entries"] == 1
+
+
+def test_expired_entries_are_purged_without_reads(monkeypatch):
+    """読み出されない期限切れエントリも書き込み時に回収されるテスト"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = SimpleMemoryCache(max_size=10)
+    cache.set("short", "x", ttl=1)
+    cache.set("long", "y", ttl=60)
+
+    now[0] += 5
+    cache.set("other", "z", ttl=60)
+
+    assert len(cache) == 2
+    assert cache.stats()["prefixes"]["default"]["expirations"] == 1
+    assert cache.get("long") == "y"
+
+
+def test_expired_entries_are_purged_on_reads_and_periodically(monkeypatch):
+    """読み込みのたびに、また読み書きのないキャッシュも定期回収で期限切れが回収されるテスト"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    read_cache = SimpleMemoryCache(max_size=10)
+    idle_cache = SimpleMemoryCache(max_size=10)
+    for cache in (read_cache, idle_cache):
+        cache.set("short", "x" * 1000, ttl=1)
+        cache.set("long", "y", ttl=60)
+
+    now[0] += 5
+    assert read_cache.get("long") == "y"
+    assert len(read_cache) == 1
+    assert len(idle_cache) == 2
+
+    assert CachePurgeTask().purge() >= 1
+    assert len(idle_cache) == 1
+    assert idle_cache.stats()["memory_bytes"] < 1000
+
+
+def test_purge_task_runs_until_stopped():
+    """定期回収はタスクとして動作し、停止でタスクが終了するテスト"""
+    task = CachePurgeTask(interval_seconds=0.01)
+
+    async def run():
+        task.start()
+        assert task.running
+        await asyncio.sleep(0.05)
+        await task.stop()
+
+    asyncio.run(run())
+
+    assert not task.running
+
+
+def test_overwrite_extends_ttl(monkeypatch):
+    """上書き時は古い有効期限で削除されないテスト"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = SimpleMemoryCache(max_size=10)
+    cache.set("key", "old", ttl=1)
+    cache.set("key", "new", ttl=60)
+
+    now[0] += 5
+    assert cache.purge_expired() == 0
+    assert cache.get("key") == "new"
+
+
+@pytest.mark.asyncio
+async def test_async_function_result_is_cached_once_for_concurrent_misses():
+    """async関数の結果（コルーチンではなく値）を1回の計算で共有するテスト"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test_async")
+    async def load(value: int) -> int:
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    results = await asyncio.gather(*[load(21) for _ in range(10)])
+
+    assert results == [42] * 10
+    assert await load(21) == 42
+    assert calls == [21]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_waiters():
+    """最初に計算を始めた呼び出し元が取り消されても、待機中の呼び出し元は結果を受け取るテスト"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test_cancel")
+    async def load(value: int) -> int:
+        calls.append(value)
+        await asyncio.sleep(0.02)
+        return value * 2
+
+    first = asyncio.create_task(load(21))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(load(21))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await waiter == 42
+    assert first.cancelled()
+    assert await load(21) == 42
+    assert calls == [21]
+
+
+def test_sync_function_is_computed_once_for_concurrent_threads():
+    """スレッドから同時に呼ばれた同期関数を1回だけ計算するテスト（繰り返しても重複しない）"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test_threads")
+    def load(value: int) -> int:
+        calls.append(value)
+        time.sleep(0.005)
+        return value * 2
+
+    for round_value in range(20):
+        barrier = threading.Barrier(8)
+
+        def call(value=round_value):
+            barrier.wait()
+            return load(value)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: call(), range(8)))
+        assert results == [round_value * 2] * 8
+
+    assert calls == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_async_early_refresh_returns_cached_value_and_recomputes(monkeypatch):
+    """早期更新時は古い値を返しつつバックグラウンドで再計算するテスト"""
+    monkeypatch.setattr("app.core.cache.random.random", lambda: 1.0 - 1e-12)
+    calls = []
+
+    @cached(ttl=60, key_prefix="test_refresh", early_refresh_beta=1e9)
+    async def load() -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert await load() == 1
+    assert await load() == 1
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+
+
+def test_tiered_cache_shares_values_and_invalidates_other_workers_l1():
+    """L2経由で値を共有し、更新時に他ワーカーのL1が無効化されるテスト"""
+    server = FakeRedis()
+    worker_a = _worker(server)
+    worker_b = _worker(server)
+    worker_b.start_listener()
+    try:
+        worker_a.set("children:user1", ["old"])
+        assert worker_b.get("children:user1") == ["old"]  # L2から取得しL1へ保存
+
+        worker_a.replace("children:user1", ["new"])
+
+        deadline = time.time() + 2
+        while worker_b.l1.get("children:user1") is not None and time.time() < deadline:
+            time.sleep(0.01)
+        assert worker_b.get("children:user1") == ["new"]
+    finally:
+        worker_b.stop_listener()
+
+
+def test_tiered_cache_publishes_only_invalidations():
+    """通常の書き込みは通知せず、差し替え・削除のみ他ワーカーへ通知するテスト"""
+    server = FakeRedis()
+    worker = _worker(server)
+
+    worker.set("auth_token:abc", "uid-1")
+    assert server.published == []
+
+    worker.replace("resp_ver:uid-1:/api/children/", "v2")
+    worker.delete("children:uid-1")
+    assert [message.partition(":")[2] for message in server.published] == [
+        "resp_ver:uid-1:/api/children/",
+        "children:uid-1",
+    ]
+
+
+def test_redis_cache_stores_json_instead_of_pickle():
+    """L2にはJSONで保存し、bytesを復元、JSONで表せない値とpickleのデータは扱わないテスト"""
+    server = FakeRedis()
+    l2 = RedisCache(server)
+
+    l2.set("resp:uid-1", (b'[{"id": 1}]', "application/json", '"v1"'))
+    assert server.data["bud:cache:resp:uid-1"].startswith(b"[")
+    assert l2.get("resp:uid-1") == [b'[{"id": 1}]', "application/json", '"v1"']
+
+    l2.set("children:uid-1", {"created_at": datetime(2024, 1, 1)})
+    assert "bud:cache:children:uid-1" not in server.data
+
+    server.data["bud:cache:injected"] = pickle.dumps({"value": 1})
+    assert l2.get("injected") is None
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_async_reads_redis_off_the_event_loop():
+    """イベントループ上からのL2アクセスは別スレッドで行い、L1にある値はそのまま返すテスト"""
+    server = FakeRedis()
+    worker_a = _worker(server)
+    worker_b = _worker(server)
+
+    await worker_a.set_async("children:uid-1", ["a"])
+    assert await worker_b.get_async("children:uid-1") == ["a"]
+    assert await worker_b.get_async("children:uid-1") == ["a"]
+
+    assert len(server.caller_threads) == 1
+    assert server.caller_threads[0] != threading.get_ident()
+
+
+def test_cache_keys_distinguish_argument_types():
+    """str化すると同じになる引数が別のキーになるテスト"""
+    keys = {build_cache_key("ns", (value,), {}) for value in (1, "1", 1.0, True, None, "None")}
+    assert len(keys) == 6
+
+    # キーワード引数の順序には依存しない
+    assert build_cache_key("ns", (), {"a": 1, "b": 2}) == build_cache_key(
+        "ns", (), {"b": 2, "a": 1}
+    )
+    # dictとそれを並べたタプルは別のキー
+    assert build_cache_key("ns", ({"a": 1},), {}) != build_cache_key("ns", ((("'a'", 1),),), {})
+    # 長いキーは短縮される
+    assert len(build_cache_key("ns", ("x" * 1000,), {})) <= MAX_CACHE_KEY_LENGTH
+
+
+def test_unsupported_arguments_require_key_func():
+    """キーにできない引数はTypeError、key_func指定時はその値をキーにするテスト"""
+    calls = []
+
+    @cached(ttl=60, key_prefix="test_key_func")
+    def implicit(db, user_id: str) -> str:
+        return user_id
+
+    @cached(ttl=60, key_prefix="test_key_func", key_func=lambda db, user_id: user_id)
+    def explicit(db, user_id: str) -> str:
+        calls.append(user_id)
+        return user_id
+
+    with pytest.raises(TypeError):
+        implicit(object(), "user1")
+
+    assert explicit(object(), "user1") == "user1"
+    assert explicit(object(), "user1") == "user1"
+    assert calls == ["user1"]
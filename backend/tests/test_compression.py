@@ -0,0 +1,99 @@
+import asyncio
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, select_encoding
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/history")
+    async def history():
+        return {
+            "transcripts": [{"ai_feedback": "とても上手に話せていますね！"} for _ in range(200)]
+        }
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/audio")
+    async def audio():
+        return Response(b"\0" * 4096, media_type="audio/wav")
+
+    return app
+
+
+def test_large_json_is_gzipped_and_small_json_is_not():
+    """大きいJSONは圧縮し、小さいJSONはそのまま返すテスト"""
+    client = TestClient(_create_app())
+    headers = {"Accept-Encoding": "gzip"}
+
+    large = client.get("/history", headers=headers)
+    small = client.get("/small", headers=headers)
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < len(large.content)
+    assert len(large.json()["transcripts"]) == 200
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"status": "ok"}
+
+
+def test_non_compressible_types_and_refused_encodings_pass_through():
+    """音声などの圧縮済み形式や q=0 の場合は圧縮しないテスト"""
+    client = TestClient(_create_app())
+
+    audio = client.get("/audio", headers={"Accept-Encoding": "gzip"})
+    refused = client.get("/history", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+    assert "content-encoding" not in audio.headers
+    assert "content-encoding" not in refused.headers
+    assert select_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert select_encoding("") is None
+
+
+def test_streaming_response_is_compressed_incrementally():
+    """ストリーミングレスポンスはチャンクごとに圧縮して送信されるテスト"""
+    chunk = ("今日は英語でりんごと言えました。" * 40).encode()
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        for _ in range(3):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/export",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(CompressionMiddleware(app, minimum_size=1024)(scope, receive, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # 全体をバッファせず、各チャンクが届いた時点で送信している
+    assert len(bodies) == 4
+    assert all(body["body"] for body in bodies[:3])
+    assert zlib.decompress(b"".join(body["body"] for body in bodies), 31) == chunk * 3
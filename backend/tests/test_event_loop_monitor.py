@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from app.core.event_loop_monitor import EventLoopMonitor
+
+
+def test_lag_is_recorded_when_loop_is_blocked():
+    """同期処理でループが止まると、遅延計測の再開の遅れがヒストグラムに記録されるテスト"""
+    monitor = EventLoopMonitor(interval_ms=10, block_threshold_ms=50, debug=False)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # ループをブロック
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(run())
+
+    assert monitor.lag_histogram.count >= 2
+    assert monitor.max_lag_ms >= 50
+    # デバッグ無効時はスタックを取得しない
+    assert monitor.blocked_count == 0
+
+
+def test_blocking_call_is_attributed_to_route_and_request_id():
+    """デバッグ有効時、ブロッキング処理のスタックを処理中のルート・リクエストIDとともに記録するテスト"""
+    monitor = EventLoopMonitor(interval_ms=10, block_threshold_ms=50, debug=True)
+
+    class Route:
+        path = "/api/children/{child_id}"
+
+    async def endpoint(scope):
+        time.sleep(0.2)  # 同期のDB・外部API呼び出しの代わり
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        scope = {"type": "http", "path": "/api/children/1", "route": Route()}
+        scope["state"] = {"request_id": "abcd1234"}
+        await endpoint(scope)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+
+    assert monitor.blocked_count == 1
+    report = monitor.get_stats()["blocking_reports"][0]
+    assert report["route"] == "/api/children/{child_id}"
+    assert report["request_id"] == "abcd1234"
+    assert report["blocked_ms"] >= 150
+    assert any("time.sleep(0.2)" in frame for frame in report["stack"])
@@ -0,0 +1,33 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.json_encoding import ORJSONResponse, json_dumps
+
+
+def test_orjson_response_matches_jsonable_encoder_output():
+    """UUID・datetimeを直接エンコードしても jsonable_encoder 経由と同じ値になるテスト"""
+    payload = {
+        "id": uuid.uuid4(),
+        "created_at": datetime(2024, 4, 1, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        "naive": datetime(2024, 4, 1, 9, 30),
+        "transcript": "こんにちは",
+    }
+
+    body = ORJSONResponse(payload).body
+
+    assert json.loads(body) == jsonable_encoder(payload)
+
+
+def test_json_dumps_keeps_non_ascii_and_stringifies_unknown_types():
+    """ログ用の json_dumps が日本語をそのまま出力し、未対応の型も失敗しないテスト"""
+
+    class Opaque:
+        def __str__(self) -> str:
+            return "opaque"
+
+    text = json_dumps({"message": "成功", "value": Opaque(), 1: "int key"})
+
+    assert json.loads(text) == {"message": "成功", "value": "opaque", "1": "int key"}
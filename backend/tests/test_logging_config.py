@@ -0,0 +1,72 @@
+import logging
+import queue
+import threading
+
+from app.core import logging_config
+from app.core.logging_config import DroppingQueueHandler, get_logging_stats, stop_logging
+
+
+def test_queue_handler_drops_records_when_full():
+    """キューが満杯のときはブロックせずに破棄件数を数えるテスト"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_dropping_queue")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for i in range(5):
+            logger.warning("record %d", i)
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_queued_logging_writes_files_on_listener_thread(tmp_path, monkeypatch):
+    """キュー経由のログがリスナースレッドでファイルに書き出されるテスト"""
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path)
+    root_level = logging.getLogger().level
+    try:
+        logging_config.setup_logging(use_queue=True)
+        logging.getLogger("test_queued").error("queued error")
+        assert set(get_logging_stats()) == {"root", "access"}
+    finally:
+        stop_logging()
+        logging.getLogger().setLevel(root_level)
+
+    assert "queued error" in (tmp_path / "app.log").read_text(encoding="utf-8")
+    assert "queued error" in (tmp_path / "error.log").read_text(encoding="utf-8")
+    assert get_logging_stats() == {}
+
+
+def test_records_are_formatted_on_listener_thread(tmp_path, monkeypatch):
+    """メッセージ・例外の整形が呼び出し元ではなくリスナースレッドで行われるテスト"""
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path)
+    format_threads = []
+    original_format = logging.Formatter.format
+
+    def recording_format(self, record):
+        format_threads.append(threading.current_thread())
+        return original_format(self, record)
+
+    monkeypatch.setattr(logging.Formatter, "format", recording_format)
+    root_level = logging.getLogger().level
+    try:
+        logging_config.setup_logging(use_queue=True)
+        # pytestのログ捕捉などキュー以外のハンドラーは呼び出し元で整形するため対象外にする
+        for handler in logging.getLogger().handlers:
+            if not isinstance(handler, DroppingQueueHandler):
+                monkeypatch.setattr(handler, "handle", lambda record: True)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("test_listener_format").exception("failed %s", "upload")
+    finally:
+        stop_logging()
+        logging.getLogger().setLevel(root_level)
+
+    assert format_threads
+    assert threading.current_thread() not in format_threads
+    error_log = (tmp_path / "error.log").read_text(encoding="utf-8")
+    assert "failed upload" in error_log
+    assert "ValueError: boom" in error_log
@@ -0,0 +1,75 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from router_testing import import_router
+
+logging_control = import_router("app.api.routers.logging_control")
+auth = import_router("app.utils.auth")
+
+ENDPOINTS = [
+    ("GET", "/api/admin/log-level", None),
+    ("POST", "/api/admin/log-level", {"level": "INFO"}),
+    ("GET", "/api/admin/trace-sampling", None),
+    ("PUT", "/api/admin/trace-sampling", {"sample_rate": 0.0}),
+    ("POST", "/api/admin/test-logs", None),
+]
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(logging_control.router, prefix="/api/admin")
+    return app
+
+
+@pytest.fixture
+def restore_settings(monkeypatch):
+    """ログレベル・サンプリング率の変更をテスト後に戻す"""
+    root_logger = logging_control.logging.getLogger()
+    level = root_logger.level
+    monkeypatch.setattr(
+        logging_control.trace_log_sampler,
+        "sample_rate",
+        logging_control.trace_log_sampler.sample_rate,
+    )
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    monkeypatch.delenv("TRACE_LOG_SAMPLE_RATE", raising=False)
+    yield
+    root_logger.setLevel(level)
+
+
+@pytest.mark.parametrize("method, path, body", ENDPOINTS)
+def test_logging_control_requires_authentication(method, path, body):
+    """トークンなしのリクエストは認証エラーになるテスト"""
+    response = TestClient(_app()).request(method, path, json=body)
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("method, path, body", ENDPOINTS)
+def test_logging_control_rejects_non_admin_users(method, path, body, restore_settings):
+    """管理者以外のユーザーは403になり、サンプリング率も変わらないテスト"""
+    sample_rate = logging_control.trace_log_sampler.sample_rate
+    app = _app()
+    app.dependency_overrides[auth.get_current_user] = lambda: {
+        "user_id": "parent-uid",
+        "is_admin": False,
+    }
+
+    response = TestClient(app).request(method, path, json=body)
+
+    assert response.status_code == 403
+    assert logging_control.trace_log_sampler.sample_rate == sample_rate
+
+
+@pytest.mark.parametrize("method, path, body", ENDPOINTS)
+def test_logging_control_allows_admin_users(method, path, body, restore_settings):
+    """管理者は各エンドポイントを利用できるテスト"""
+    app = _app()
+    app.dependency_overrides[auth.get_current_user] = lambda: {
+        "user_id": "admin-uid",
+        "is_admin": True,
+    }
+
+    response = TestClient(app).request(method, path, json=body)
+
+    assert response.status_code == 200
@@ -0,0 +1,98 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import (
+    OVERFLOW_ROUTE,
+    ExternalCallMetrics,
+    LatencyHistogram,
+    RouteLatencyMetrics,
+    merge_histograms,
+)
+from app.core.openmetrics import OpenMetricsRenderer
+
+
+def _exact_percentile(values: list, quantile: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(quantile * len(ordered) + 0.5) - 1)]
+
+
+def test_percentiles_are_within_bucket_precision():
+    """対数バケットのパーセンタイルが実測値と数%以内で一致するテスト"""
+    rng = random.Random(0)
+    # 大半は高速で、一部がOpenAI呼び出し相当の長い裾を持つ分布
+    values = [rng.lognormvariate(3, 0.5) for _ in range(9_000)]
+    values += [rng.uniform(800, 5_000) for _ in range(1_000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for quantile in (0.50, 0.95, 0.99):
+        expected = _exact_percentile(values, quantile)
+        assert histogram.percentile(quantile) == pytest.approx(expected, rel=0.04)
+    assert histogram.max_ms == max(values)
+
+
+def test_merge_and_delta_are_consistent():
+    """スナップショットの合算・差分が記録を分割した場合と一致するテスト"""
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in range(1, 101):
+        first.record(value)
+        second.record(value * 10)
+
+    merged = merge_histograms([first, second])
+    baseline = first.snapshot()
+    first.merge(second)
+
+    assert merged.count == 200
+    assert merged.percentile(0.99) == first.percentile(0.99)
+    assert first.delta(baseline).percentile(0.5) == second.percentile(0.5)
+    assert first.delta(baseline).count == 100
+
+
+def test_route_metrics_split_status_classes_and_cap_routes():
+    """ステータス分類ごとに記録し、上限を超えたルートをまとめるテスト"""
+    metrics = RouteLatencyMetrics(max_routes=1)
+    metrics.record("/api/children/", 200, 10)
+    metrics.record("/api/children/", 503, 900)
+
+    assert metrics.record("/api/voice/history/{child_id}", 200, 10) == OVERFLOW_ROUTE
+    summary = metrics.summary()
+    assert set(summary["/api/children/"]) == {"2xx", "5xx"}
+    assert summary["/api/children/"]["5xx"]["p99_ms"] == 900
+
+
+def test_openmetrics_output_has_cumulative_buckets_and_tokens():
+    """ヒストグラムが累積バケットで出力され、トークン数が集計されるテスト"""
+    route_metrics = RouteLatencyMetrics()
+    external_metrics = ExternalCallMetrics()
+    for value in (3, 40, 150, 900):
+        route_metrics.record("/api/children/{child_id}", 200, value)
+    with external_metrics.measure("chat.completions"):
+        pass
+    external_metrics.record_usage(
+        "chat.completions", SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+    )
+    renderer = OpenMetricsRenderer(route_metrics, external_metrics)
+
+    text = renderer.render()
+    labels = 'route="/api/children/{child_id}",status="2xx"'
+
+    assert f'bud_http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'bud_http_request_duration_seconds_bucket{{{labels},le="0.2"}} 3' in text
+    assert f'bud_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in text
+    assert f"bud_http_request_duration_seconds_count{{{labels}}} 4" in text
+    assert 'bud_openai_tokens_total{operation="chat.completions",kind="prompt"} 120' in text
+    assert text.endswith("# EOF\n")
+
+    # 件数が変わった系列だけ再出力される
+    route_metrics.record("/api/children/{child_id}", 200, 20)
+    assert f"bud_http_request_duration_seconds_count{{{labels}}} 5" in renderer.render()
+
+    # 記録のないスクレイプは前回と同じ出力になり、新しいルートの記録で再出力される
+    assert renderer.render() == renderer.render()
+    route_metrics.record("/api/search/100%", 404, 8)
+    assert 'bud_http_request_duration_seconds_count{route="/api/search/100%",status="4xx"} 1' in (
+        renderer.render()
+    )
@@ -0,0 +1,46 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from router_testing import import_router
+
+metrics = import_router("app.api.routers.metrics")
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(metrics.router)
+    return TestClient(app)
+
+
+def test_metrics_disabled_without_token(monkeypatch):
+    """METRICS_TOKEN 未設定時は /metrics を出力しないテスト"""
+    monkeypatch.setattr(metrics.settings, "METRICS_TOKEN", "")
+
+    response = _client().get("/metrics", headers={"Authorization": "Bearer anything"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{}, {"Authorization": "Bearer wrong-token"}, {"Authorization": "Basic scrape-token"}],
+)
+def test_metrics_rejects_missing_or_invalid_token(monkeypatch, headers):
+    """トークンなし・不一致のリクエストは認証エラーになるテスト"""
+    monkeypatch.setattr(metrics.settings, "METRICS_TOKEN", "scrape-token")
+
+    response = _client().get("/metrics", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_metrics_returns_openmetrics_with_token(monkeypatch):
+    """正しいトークンのリクエストにはOpenMetrics形式で出力するテスト"""
+    monkeypatch.setattr(metrics.settings, "METRICS_TOKEN", "scrape-token")
+
+    response = _client().get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.OPENMETRICS_CONTENT_TYPE
+    assert response.text.endswith("# EOF\n")
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import tracemalloc
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.metrics import (
+    OVERFLOW_ROUTE,
+    UNMATCHED_ROUTE,
+    ExternalCallMetrics,
+    PhaseLatencyMetrics,
+    RouteLatencyMetrics,
+    timed_phase,
+)
+from app.middleware.error_handler import ErrorHandlerMiddleware
+from app.middleware.performance_monitoring import PerformanceMonitoringMiddleware
+from app.middleware.traceability_logging import TraceabilityMiddleware, TraceLogSampler
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TraceabilityMiddleware)
+    app.add_middleware(PerformanceMonitoringMiddleware)
+    app.add_middleware(ErrorHandlerMiddleware)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def test_streaming_response_passes_through_with_headers():
+    """本文をラップせずにストリーミングし、追跡ヘッダーを付与するテスト"""
+    response = TestClient(_create_app()).get("/stream")
+
+    assert response.status_code == 200
+    assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+    assert len(response.headers["X-Request-ID"]) == 8
+    assert response.headers["X-Response-Time"].endswith("ms")
+
+
+def test_unhandled_error_becomes_json_500(monkeypatch):
+    """予期しない例外が統一形式の500になり、エラーとして記録されるテスト"""
+    errors = []
+    monkeypatch.setattr(
+        "app.middleware.traceability_logging.record_error", lambda: errors.append(1)
+    )
+
+    response = TestClient(_create_app()).get("/boom")
+
+    assert response.status_code == 500
+    assert response.json()["error_code"] == "INTERNAL_SERVER_ERROR"
+    assert errors == [1]
+
+
+def test_metrics_are_keyed_by_route_template_with_bounded_memory():
+    """IDごとにパスが異なっても集計キーが増えず、メモリ使用量が一定になるソークテスト"""
+    app = FastAPI()
+
+    @app.get("/api/voice/challenge/{challenge_id}")
+    async def challenge(challenge_id: str):
+        return {"id": challenge_id}
+
+    for i in range(5):
+        app.add_api_route(f"/api/static/{i}", lambda: {})
+
+    metrics = RouteLatencyMetrics(max_routes=3)
+    client = TestClient(PerformanceMonitoringMiddleware(app, metrics))
+
+    def soak(count: int) -> None:
+        for _ in range(count):
+            client.get(f"/api/voice/challenge/{uuid.uuid4()}")
+            client.get(f"/not-found/{uuid.uuid4()}")
+        for i in range(5):
+            client.get(f"/api/static/{i}")
+
+    # 置き換わる記録も計測対象にするため、ウォームアップ前から追跡する
+    tracemalloc.start()
+    try:
+        soak(600)  # ルート・ステータス別のヒストグラムが作られるまで
+        baseline = tracemalloc.take_snapshot()
+        soak(1000)
+        growth = sum(
+            stat.size_diff
+            for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename")
+            if stat.traceback[0].filename.endswith(("performance_monitoring.py", "metrics.py"))
+        )
+    finally:
+        tracemalloc.stop()
+
+    assert set(metrics.histograms) == {
+        "/api/voice/challenge/{challenge_id}",
+        UNMATCHED_ROUTE,
+        "/api/static/0",
+        OVERFLOW_ROUTE,
+    }
+    assert growth < 16 * 1024
+
+
+def _traced_app(sampler: TraceLogSampler) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TraceabilityMiddleware, sampler=sampler)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/ok")
+    async def ok():
+        return {"status": "ok"}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404)
+
+    return app
+
+
+def _capture_trace_logs(monkeypatch) -> list:
+    events = []
+    trace_logger = logging.getLogger("traceability")
+    monkeypatch.setattr(trace_logger, "level", logging.INFO)
+    monkeypatch.setattr(trace_logger, "_cache", {})
+    monkeypatch.setattr(
+        TraceabilityMiddleware,
+        "log_request_start",
+        lambda self, request_id, method, url, *args: events.append(("start", url)),
+    )
+    monkeypatch.setattr(
+        TraceabilityMiddleware,
+        "log_request_end",
+        lambda self, request_id, method, url, status_code, *args, **kwargs: events.append(
+            ("end", status_code)
+        ),
+    )
+    return events
+
+
+def test_server_timing_reports_phases_across_child_tasks():
+    """依存関係・エンドポイントのフェーズがServer-Timingヘッダーとフェーズ別ヒストグラムに出るテスト"""
+    app = FastAPI()
+    external_metrics = ExternalCallMetrics(phase="openai")
+
+    async def fake_auth():
+        with timed_phase("auth"):
+            await asyncio.sleep(0.01)
+        return {"user_id": "uid"}
+
+    @app.post("/api/voice/transcribe")
+    async def transcribe(current_user: dict = Depends(fake_auth)):
+        for _ in range(2):
+            with timed_phase("commit"):
+                await asyncio.sleep(0)
+        with external_metrics.measure("chat.completions"):
+            await asyncio.sleep(0.02)
+        return {"status": "completed"}
+
+    # アプリのミドルウェアはすべて純粋なASGIだが、BaseHTTPMiddlewareを挟んで
+    # 内側が別タスクで動いてもフェーズが記録されることを確認する
+    app.add_middleware(BaseHTTPMiddleware, dispatch=lambda request, call_next: call_next(request))
+    phase_metrics = PhaseLatencyMetrics()
+    middleware = PerformanceMonitoringMiddleware(
+        app, RouteLatencyMetrics(), phase_metrics, server_timing=True
+    )
+
+    response = TestClient(middleware).post("/api/voice/transcribe")
+
+    entries = dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+    assert list(entries) == ["auth", "commit", "openai", "total"]
+    assert float(entries["auth"]) >= 10
+    assert float(entries["openai"]) >= 20
+    assert float(entries["total"]) >= float(entries["auth"]) + float(entries["openai"])
+
+    summary = phase_metrics.summary()["/api/voice/transcribe"]
+    assert set(summary) == {"auth", "commit", "openai"}
+    # 同じフェーズが複数回あればリクエスト単位で合計して1件として記録する
+    assert summary["commit"]["count"] == 1
+
+    # 無効化するとヘッダーを付けない
+    middleware.server_timing = False
+    assert "Server-Timing" not in TestClient(middleware).post("/api/voice/transcribe").headers
+
+
+def test_trace_logs_are_sampled_but_errors_always_logged(monkeypatch):
+    """サンプリング率0でも正常時のみ省略され、エラーは完了ログが出るテスト"""
+    events = _capture_trace_logs(monkeypatch)
+    client = TestClient(_traced_app(TraceLogSampler(sample_rate=0.0)))
+
+    client.get("/ok")
+    client.get("/missing")
+
+    assert events == [("end", 404)]
+
+
+def test_health_checks_are_excluded_from_trace_logs(monkeypatch):
+    """ヘルスチェックは全件サンプリングでも追跡ログの対象外になるテスト"""
+    events = _capture_trace_logs(monkeypatch)
+    sampler = TraceLogSampler(sample_rate=1.0, excluded_paths=["/health"])
+    client = TestClient(_traced_app(sampler))
+
+    client.get("/health")
+    client.get("/ok")
+
+    assert events == [("start", "http://testserver/ok"), ("end", 200)]
+
+
+def test_slow_requests_bypass_sampling():
+    """遅いリクエストはサンプリングに関係なく出力対象になるテスト"""
+    sampler = TraceLogSampler(sample_rate=0.0, slow_request_ms=100)
+
+    assert not sampler.should_sample("/ok")
+    assert sampler.must_log(200, 150)
+    assert not sampler.must_log(200, 50)
+    with pytest.raises(ValueError):
+        sampler.sample_rate = 1.5
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import monitoring_task as monitoring_module
+from app.core.monitoring_task import LeaderElection, MonitoringTask, SharedAlertSuppression
+
+
+def test_monitoring_runs_as_task_and_stops_cleanly(monkeypatch):
+    """開始は待たずに戻り、周期実行された後に停止でタスクが終了するテスト"""
+    cycles = []
+    monkeypatch.setattr(
+        monitoring_module.alert_monitor, "run_monitoring_cycle", lambda: cycles.append(1)
+    )
+    task = MonitoringTask(check_interval=0.01)
+
+    async def run():
+        task.start()
+        assert task.running
+        await asyncio.sleep(0.1)
+        await task.stop()
+        assert not task.running
+
+    asyncio.run(run())
+
+    assert len(cycles) >= 2
+
+
+def test_workers_evaluate_alerts_but_notify_once(monkeypatch, tmp_path):
+    """各ワーカーが判定し、同じアラートの通知は他のワーカーと重複して送らないテスト"""
+    state_path = str(tmp_path / "notifications.json")
+    sent = []
+
+    async def send_alert(alert_event):
+        sent.append(alert_event.rule.name)
+
+    monkeypatch.setattr(monitoring_module.notification_manager, "send_alert", send_alert)
+    workers = [
+        MonitoringTask(shared_suppression=SharedAlertSuppression(state_path, 300)) for _ in range(3)
+    ]
+    error_rate = SimpleNamespace(rule=SimpleNamespace(name="error_rate"))
+    slow_response = SimpleNamespace(rule=SimpleNamespace(name="slow_response"))
+
+    async def run():
+        for worker in workers:
+            worker.handle_alert(error_rate)
+        workers[1].handle_alert(slow_response)
+        for worker in workers:
+            await worker.stop()
+
+    asyncio.run(run())
+
+    assert sorted(sent) == ["error_rate", "slow_response"]
+
+
+def test_shared_suppression_allows_resend_after_window(monkeypatch, tmp_path):
+    """抑制期間を過ぎた同じアラートは再び通知するテスト"""
+    now = [1000.0]
+    monkeypatch.setattr(monitoring_module.time, "time", lambda: now[0])
+    suppression = SharedAlertSuppression(str(tmp_path / "notifications.json"), 300)
+
+    assert suppression.should_send("error_rate")
+    assert not SharedAlertSuppression(suppression.state_path, 300).should_send("error_rate")
+    now[0] += 301
+    assert suppression.should_send("error_rate")
+
+
+def test_only_leader_evaluates_alerts(monkeypatch, tmp_path):
+    """リーダー選出を有効にすると1つのワーカーだけが判定し、停止後は別のワーカーが引き継ぐテスト"""
+    lock_path = str(tmp_path / "monitoring.lock")
+    cycles = []
+    monkeypatch.setattr(
+        monitoring_module.alert_monitor, "run_monitoring_cycle", lambda: cycles.append(1)
+    )
+    leader = MonitoringTask(check_interval=0.01, leader_election=LeaderElection(lock_path))
+    follower_election = LeaderElection(lock_path)
+    follower = MonitoringTask(check_interval=0.01, leader_election=follower_election)
+
+    async def run():
+        leader.start()
+        await asyncio.sleep(0.05)
+        follower.start()
+        await asyncio.sleep(0.1)
+        assert leader.leader_election.is_leader
+        assert not follower_election.is_leader
+
+        await leader.stop()
+        await asyncio.sleep(0.05)
+        assert follower_election.is_leader
+        await follower.stop()
+
+    asyncio.run(run())
+
+    assert cycles
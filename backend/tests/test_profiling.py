@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from app.core.profiling import CPUProfiler, MemoryProfiler, ProfilerBusyError, format_collapsed
+
+
+def busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_cpu_profile_collapses_stacks_of_other_threads():
+    """他のスレッドのスタックをcollapsed形式（スレッド名;...;関数 件数）で集計するテスト"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="worker")
+    worker.start()
+    try:
+        stacks = CPUProfiler().profile(seconds=0.2, interval_ms=5)
+    finally:
+        stop.set()
+        worker.join()
+
+    worker_stacks = {stack: count for stack, count in stacks.items() if stack.startswith("worker;")}
+    assert worker_stacks
+    assert all("busy_worker (test_profiling.py:" in stack for stack in worker_stacks)
+    # 計測を行うスレッド自身は含めない
+    assert not any("profile (profiling.py:" in stack for stack in stacks)
+
+    lines = format_collapsed(stacks).splitlines()
+    assert len(lines) == len(stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_cpu_profile_rejects_concurrent_runs():
+    """CPUプロファイルは同時に1つしか実行できないテスト"""
+    profiler = CPUProfiler()
+    thread = threading.Thread(target=profiler.profile, args=(0.2,))
+    thread.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(ProfilerBusyError):
+            profiler.profile(0.1)
+    finally:
+        thread.join()
+    assert not profiler.running
+
+
+def test_memory_diff_reports_new_allocations_and_auto_stops():
+    """基準スナップショット以降の割り当てを箇所ごとに返し、上限時間で自動停止するテスト"""
+    profiler = MemoryProfiler(max_seconds=0.5)
+    profiler.start(frames=5)
+    try:
+        with pytest.raises(ProfilerBusyError):
+            profiler.start()
+        retained = [bytearray(1024) for _ in range(1000)]  # noqa: F841
+        diff = profiler.diff(limit=5)
+    finally:
+        profiler.stop()
+
+    top = diff[0]
+    assert top["size_diff_bytes"] >= 1000 * 1024
+    assert "test_profiling.py" in top["location"][0]
+
+    profiler.start(seconds=0.1)
+    time.sleep(0.3)
+    assert not profiler.get_status()["running"]
+    with pytest.raises(RuntimeError):
+        profiler.diff()
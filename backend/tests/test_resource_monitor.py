@@ -0,0 +1,206 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import RequestTimings, current_request_scope, current_request_timings
+from app.core.resource_monitor import (
+    BACKGROUND_ROUTE,
+    DatabaseConnectionMonitor,
+    ResourceMonitor,
+    ResourceSample,
+    ResourceSampler,
+    collect_resource_sample,
+)
+
+
+def _fake_collector(memory_percents, interval=5.0):
+    """5秒ごとに送受信が毎秒1000バイト増える環境のサンプル"""
+    state = {"calls": 0}
+    real = collect_resource_sample()
+
+    def collect():
+        index = state["calls"]
+        state["calls"] += 1
+        elapsed = index * interval
+        return ResourceSample(
+            **{
+                **real.__dict__,
+                "monotonic": 1000.0 + elapsed,
+                "cpu_percent": 10.0,
+                "memory_percent": memory_percents[min(index, len(memory_percents) - 1)],
+                "disk_percent": 50.0,
+                "net_bytes_sent": int(1000 * elapsed),
+                "net_bytes_recv": int(2000 * elapsed),
+            }
+        )
+
+    return collect, state
+
+
+def test_rates_are_computed_from_bounded_history():
+    """履歴は固定長で、1分・15分の増加率を履歴から計算できるテスト"""
+    collect, _ = _fake_collector([10.0])
+    sampler = ResourceSampler(interval_seconds=5, history_seconds=900, collect=collect)
+
+    for _ in range(400):
+        sampler.sample()
+
+    assert len(sampler.history) == 181
+    one_minute = sampler.rates(60)
+    fifteen_minutes = sampler.rates(900)
+    assert one_minute["window_seconds"] == 60
+    assert one_minute["net_bytes_sent_per_sec"] == 1000
+    assert fifteen_minutes["net_bytes_recv_per_sec"] == 2000
+    assert fifteen_minutes["cpu_percent_avg"] == 10.0
+
+
+def test_requests_read_latest_sample_without_collecting():
+    """サンプル取得済みならリクエスト時にpsutilを呼ばないテスト"""
+    collect, state = _fake_collector([10.0])
+    sampler = ResourceSampler(interval_seconds=5, collect=collect)
+    monitor = ResourceMonitor(sampler)
+    sampler.sample()
+    sampler.sample()
+
+    resources = monitor.get_system_resources()
+
+    assert state["calls"] == 2
+    assert resources["memory"]["used_percent"] == 10.0
+    assert resources["rates"]["1m"]["net_bytes_sent_per_sec"] == 1000
+
+
+def test_alerts_fire_only_when_crossing_thresholds():
+    """しきい値をまたいだ時だけアラートになり、状態は一定サイズに保たれるテスト"""
+    memory = [50.0, 85.0, 86.0, 95.0, 96.0, 50.0, 85.0]
+    collect, _ = _fake_collector(memory)
+    sampler = ResourceSampler(interval_seconds=5, collect=collect)
+    monitor = ResourceMonitor(sampler)
+    # 初回サンプルはしきい値のチェック対象外
+    raised = []
+    monitor.check_resource_alerts = (
+        lambda resources, check=monitor.check_resource_alerts: raised.append(check(resources))
+    )
+    for _ in memory:
+        sampler.sample()
+
+    assert raised == [
+        ["WARNING: Memory usage 85.0%"],
+        [],
+        ["CRITICAL: Memory usage 95.0%"],
+        [],
+        [],
+        ["WARNING: Memory usage 85.0%"],
+    ]
+    assert monitor.get_active_alerts() == ["memory:warning"]
+    assert set(monitor.alert_state) == {"memory", "cpu", "disk"}
+
+
+def test_sampler_task_starts_and_stops():
+    """サンプラーはタスクとして動作し、停止でタスクが終了するテスト"""
+    collect, state = _fake_collector([10.0])
+    sampler = ResourceSampler(interval_seconds=0.01, collect=collect)
+
+    async def run():
+        sampler.start()
+        await asyncio.sleep(0.1)
+        await sampler.stop()
+
+    asyncio.run(run())
+
+    assert not sampler.running
+    assert state["calls"] >= 2
+
+
+def test_db_monitor_tracks_pool_events_and_slow_holds():
+    """プールイベントから接続数・待ち/保持時間・長時間保持したルートを記録するテスト"""
+    monitor = DatabaseConnectionMonitor(slow_hold_ms=20)
+    engine = create_engine(
+        "sqlite://",
+        poolclass=monitor.pool_class(QueuePool),
+        pool_size=1,
+        max_overflow=1,
+    )
+    monitor.attach(engine)
+
+    scope = {"route": SimpleNamespace(path="/api/children/{child_id}")}
+    timings = RequestTimings()
+    token = current_request_scope.set(scope)
+    timings_token = current_request_timings.set(timings)
+    try:
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("SELECT 1"))
+            assert monitor.active_connections == 2
+            time.sleep(0.03)
+    finally:
+        current_request_timings.reset(timings_token)
+        current_request_scope.reset(token)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = monitor.get_connection_stats()
+    assert stats["active_connections"] == 0
+    assert stats["peak_connections"] == 2
+    assert stats["events"]["checkout"] == 3
+    assert stats["events"]["checkin"] == 3
+    assert stats["events"]["overflow"] == 1
+    assert stats["wait_ms"]["count"] == 3
+    assert stats["hold_ms"]["count"] == 3
+    assert stats["slow_holds"]["/api/children/{child_id}"]["count"] == 2
+    assert BACKGROUND_ROUTE not in stats["slow_holds"]
+    # リクエスト中の取得待ち・クエリ時間はServer-Timingのフェーズとして記録される
+    assert set(timings.phases) == {"db_wait", "db"}
+
+
+def test_db_monitor_failed_query_does_not_leak_start_time():
+    """失敗したクエリの開始時刻が接続に残らず、次のクエリの時間に影響しないテスト"""
+    monitor = DatabaseConnectionMonitor()
+    engine = create_engine("sqlite://", poolclass=monitor.pool_class(QueuePool), pool_size=1)
+    monitor.attach(engine)
+
+    timings = RequestTimings()
+    timings_token = current_request_timings.set(timings)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            time.sleep(0.05)
+            conn.execute(text("SELECT 1"))
+            leftover = dict(conn.info)
+    finally:
+        current_request_timings.reset(timings_token)
+
+    assert "query_started_at" not in leftover
+    assert timings.phases["db"] < 50
+
+
+def test_db_monitor_counts_events_from_concurrent_threads():
+    """複数スレッドからの接続取得・解放でも件数を取りこぼさないテスト"""
+    monitor = DatabaseConnectionMonitor()
+    engine = create_engine(
+        "sqlite://",
+        poolclass=monitor.pool_class(QueuePool),
+        pool_size=4,
+        max_overflow=4,
+        connect_args={"check_same_thread": False},
+    )
+    monitor.attach(engine)
+
+    def use_connections(_):
+        for _ in range(50):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(use_connections, range(8)))
+
+    stats = monitor.get_connection_stats()
+    assert stats["events"]["checkout"] == stats["events"]["checkin"] == 400
+    assert stats["active_connections"] == 0
+    assert stats["hold_ms"]["count"] == 400
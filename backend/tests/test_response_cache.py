@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.cache import (
+    etag_matches,
+    get_resource_etag,
+    invalidate_user_responses,
+    remember_authenticated_token,
+)
+from app.middleware.response_cache import ResponseCacheMiddleware
+
+TOKENS = {"token-a": "uid-a", "token-b": "uid-b"}
+
+
+def _create_app(calls: list) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware)
+
+    @app.get("/api/children/")
+    async def children(request: Request, response: Response):
+        # get_current_user と同様に検証済みトークンを記録する
+        token = request.headers.get("authorization", "")[7:]
+        owner = TOKENS.get(token, "anonymous")
+        if token in TOKENS:
+            await remember_authenticated_token(token, owner)
+            response.headers["ETag"] = await get_resource_etag(owner, "/api/children/")
+        calls.append(owner)
+        return [{"owner": owner, "version": len(calls)}]
+
+    return app
+
+
+def test_response_cache_is_scoped_per_user_and_invalidated_on_write():
+    """ユーザー単位でキャッシュされ、書き込み時に無効化されるテスト"""
+    calls = []
+    client = TestClient(_create_app(calls))
+    headers_a = {"Authorization": "Bearer token-a"}
+    headers_b = {"Authorization": "Bearer token-b"}
+
+    # 初回はトークン未記録のため保存されず、2回目で保存される
+    client.get("/api/children/", headers=headers_a)
+    second = client.get("/api/children/", headers=headers_a)
+    third = client.get("/api/children/", headers=headers_a)
+    other_user = client.get("/api/children/", headers=headers_b)
+
+    assert second.headers["X-Cache"] == "MISS"
+    assert third.headers["X-Cache"] == "HIT"
+    assert third.json() == second.json()
+    assert other_user.headers["X-Cache"] == "MISS"
+    assert other_user.json()[0]["owner"] == "uid-b"
+
+    asyncio.run(invalidate_user_responses("uid-a", "/api/children/"))
+    after_write = client.get("/api/children/", headers=headers_a)
+
+    assert after_write.headers["X-Cache"] == "MISS"
+    assert calls == ["uid-a", "uid-a", "uid-b", "uid-a"]
+
+
+def test_cached_response_returns_304_for_matching_etag():
+    """キャッシュヒット時にIf-None-Matchが一致すれば304を返すテスト"""
+    client = TestClient(_create_app([]))
+    headers = {"Authorization": "Bearer token-b"}
+    client.get("/api/children/", headers=headers)
+    etag = client.get("/api/children/", headers=headers).headers["ETag"]
+
+    response = client.get("/api/children/", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_after_write():
+    """書き込み後にETagが変わり、古いETagが一致しなくなるテスト"""
+    etag = await get_resource_etag("uid-c", "/api/voice/history/child-1")
+    assert await get_resource_etag("uid-c", "/api/voice/history/child-1") == etag
+    assert etag_matches(f'W/{etag}, "other"', etag)
+    assert not etag_matches("*", etag)
+
+    await invalidate_user_responses("uid-c", "/api/voice/history/child-1")
+
+    assert not etag_matches(etag, await get_resource_etag("uid-c", "/api/voice/history/child-1"))
+
+
+def test_unauthenticated_requests_are_not_cached():
+    """トークンなしのリクエストはキャッシュされないテスト"""
+    client = TestClient(_create_app([]))
+
+    response = client.get("/api/children/")
+
+    assert "X-Cache" not in response.headers
+
+
+def test_streamed_response_is_cached_and_other_methods_pass_through():
+    """複数チャンクで送られた本文も保存され、GET以外は対象外として通過するテスト"""
+    calls = []
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware)
+
+    @app.get("/api/children/")
+    async def children(request: Request):
+        await remember_authenticated_token("token-s", "uid-s")
+        calls.append("get")
+
+        async def chunks():
+            yield b'[{"name":'
+            yield b'"stream"}]'
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    @app.post("/api/children/")
+    async def create_child():
+        calls.append("post")
+        return {"created": True}
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer token-s"}
+
+    client.get("/api/children/", headers=headers)
+    miss = client.get("/api/children/", headers=headers)
+    hit = client.get("/api/children/", headers=headers)
+    created = client.post("/api/children/", headers=headers)
+
+    assert miss.headers["X-Cache"] == "MISS"
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.json() == miss.json() == [{"name": "stream"}]
+    assert "X-Cache" not in created.headers
+    assert calls == ["get", "get", "post"]
+
+
+@pytest.mark.asyncio
+async def test_etag_and_response_cache_are_disabled_without_shared_versions(monkeypatch):
+    """バージョンをワーカー間で共有できない構成ではETagを発行せず、レスポンスもキャッシュしないテスト"""
+    monkeypatch.setattr("app.core.cache.RESPONSE_CACHE_ENABLED", False)
+    assert await get_resource_etag("uid-d", "/api/children/") is None
+    assert not etag_matches('"abc"', None)
+
+    calls = []
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, enabled=False)
+
+    @app.get("/api/children/")
+    async def children():
+        await remember_authenticated_token("token-d", "uid-d")
+        calls.append("get")
+        return []
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer token-d"}
+    responses = [client.get("/api/children/", headers=headers) for _ in range(3)]
+
+    assert all("X-Cache" not in response.headers for response in responses)
+    assert calls == ["get", "get", "get"]
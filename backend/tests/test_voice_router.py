@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from router_testing import (
+    create_child_with_challenges,
+    create_test_sessionmaker,
+    import_router,
+    override_databases,
+)
+from test_audio_segmenter import _silence, _tone, _wav
+from test_voice_service import FakeClient
+
+voice = import_router("app.api.routers.voice")
+auth = import_router("app.utils.auth")
+
+
+@pytest.fixture
+def session_factory():
+    return create_test_sessionmaker()
+
+
+@pytest.fixture
+def client(monkeypatch, session_factory):
+    monkeypatch.setattr(voice.voice_service, "client", FakeClient())
+    app = FastAPI()
+    app.include_router(voice.router)
+    override_databases(app, session_factory)
+    app.dependency_overrides[auth.get_current_user] = lambda: {"user_id": "parent-uid"}
+    return TestClient(app)
+
+
+def test_upload_transcribes_wav_stream(client):
+    """アップロードしたWAVが無音区間ごとに文字起こしされるテスト"""
+    data = _wav(_tone(6) + _silence(1) + _tone(3))
+
+    response = client.post("/api/voice/upload", content=data, headers={"Content-Type": "audio/wav"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "completed",
+        "transcript": "segment_0.wav segment_1.wav",
+        "segments": 2,
+        "bytes_received": len(data),
+    }
+
+
+def test_upload_rejects_unsupported_content_type(client):
+    """未対応のContent-Typeは受信前に415になるテスト"""
+    response = client.post(
+        "/api/voice/upload", content=b"data", headers={"Content-Type": "audio/ogg"}
+    )
+
+    assert response.status_code == 415
+
+
+def test_upload_rejects_large_content_length(client, monkeypatch):
+    """Content-Lengthが上限を超える場合は受信前に413になるテスト"""
+    monkeypatch.setitem(voice.VOICE_CONFIG, "MAX_FILE_SIZE", 1024)
+
+    response = client.post(
+        "/api/voice/upload", content=bytes(2048), headers={"Content-Type": "audio/wav"}
+    )
+
+    assert response.status_code == 413
+    assert voice.voice_service.client.audio.transcriptions.calls == []
+
+
+def test_history_wildcard_etag_does_not_skip_ownership_check(client, session_factory):
+    """If-None-Match: * では304を返さず、他の保護者の子どもの履歴は403になるテスト"""
+    own_child_id, _ = create_child_with_challenges(session_factory, "parent-uid", ["hello"])
+    other_child_id, _ = create_child_with_challenges(session_factory, "other-uid", ["secret"])
+
+    other = client.get(f"/api/voice/history/{other_child_id}", headers={"If-None-Match": "*"})
+    own = client.get(f"/api/voice/history/{own_child_id}", headers={"If-None-Match": "*"})
+
+    assert other.status_code == 403
+    assert own.status_code == 200
+    assert [item["transcript"] for item in own.json()["transcripts"]] == ["hello"]
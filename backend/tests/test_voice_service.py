@@ -0,0 +1,121 @@
+import asyncio
+from array import array
+
+import pytest
+from fastapi import HTTPException
+from test_audio_segmenter import _silence, _tone, _wav
+
+from app.constants.config import VOICE_CONFIG
+from app.services.voice_service import VoiceService
+
+
+class FakeTranscriptions:
+    """Whisper APIの代わりにファイル名を文字起こし結果として返す"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, model, file):
+        filename, content = file
+        self.calls.append(filename)
+        return type("Transcript", (), {"text": f" {filename} "})()
+
+
+class FakeClient:
+    def __init__(self):
+        self.audio = type("Audio", (), {})()
+        self.audio.transcriptions = FakeTranscriptions()
+
+
+@pytest.fixture
+def service():
+    service = VoiceService()
+    service.client = FakeClient()
+    return service
+
+
+async def _chunks(data: bytes, size: int = 4096):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_transcribe_stream_joins_segments_in_order(service):
+    """WAVを無音区間で分割して文字起こしし、セグメント順に結合するテスト"""
+    data = _wav(_tone(6) + _silence(1) + _tone(2))
+
+    result = asyncio.run(service.transcribe_stream(_chunks(data), "wav"))
+
+    assert result == {
+        "transcript": "segment_0.wav segment_1.wav",
+        "segments": 2,
+        "bytes_received": len(data),
+    }
+    assert sorted(service.client.audio.transcriptions.calls) == ["segment_0.wav", "segment_1.wav"]
+
+
+def test_transcribe_stream_buffers_compressed_audio(service):
+    """無音判定できない形式は受信完了後にまとめて文字起こしするテスト"""
+    data = b"\x1aE\xdf\xa3" + bytes(10000)
+
+    result = asyncio.run(service.transcribe_stream(_chunks(data), "webm"))
+
+    assert result["transcript"] == "audio.webm"
+    assert result["segments"] == 1
+    assert service.client.audio.transcriptions.calls == ["audio.webm"]
+
+
+def test_transcribe_stream_rejects_oversized_upload(service, monkeypatch):
+    """受信量が上限を超えた時点で413になるテスト"""
+    monkeypatch.setitem(VOICE_CONFIG, "MAX_FILE_SIZE", 8192)
+    data = _wav(array("h", [3000, -3000] * 8000).tobytes())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(service.transcribe_stream(_chunks(data), "wav"))
+
+    assert exc_info.value.status_code == 413
+    assert service.client.audio.transcriptions.calls == []
+
+
+def test_transcribe_stream_rejects_invalid_wav(service):
+    """WAVとして解釈できない入力で400になるテスト"""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(service.transcribe_stream(_chunks(b"\x1aE\xdf\xa3" + bytes(64)), "wav"))
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "audio_format, data",
+    [
+        ("wav", _wav(_tone(6) + _silence(1) + _tone(2))),
+        ("webm", b"\x1aE\xdf\xa3" + bytes(10000)),
+    ],
+)
+def test_repeated_upload_is_served_from_cache(service, audio_format, data):
+    """同一音声の再送ではWhisper APIを呼ばずにキャッシュから返すテスト"""
+    calls = service.client.audio.transcriptions.calls
+
+    first = asyncio.run(service.transcribe_stream(_chunks(data), audio_format))
+    calls_after_first = len(calls)
+    second = asyncio.run(service.transcribe_stream(_chunks(data, size=1000), audio_format))
+
+    assert calls_after_first == first["segments"]
+    assert len(calls) == calls_after_first
+    assert second == first
+
+
+@pytest.mark.parametrize(
+    "audio_format, data, changed",
+    [
+        ("wav", _wav(_tone(6)), _wav(_silence(1) + _tone(6))),
+        ("webm", b"\x1aE\xdf\xa3" + bytes(10000), b"\x1aE\xdf\xa3" + bytes(10001)),
+    ],
+)
+def test_different_upload_misses_cache(service, audio_format, data, changed):
+    """内容の異なる音声はキャッシュに当たらずWhisper APIを呼ぶテスト"""
+    calls = service.client.audio.transcriptions.calls
+
+    asyncio.run(service.transcribe_stream(_chunks(data), audio_format))
+    asyncio.run(service.transcribe_stream(_chunks(changed), audio_format))
+
+    assert len(calls) == 2